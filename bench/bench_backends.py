@@ -0,0 +1,71 @@
+"""
+Run the same recorded audio through several STT backends and compare.
+
+Takes a 16-bit mono WAV, streams it to each backend in 100 ms chunks
+(``--pace 1`` is real time, 0 is as fast as possible) and reports time to
+first transcript, total time and the final transcript.
+
+    python -m bench.bench_backends call.wav --backends deepgram groq whisper
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import wave
+
+from dg_pool import DeepgramPool
+from stt.backends import create_backend
+
+
+async def run_backend(name: str, pcm: bytes, rate: int, pace: float):
+    pool = None
+    if name == "deepgram":
+        url = (f"{os.getenv('DEEPGRAM_API_BASE', 'wss://api.deepgram.com')}/v1/listen"
+               f"?access_token={os.getenv('DEEPGRAM_API_KEY')}"
+               f"&encoding=linear16&sample_rate={rate}&channels=1&punctuate=true")
+        pool = DeepgramPool(url, size=0)
+    backend = create_backend(name, dg_pool=pool)
+    chunk = rate * 2 // 10      # 100 ms of int16
+
+    t0 = time.perf_counter()
+    finals = []
+    async with backend.open("linear16", rate) as stt:
+        async def feed():
+            for i in range(0, len(pcm), chunk):
+                await stt.send(pcm[i:i + chunk])
+                if pace:
+                    await asyncio.sleep(0.1 * pace)
+            await stt.finish()
+
+        feeder = asyncio.create_task(feed())
+        async for event in stt:
+            if event.is_final and event.transcript:
+                finals.append(event.transcript)
+        await feeder
+    total = time.perf_counter() - t0
+
+    ttft = f"{stt.ttft * 1e3:.0f} ms" if stt.ttft is not None else "n/a"
+    print(f"{name:>9}: ttft={ttft:>8}  total={total:6.2f}s  "
+          f"audio={len(pcm) / 2 / rate:6.2f}s")
+    print(f"{'':>11}{' '.join(finals)[:200]!r}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("wav")
+    ap.add_argument("--backends", nargs="+", default=["deepgram", "groq", "whisper"])
+    ap.add_argument("--pace", type=float, default=1.0)
+    args = ap.parse_args()
+
+    with wave.open(args.wav, "rb") as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise SystemExit("expected a 16-bit mono WAV")
+        rate, pcm = wf.getframerate(), wf.readframes(wf.getnframes())
+
+    for name in args.backends:
+        asyncio.run(run_backend(name, pcm, rate, args.pace))
+
+
+if __name__ == "__main__":
+    main()
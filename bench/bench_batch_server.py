@@ -0,0 +1,81 @@
+"""
+Concurrent calls per CPU core vs. p95 latency for the batched Whisper server.
+
+Each simulated call submits a ``--window`` second audio window every
+``--window`` seconds (real time). For every max batch size we ramp the
+number of calls and report window latency; a configuration keeps up while
+p95 latency stays under the window length.
+
+Torch is pinned to one thread so the numbers are per core. ``--simulate``
+swaps Whisper for a cost model (fixed + per-window seconds) to exercise
+the batcher without a model.
+
+    python -m bench.bench_batch_server --model tiny --batches 1 4 8 --calls 2 4 8 16
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+
+from stt.batch_server import BatchInferenceServer, whisper_batch_fn
+
+RATE = 16000
+
+
+def simulated_infer(fixed: float, per_window: float):
+    def infer(windows):
+        time.sleep(fixed + per_window * len(windows))
+        return ["simulated"] * len(windows)
+    return infer
+
+
+async def run(infer, max_batch: int, calls: int, window: float, rounds: int):
+    server = BatchInferenceServer(infer, max_batch=max_batch, max_wait_ms=window * 100)
+    await server.start()
+    audio = (0.01 * np.random.randn(int(window * RATE))).astype(np.float32)
+
+    async def call(i: int):
+        await asyncio.sleep(window * i / calls)          # stagger call starts
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            await server.transcribe(audio)
+            await asyncio.sleep(max(0.0, window - (time.perf_counter() - t0)))
+
+    await asyncio.gather(*(call(i) for i in range(calls)))
+    await server.close()
+    return server.latencies, server.mean_batch
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--model", default="tiny")
+    ap.add_argument("--window", type=float, default=5.0)
+    ap.add_argument("--rounds", type=int, default=4)
+    ap.add_argument("--batches", type=int, nargs="+", default=[1, 2, 4, 8])
+    ap.add_argument("--calls", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    ap.add_argument("--simulate", nargs=2, type=float, metavar=("FIXED", "PER_WINDOW"))
+    args = ap.parse_args()
+
+    if args.simulate:
+        infer = simulated_infer(*args.simulate)
+    else:
+        import torch
+        import whisper
+        torch.set_num_threads(1)
+        infer = whisper_batch_fn(whisper.load_model(args.model, device="cpu"))
+
+    for max_batch in args.batches:
+        print(f"max_batch={max_batch}")
+        for calls in args.calls:
+            lat, mean_batch = asyncio.run(run(infer, max_batch, calls, args.window, args.rounds))
+            p95 = statistics.quantiles(lat, n=20)[18] if len(lat) > 1 else lat[0]
+            status = "ok" if p95 < args.window else "falling behind"
+            print(f"  calls/core={calls:>3}  p50={statistics.median(lat):6.2f}s  "
+                  f"p95={p95:6.2f}s  mean batch {mean_batch:4.1f}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Load test: dashboard fan-out with 1k simulated sockets.
+
+Most sockets are healthy, a few are slow and a few never finish a send.
+Reports how long each ``broadcast`` call blocks the publisher and the
+delivery latency seen by healthy clients, for the old sequential loop and
+the queued ConnectionManager.
+
+    python -m bench.bench_broadcast --clients 1000 --messages 200
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from connections import ConnectionManager
+
+
+class FakeSocket:
+    def __init__(self, delay: float = 0.0, dead: bool = False):
+        self.delay = delay
+        self.dead = dead
+        self.latencies: list[float] = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        self.closed = True
+
+    async def send_text(self, text: str):
+        if self.dead:
+            await asyncio.Event().wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.latencies.append(time.perf_counter() - json.loads(text)["sent"])
+
+    async def send_json(self, message: dict):
+        await self.send_text(json.dumps(message))
+
+
+class SequentialManager:
+    """The original ConnectionManager.broadcast loop."""
+
+    def __init__(self):
+        self.connections = []
+
+    async def connect(self, ws):
+        await ws.accept()
+        self.connections.append(ws)
+
+    async def broadcast(self, message: dict):
+        for ws in self.connections:
+            await ws.send_json(message)
+
+
+def make_sockets(clients: int, with_dead: bool) -> tuple[list[FakeSocket], list[FakeSocket]]:
+    slow = max(1, clients // 50)
+    dead = max(1, clients // 100) if with_dead else 0
+    healthy = [FakeSocket() for _ in range(clients - slow - dead)]
+    others = [FakeSocket(delay=0.05) for _ in range(slow)] + [FakeSocket(dead=True) for _ in range(dead)]
+    return healthy, others
+
+
+async def run(manager, clients: int, messages: int, with_dead: bool):
+    healthy, others = make_sockets(clients, with_dead)
+    for ws in healthy + others:
+        await manager.connect(ws)
+
+    blocked = []
+    for i in range(messages):
+        msg = {"callSid": "CA0", "transcript": "word " * 20, "is_final": i % 5 == 4,
+               "fraud_detected": i == messages - 1, "keywords": [], "sent": time.perf_counter()}
+        t0 = time.perf_counter()
+        await manager.broadcast(msg)
+        blocked.append(time.perf_counter() - t0)
+        await asyncio.sleep(0.02)
+    await asyncio.sleep(0.5)
+
+    lat = [x for ws in healthy for x in ws.latencies]
+    q = statistics.quantiles(lat, n=100)
+    print(f"  broadcast blocks p50={statistics.median(blocked) * 1e3:.2f} ms "
+          f"max={max(blocked) * 1e3:.2f} ms")
+    print(f"  healthy delivery p50={q[49] * 1e3:.2f} ms p99={q[98] * 1e3:.2f} ms "
+          f"({len(lat)}/{len(healthy) * messages} delivered)")
+    if isinstance(manager, ConnectionManager):
+        print(f"  evicted={manager.evicted} "
+              f"dropped={sum(s.dropped for s in manager.subscribers.values())}")
+        for ws in list(manager.subscribers):
+            manager.disconnect(ws)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=1000)
+    ap.add_argument("--messages", type=int, default=200)
+    args = ap.parse_args()
+
+    print("sequential (slow clients only, 20 messages):")
+    asyncio.run(run(SequentialManager(), args.clients, 20, with_dead=False))
+    print("queued (slow + dead clients):")
+    asyncio.run(run(ConnectionManager(send_timeout=1.0), args.clients, args.messages, with_dead=True))
+
+
+if __name__ == "__main__":
+    main()
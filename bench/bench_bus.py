@@ -0,0 +1,114 @@
+"""
+Multi-worker integration run for the event bus.
+
+Starts the local Unix-socket broker, then several worker processes. Each
+worker has its own ConnectionManager with a fake dashboard subscribed to
+every call, publishes ``--events`` transcript events for its own calls and
+counts what its dashboard receives. Every dashboard must see every event
+from every worker.
+
+    python -m bench.bench_bus --workers 4 --events 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bus import serve_broker, UnixSocketBus
+
+
+class CountingSocket:
+    def __init__(self):
+        self.received = 0
+        self.done = asyncio.Event()
+        self.expected = 0
+
+    async def accept(self):
+        pass
+
+    async def close(self, code: int = 1000):
+        pass
+
+    async def send_text(self, text: str):
+        self.received += 1
+        if self.received >= self.expected:
+            self.done.set()
+
+
+async def worker(path: str, worker_id: int, workers: int, events: int):
+    from connections import ConnectionManager
+
+    manager = ConnectionManager(max_queue=events * workers, bus=UnixSocketBus(path))
+    await manager.start()
+    dashboard = CountingSocket()
+    dashboard.expected = events * workers
+    await manager.connect(dashboard)
+    print("ready", flush=True)
+    sys.stdin.readline()                # wait until every worker is connected
+
+    t0 = time.perf_counter()
+    for i in range(events):
+        await manager.broadcast({"callSid": f"CA{worker_id}-{i % 10}", "transcript": f"event {i}",
+                                 "is_final": True, "fraud_detected": False, "keywords": []})
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    try:
+        await asyncio.wait_for(dashboard.done.wait(), 30)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - t0
+    print(json.dumps({"worker": worker_id, "received": dashboard.received,
+                      "expected": dashboard.expected, "seconds": elapsed}), flush=True)
+    await manager.close()
+
+
+async def coordinator(workers: int, events: int):
+    path = os.path.join(tempfile.mkdtemp(), "bus.sock")
+    server = await serve_broker(path)
+    procs = [
+        await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "bench.bench_bus", "--worker", str(i),
+            "--workers", str(workers), "--events", str(events), "--path", path,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        )
+        for i in range(workers)
+    ]
+    for p in procs:
+        assert (await p.stdout.readline()).strip() == b"ready"
+    for p in procs:
+        p.stdin.write(b"go\n")
+        await p.stdin.drain()
+
+    ok = True
+    for p in procs:
+        result = json.loads(await p.stdout.readline())
+        await p.wait()
+        ok &= result["received"] == result["expected"]
+        rate = result["received"] / result["seconds"]
+        print(f"worker {result['worker']}: {result['received']}/{result['expected']} events "
+              f"in {result['seconds']:.2f}s ({rate:,.0f}/s)")
+    server.close()
+    print("PASS" if ok else "FAIL")
+    return ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--events", type=int, default=2000)
+    ap.add_argument("--worker", type=int)
+    ap.add_argument("--path")
+    args = ap.parse_args()
+    if args.worker is not None:
+        asyncio.run(worker(args.path, args.worker, args.workers, args.events))
+    else:
+        sys.exit(0 if asyncio.run(coordinator(args.workers, args.events)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Remote calls and tail latency with the content-addressed cache.
+
+Replays a corpus of scam calls: every call reads one of a few scripts,
+window by window, and some windows come back with a word dropped,
+inserted or changed (``--noise``), as a different STT pass would. The
+remote LLM is simulated: a miss costs a log-normal latency draw, a hit
+costs the measured lookup. Runs three configurations (no cache, exact
+keys, exact + simhash near-duplicates), then reopens the SQLite file to
+show a restarted process starts warm. Finally replays recorded audio at
+random volumes through the transcript cache.
+
+    python -m bench.bench_cache --calls 200 --noise 0.3
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import numpy as np
+
+from bench.bench_classifier import BENIGN, FRAUD
+from stt.cache import ContentCache, cached_classifier, cached_transcriber
+
+FILLER = ["uh", "sir", "please", "now", "the", "okay", "madam", "just"]
+
+
+def perturb(text: str, rng: random.Random) -> str:
+    words = text.split()
+    i = rng.randrange(len(words))
+    op = rng.choice("dis")
+    if op == "d" and len(words) > 3:
+        del words[i]
+    elif op == "i":
+        words.insert(i, rng.choice(FILLER))
+    else:
+        words[i] = rng.choice(FILLER)
+    return " ".join(words)
+
+
+def corpus(calls: int, noise: float, rng: random.Random) -> list[str]:
+    scripts = [FRAUD[i:i + 4] for i in range(0, len(FRAUD), 4)]
+    windows = []
+    for _ in range(calls):
+        for line in rng.choice(scripts) + rng.sample(BENIGN, 2):
+            windows.append(perturb(line, rng) if rng.random() < noise else line)
+    return windows
+
+
+class SimulatedLLM:
+    def __init__(self, rng: random.Random, median_ms: float):
+        self.rng = rng
+        self.median_s = median_ms / 1000
+        self.calls = 0
+        self.last_latency = 0.0
+
+    def __call__(self, text: str) -> tuple[bool, float]:
+        self.calls += 1
+        self.last_latency = self.median_s * self.rng.lognormvariate(0, 0.6)
+        return "otp" in text, 0.9
+
+
+def percentiles(samples: list[float]) -> str:
+    s = sorted(samples)
+    pick = lambda q: s[min(len(s) - 1, int(len(s) * q))] * 1e3
+    return f"p50 {pick(0.5):7.1f}  p95 {pick(0.95):7.1f}  p99 {pick(0.99):7.1f} ms"
+
+
+def run(windows, classify, llm) -> list[float]:
+    latencies = []
+    for text in windows:
+        before = llm.calls
+        t0 = time.perf_counter()
+        classify(text)
+        local = time.perf_counter() - t0
+        latencies.append(local + (llm.last_latency if llm.calls > before else 0.0))
+    return latencies
+
+
+def verdict_bench(args, rng):
+    windows = corpus(args.calls, args.noise, rng)
+    db = os.path.join(tempfile.mkdtemp(), "cache.sqlite3")
+    print(f"{len(windows)} windows from {args.calls} replayed calls, noise {args.noise:.0%}\n")
+
+    configs = [("no cache", None), ("exact", 0), ("exact + simhash", args.near_bits)]
+    for name, near_bits in configs:
+        llm = SimulatedLLM(random.Random(args.seed), args.llm_ms)
+        if near_bits is None:
+            lat = run(windows, llm, llm)
+        else:
+            path = db if near_bits else None
+            cache = ContentCache(path, "verdicts", near_bits=near_bits)
+            lat = run(windows, cached_classifier(llm, cache), llm)
+            cache.close()
+        print(f"{name:>16}: remote {llm.calls:5d}  {percentiles(lat)}")
+
+    llm = SimulatedLLM(random.Random(args.seed + 1), args.llm_ms)
+    t0 = time.perf_counter()
+    cache = ContentCache(db, "verdicts", near_bits=args.near_bits)
+    load_ms = (time.perf_counter() - t0) * 1e3
+    lat = run(corpus(args.calls, args.noise, rng), cached_classifier(llm, cache), llm)
+    print(f"{'after restart':>16}: remote {llm.calls:5d}  {percentiles(lat)}  "
+          f"(loaded {len(cache)} entries in {load_ms:.1f} ms)")
+    print(f"{'':>16}  {cache.stats()}")
+    cache.close()
+
+
+def transcript_bench(args, rng):
+    rate = 16000
+    nprng = np.random.default_rng(args.seed)
+    t = np.arange(5 * rate) / rate
+    recordings = []
+    for _ in range(8):
+        f0 = nprng.uniform(90, 220)
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * nprng.uniform(2, 6) * t)
+        voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 12))
+        recordings.append((envelope * voiced + 0.05 * nprng.standard_normal(len(t))).astype(np.float32))
+
+    calls = 0
+
+    def remote(audio: bytes) -> str:
+        nonlocal calls
+        calls += 1
+        return "transcript"
+
+    cache = ContentCache(namespace="transcripts")
+    transcribe = cached_transcriber(remote, cache, rate)
+    n = args.calls * 4
+    for _ in range(n):
+        x = recordings[rng.randrange(len(recordings))] * rng.uniform(0.2, 1.0)
+        transcribe((x * 8000).astype(np.int16).tobytes())
+    print(f"\ntranscripts: {n} replayed windows from {len(recordings)} recordings at random volume")
+    print(f"{'':>16}  remote {calls}, {cache.stats()}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=200)
+    ap.add_argument("--noise", type=float, default=0.3)
+    ap.add_argument("--near-bits", type=int, default=6)
+    ap.add_argument("--llm-ms", type=float, default=400.0)
+    ap.add_argument("--seed", type=int, default=3)
+    args = ap.parse_args()
+    rng = random.Random(args.seed)
+    verdict_bench(args, rng)
+    transcript_bench(args, rng)
+
+
+if __name__ == "__main__":
+    main()
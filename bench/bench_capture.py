@@ -0,0 +1,170 @@
+"""
+Desktop audio capture (stt/capture.py): event-loop stalls, frame timing
+and resampling cost, with a synthetic source instead of a device.
+
+1. Loop stalls. The old clients called PyAudio's blocking
+   ``stream.read(1024)`` inside their send coroutine. A stand-in device
+   blocks the same way (until 1024 samples at 44.1 kHz have "arrived"),
+   while a 5 ms ticker and a transcript consumer, fed from another thread
+   as websocket frames would be, measure how late the loop serves them.
+   The same is then done with AudioCapture over a SyntheticSource.
+2. Frames. Count, size and arrival jitter of ``--frame-ms`` frames, and
+   audio dropped when the consumer stalls for longer than the ring holds.
+3. Resampling. Cost per audio second in 20 ms blocks, stopband leakage
+   of a tone above the new Nyquist, passband gain, and whether blocks
+   join seamlessly, against stt.audio.resample run per block.
+
+    python -m bench.bench_capture --seconds 5 --frame-ms 20
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from stt.audio import Resampler, resample
+from stt.capture import AudioCapture, SyntheticSource
+
+DEVICE_RATE = 44100
+BLOCK = 1024
+
+
+class BlockingDevice:
+    """PyAudio's blocking read: returns once ``n`` more samples have been captured."""
+
+    def __init__(self, rate: int = DEVICE_RATE):
+        self.rate = rate
+        self.start = time.perf_counter()
+        self.read_to = 0
+
+    def read(self, n: int) -> bytes:
+        self.read_to += n
+        time.sleep(max(0.0, self.start + self.read_to / self.rate - time.perf_counter()))
+        return bytes(2 * n)
+
+
+def pct(values: list[float], q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+async def watch(seconds: float, send) -> dict:
+    """Run ``send`` (the audio coroutine) next to a ticker and a transcript consumer."""
+    loop = asyncio.get_running_loop()
+    lags, delivery = [], []
+    transcripts: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def deepgram():                      # results arrive on the socket every ~100 ms
+        while not stop.wait(0.1):
+            loop.call_soon_threadsafe(transcripts.put_nowait, time.perf_counter())
+
+    async def ticker():
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - t0 - 0.005)
+
+    async def receive():
+        while True:
+            sent = await transcripts.get()
+            delivery.append(time.perf_counter() - sent)
+
+    threading.Thread(target=deepgram, daemon=True).start()
+    tasks = [asyncio.create_task(ticker()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait_for(send(), seconds)
+    except asyncio.TimeoutError:
+        pass
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    return {"lag_p50": pct(lags, 0.5), "lag_p99": pct(lags, 0.99), "lag_max": max(lags),
+            "delivery_p50": pct(delivery, 0.5), "delivery_p99": pct(delivery, 0.99)}
+
+
+async def stalls(seconds: float, frame_ms: int):
+    async def blocking():
+        device = BlockingDevice()
+        while True:
+            device.read(BLOCK)              # what deep.py / t2.py did
+            await asyncio.sleep(0)          # ws.send of a small frame
+
+    async def captured():
+        source = SyntheticSource.tone(seconds + 1, DEVICE_RATE)
+        async with AudioCapture(source, 16000, frame_ms) as mic:
+            async for frame in mic:
+                await asyncio.sleep(0)
+                frame.tobytes()
+
+    print(f"{'audio path':>24} {'tick lag p50':>13} {'p99':>8} {'max':>8} "
+          f"{'transcript wait p50':>20} {'p99':>8}")
+    for name, send in (("blocking stream.read", blocking), ("AudioCapture", captured)):
+        r = await watch(seconds, send)
+        print(f"{name:>24} {r['lag_p50'] * 1e3:>11.2f}ms {r['lag_p99'] * 1e3:>6.2f}ms "
+              f"{r['lag_max'] * 1e3:>6.2f}ms {r['delivery_p50'] * 1e3:>18.2f}ms "
+              f"{r['delivery_p99'] * 1e3:>6.2f}ms")
+
+
+async def frames(seconds: float, frame_ms: int):
+    source = SyntheticSource.tone(seconds, DEVICE_RATE)
+    arrivals, sizes = [], set()
+    async with AudioCapture(source, 16000, frame_ms) as mic:
+        async for frame in mic:
+            arrivals.append(time.perf_counter())
+            sizes.add(len(frame))
+    gaps = np.diff(arrivals) * 1e3
+    print(f"\n{mic.frames} frames of {sorted(sizes)} samples for {seconds:.1f} s at {DEVICE_RATE} Hz → "
+          f"16 kHz; gap p50 {np.median(gaps):.1f} ms, p99 {np.percentile(gaps, 99):.1f} ms "
+          f"(target {frame_ms} ms), dropped {mic.stats()['dropped_s']:.2f} s")
+
+    source = SyntheticSource.tone(3.0, DEVICE_RATE)
+    async with AudioCapture(source, 16000, frame_ms, ring_s=1.0) as mic:
+        await asyncio.sleep(2.0)            # consumer stalled for 2 s, ring holds 1 s
+        n = sum([1 async for _ in mic])
+    print(f"stalled consumer: {n} frames delivered, {mic.stats()['dropped_s']:.2f} s "
+          f"overwritten in a 1 s ring")
+
+
+def resampling(seconds: float):
+    print(f"\n{'rate':>14} {'streamed µs/s':>14} {'per-block µs/s':>15} {'leak dB':>8} "
+          f"{'naive leak dB':>14} {'1 kHz gain':>11} {'seamless':>9}")
+    for src, dst in ((44100, 16000), (48000, 16000), (16000, 8000), (8000, 16000)):
+        t = np.arange(int(seconds * src)) / src
+        block = src // 50
+        speech = (np.sin(2 * np.pi * 1000 * t) * 10000).astype(np.int16)
+        above = (np.sin(2 * np.pi * 0.45 * src * t) * 10000).astype(np.int16)
+        blocks = [speech[i:i + block] for i in range(0, len(speech), block)]
+
+        r = Resampler(src, dst)
+        t0 = time.perf_counter()
+        streamed = np.concatenate([r(b) for b in blocks])
+        cost = (time.perf_counter() - t0) / seconds * 1e6
+        t0 = time.perf_counter()
+        for b in blocks:
+            resample(b, src, dst)
+        naive_cost = (time.perf_counter() - t0) / seconds * 1e6
+
+        rms = lambda x: np.sqrt(np.mean(x[len(x) // 10:].astype(np.float64) ** 2))
+        db = lambda x: 20 * np.log10(max(rms(x), 1e-9) / rms(above))
+        leak = db(Resampler(src, dst)(above)) if dst < src else float("nan")
+        naive = db(resample(above, src, dst)) if dst < src else float("nan")
+        gain = rms(streamed) / rms(speech)
+        seamless = np.array_equal(streamed, Resampler(src, dst)(speech))
+        print(f"{src:>6}→{dst:<7} {cost:>14.0f} {naive_cost:>15.0f} {leak:>8.1f} {naive:>14.1f} "
+              f"{gain:>11.3f} {str(seamless):>9}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--frame-ms", type=int, default=20)
+    args = ap.parse_args()
+    asyncio.run(stalls(args.seconds, args.frame_ms))
+    asyncio.run(frames(args.seconds, args.frame_ms))
+    resampling(args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Escalation rate and per-tier latency of the tiered fraud classifier.
+
+Classifies a stream of labelled 5 s transcript windows (mostly ordinary
+conversation, as on real calls) twice: every window sent to the LLM, as
+ll.py used to, and through the keyword → model → LLM cascade. The LLM is
+a stub that answers with the true label after ``--llm-ms``, so the
+numbers isolate what the cascade saves. None of these windows are in the
+model's training corpus.
+
+    python -m bench.bench_classifier --windows 500 --llm-ms 400
+"""
+
+import argparse
+import random
+import time
+
+from stt.classifier import LLM, TIERS, TieredClassifier, Thresholds
+
+FRAUD = [
+    "hello sir i am calling from your bank your debit card has been blocked",
+    "to unblock it please tell me the otp you will receive now",
+    "madam this is the income tax department you have a pending penalty",
+    "sir your kyc update is pending your account will be closed today",
+    "you have been selected for a cashback offer just enter your upi pin",
+    "please download the support app and read me the code on your screen",
+    "your parcel is held at customs pay the clearance fee immediately",
+    "this is the cyber police there is a warrant in your name pay now to settle",
+    "i need the card number and expiry date to process the refund",
+    "your number will be disconnected in two hours press nine to avoid it",
+    "beta main hospital mein hoon jaldi paise bhej do kisi ko mat batana",
+    "we are from the electricity board your connection will be cut tonight",
+]
+BENIGN = [
+    "yeah i just got back from work traffic was terrible today",
+    "did you finish the assignment it is due on monday",
+    "mom wants to know if you are coming for dinner on sunday",
+    "the plumber came and fixed the leak in the bathroom",
+    "i am at the grocery store do we need eggs",
+    "the match starts at seven let us watch it together",
+    "my flight lands at six thirty can you pick me up",
+    "i booked the tickets for the movie on saturday",
+    "the kids have a holiday tomorrow because of the festival",
+    "i think it is going to rain bring an umbrella",
+    "remember to water the plants before you leave",
+    "please call the landlord about the broken heater",
+    "it is urgent the baby has a fever can you get medicine on the way",
+    "i paid the credit card bill this morning from my bank app",
+    "haan main theek hoon kal milte hain office ke baad",
+    "the bank is closed on saturday so i will go on monday",
+]
+
+
+class StubLLM:
+    def __init__(self, labels: dict[str, bool], delay_s: float):
+        self.labels = labels
+        self.delay_s = delay_s
+        self.calls = 0
+
+    def __call__(self, text: str) -> tuple[bool, float]:
+        self.calls += 1
+        time.sleep(self.delay_s)
+        return self.labels[text], 0.95
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--windows", type=int, default=500)
+    ap.add_argument("--fraud-share", type=float, default=0.15)
+    ap.add_argument("--llm-ms", type=float, default=400.0)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    labels = {t: True for t in FRAUD} | {t: False for t in BENIGN}
+    windows = [rng.choice(FRAUD) if rng.random() < args.fraud_share else rng.choice(BENIGN)
+               for _ in range(args.windows)]
+    llm_s = args.llm_ms / 1000
+
+    # Baseline cost is just the stubbed LLM latency per window.
+    baseline_s = len(windows) * llm_s
+
+    llm = StubLLM(labels, llm_s)
+    clf = TieredClassifier(llm=llm, thresholds=Thresholds())
+    t0 = time.perf_counter()
+    verdicts = [clf.classify(w) for w in windows]
+    cascade_s = time.perf_counter() - t0
+
+    correct = sum(v.fraud == labels[w] for v, w in zip(verdicts, windows))
+    missed = sum(labels[w] and not v.fraud for v, w in zip(verdicts, windows))
+    false_alarms = sum(v.fraud and not labels[w] for v, w in zip(verdicts, windows))
+
+    print(f"{len(windows)} windows ({args.fraud_share:.0%} fraud), LLM stub {args.llm_ms:.0f} ms\n")
+    print(clf.report())
+    print()
+    for tier in TIERS:
+        share = clf.decided[tier] / len(windows)
+        print(f"decided by {tier:>8}: {share:6.1%}")
+    print(f"\nLLM calls       : {len(windows)} → {llm.calls} "
+          f"({1 - llm.calls / len(windows):.0%} fewer)")
+    print(f"mean per window : {baseline_s / len(windows) * 1e3:7.1f} ms → "
+          f"{cascade_s / len(windows) * 1e3:7.1f} ms")
+    local = [v.latency_ms for v in verdicts if v.tier != LLM]
+    if local:
+        local.sort()
+        print(f"local verdicts  : p50 {local[len(local) // 2]:.3f} ms  "
+              f"p99 {local[int(len(local) * 0.99)]:.3f} ms")
+    print(f"accuracy        : {correct / len(windows):.1%}  "
+          f"(missed {missed}, false alarms {false_alarms})")
+
+
+if __name__ == "__main__":
+    main()
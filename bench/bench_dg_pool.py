@@ -0,0 +1,64 @@
+"""
+Time-to-first-transcript: pooled vs. connect-per-call Deepgram sessions.
+
+A fake Deepgram server adds ``--handshake`` seconds to every connection.
+Each simulated call opens a session, streams 100 ms mu-law chunks at
+real-time pace and records how long the first transcript took.
+
+    python -m bench.bench_dg_pool --calls 20 --handshake 0.25
+"""
+
+import argparse
+import asyncio
+import statistics
+
+from bench.fake_deepgram import FakeDeepgramServer
+from dg_pool import DeepgramPool
+
+CHUNK = bytes(800)   # 100 ms of mu-law silence at 8 kHz
+
+
+async def one_call(pool: DeepgramPool) -> float:
+    async with pool.session(8000) as dg:
+        async def feed():
+            for _ in range(50):
+                await dg.send(CHUNK)
+                await asyncio.sleep(0.1)
+
+        feeder = asyncio.create_task(feed())
+        async for res in dg:
+            if res["channel"]["alternatives"][0]["transcript"]:
+                break
+        feeder.cancel()
+        return dg.ttft
+
+
+async def run(pool_size: int, calls: int, handshake: float) -> list[float]:
+    async with FakeDeepgramServer(handshake_delay=handshake, result_delay=0.05) as server:
+        pool = DeepgramPool(server.url, size=pool_size)
+        if pool_size:
+            await pool.start()
+            await asyncio.sleep(handshake * pool_size + 0.5)    # let it warm up
+        ttfts = []
+        for _ in range(calls):
+            ttfts.append(await one_call(pool))
+            await asyncio.sleep(handshake + 0.1)                # gap between calls
+        await pool.close()
+        print(f"  warm hits={pool.hits} misses={pool.misses}")
+        return ttfts
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=20)
+    ap.add_argument("--handshake", type=float, default=0.25)
+    args = ap.parse_args()
+    for label, size in (("connect per call", 0), ("pooled (size 2)", 2)):
+        print(f"{label}:")
+        ttfts = asyncio.run(run(size, args.calls, args.handshake))
+        print(f"  time to first transcript p50={statistics.median(ttfts) * 1e3:.0f} ms "
+              f"max={max(ttfts) * 1e3:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Early alerts: how much sooner each decision stage fires, and how often
+it fires on honest calls.
+
+Replays synthetic calls as Deepgram-style result scripts (the items
+bench/fake_deepgram.py serves): words arrive at ``--wps``, an interim
+every ``--interval`` seconds and the final ``--endpoint`` seconds after a
+sentence's last word. The newest word of an interim is unsettled: at
+``--churn`` it is a wrong ordinary word and at ``--flicker`` a keyword
+from the dictionary (the "top" → "otp" kind of slip), each gone by the
+next revision and rarer once the speaker has stopped. Scam calls are
+ordinary sentences with three scam lines spliced in; honest calls are
+ordinary sentences only, hard negatives included. Each result runs through what receive_stt does (streaming
+matcher, HitStability, classifier, one CallRisk per stage) under every
+policy in stt/stability.py.
+
+Reports, per policy and stage: scam calls caught, how much earlier than
+waiting for finals (median / p90 over the calls both caught), and
+honest calls reaching the stage (false positives).
+
+    python -m bench.bench_early --calls 400 --flicker 0.01
+"""
+
+import argparse
+import random
+import time
+
+from bench.bench_classifier import BENIGN, FRAUD
+from stt.classifier import KeywordScorer, TieredClassifier
+from stt.keywords import KeywordSnapshot, load_entries
+from stt.risk import HANGUP, CallRisk, RiskEngine
+from stt.stability import POLICIES, HitStability, StabilityPolicy
+
+
+def segment(words: list[str], t0: float, rng: random.Random, args,
+            confusions: list[str], filler: list[str]) -> list[dict]:
+    """One sentence from ``t0``: an interim every ``interval``, then the final."""
+    items, t = [], t0
+    spoken = len(words) / args.wps
+    end = t0 + spoken + args.endpoint
+    while True:
+        t += args.interval
+        if t >= end:
+            break
+        # Interims go on through the endpointing pause, the last word settling
+        hyp = words[:int((t - t0) * args.wps) + 1]
+        roll = rng.random() * (1 + 2 * max(0.0, t - t0 - spoken))
+        if roll < args.flicker:
+            hyp = hyp[:-1] + [rng.choice(confusions)]
+        elif roll < args.flicker + args.churn:
+            hyp = hyp[:-1] + [rng.choice(filler)]
+        items.append({"at": t, "start": t0, "transcript": " ".join(hyp), "is_final": False})
+    items.append({"at": end, "start": t0, "transcript": " ".join(words), "is_final": True})
+    return items
+
+
+def call_script(scam: bool, rng: random.Random, args, confusions, filler) -> list[dict]:
+    lines = rng.sample(BENIGN, rng.randint(6, len(BENIGN)))
+    if scam:
+        at = rng.randrange(len(lines) - 3)
+        lines[at:at + 3] = rng.sample(FRAUD, 3)
+    script, t = [], 0.0
+    for line in lines:
+        script += segment(line.split(), t, rng, args, confusions, filler)
+        t = script[-1]["at"] + rng.uniform(0.3, 1.5)
+    return script
+
+
+def replay(script, snapshot, classifier, engine, policy) -> tuple[float | None, float | None]:
+    """(suspected at, confirmed at): call time each stage's risk reached hangup."""
+    stream = snapshot.matcher.stream()
+    stability = HitStability(policy)
+    risk, early = CallRisk(engine, 0.0), CallRisk(engine, 0.0)
+    suspected_at = None
+    for item in script:
+        t, text, final = item["at"], item["transcript"], item["is_final"]
+        stream.feed(text, final)
+        suspected, confirmed = stability.update(stream.live(), t * 1000, final)
+        if not text:
+            continue
+        present = list(dict.fromkeys(stream.live()))
+        verdict = classifier.classify(text, present, escalate=False)
+        update = risk.observe_verdict(t, verdict, final=final, keywords=confirmed)
+        e = early.observe_verdict(t, verdict, final=final, keywords=suspected)
+        if suspected_at is None and e.level == HANGUP:
+            suspected_at = t
+        if update.level == HANGUP:
+            return suspected_at or t, t
+    return suspected_at, None
+
+
+def pct(values: list[float], q: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=400)
+    ap.add_argument("--scam-share", type=float, default=0.5)
+    ap.add_argument("--wps", type=float, default=2.5, help="words per second")
+    ap.add_argument("--interval", type=float, default=0.25, help="seconds between interims")
+    ap.add_argument("--endpoint", type=float, default=1.0, help="last word to final, seconds")
+    ap.add_argument("--flicker", type=float, default=0.005)
+    ap.add_argument("--churn", type=float, default=0.3)
+    ap.add_argument("--stable", default="",
+                    help="override the stable policy: suspect revisions,ms,confirm revisions,ms")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    policies = dict(POLICIES)
+    if args.stable:
+        policies["stable"] = StabilityPolicy(*map(float, args.stable.split(",")))
+
+    snapshot = KeywordSnapshot(load_entries(), fuzzy=True)
+    classifier = TieredClassifier(scorer=KeywordScorer.from_snapshot(snapshot))
+    engine = RiskEngine()
+    engine.use_keywords(snapshot)
+    confusions = [kw for kw in snapshot.weights if " " not in kw]
+    filler = sorted({w for line in BENIGN for w in line.split()})
+
+    rng = random.Random(args.seed)
+    calls = [(scam, call_script(scam, rng, args, confusions, filler))
+             for scam in (rng.random() < args.scam_share for _ in range(args.calls))]
+    scams = sum(scam for scam, _ in calls)
+    results, cost = {}, {}
+    for name, policy in policies.items():
+        t0 = time.perf_counter()
+        results[name] = [replay(script, snapshot, classifier, engine, policy) for _, script in calls]
+        cost[name] = (time.perf_counter() - t0) / sum(len(s) for _, s in calls) * 1e6
+
+    items = sum(len(s) for _, s in calls)
+    print(f"{len(calls)} calls ({scams} scam), {items} STT results; interim every "
+          f"{args.interval * 1000:.0f} ms, final {args.endpoint:.1f} s after the last word; "
+          f"last word flickers to a keyword at {args.flicker:.1%}, churns at {args.churn:.0%}")
+    for name, policy in policies.items():
+        print(f"  {name:<8} suspect {policy.suspect_revisions:g} revisions/{policy.suspect_ms:g} ms, "
+              f"confirm {policy.confirm_revisions:g} revisions/{policy.confirm_ms:g} ms or final")
+    baseline = [confirmed for _, confirmed in results["final"]]
+    print(f"\n{'policy':>8} {'stage':>10} {'scams caught':>13} {'earlier than finals':>20} "
+          f"{'honest calls hit':>17} {'µs/result':>10}")
+    for name in policies:
+        for stage in (0, 1):
+            caught, gains, false = 0, [], 0
+            for (scam, _), times, base in zip(calls, results[name], baseline):
+                at = times[stage]
+                if at is None:
+                    continue
+                if not scam:
+                    false += 1
+                    continue
+                caught += 1
+                if base is not None:
+                    gains.append(base - at)
+            print(f"{name:>8} {('suspected', 'confirmed')[stage]:>10} {caught:>6}/{scams:<6} "
+                  f"{pct(gains, 0.5):>8.2f}s / {pct(gains, 0.9):>5.2f}s "
+                  f"{false:>7}/{len(calls) - scams:<9} {cost[name]:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Event store: sustained write rate and what appending costs the STT loop.
+
+Appends dashboard-shaped events (finals and alerts over ``--calls``
+calls) from the event loop at a fixed rate while a 10 ms "media tick"
+measures loop lag, once through EventStore (write-behind thread, batched
+commits) and once with an INSERT + commit per event on the loop, as a
+naive logger would. Then floods the store to find its sustained commit
+rate, and times per-call lookups and /ws-style replays on the filled
+table.
+
+    python -m bench.bench_event_store --rates 1000,5000,20000 --seconds 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from event_store import EventStore
+
+WORDS = ("sir please share the otp you received your account will be blocked "
+         "kyc update pending bank verification send money today").split()
+
+
+def make_event(rng: random.Random, calls: int) -> dict:
+    fraud = rng.random() < 0.1
+    return {
+        "ts": time.time(),
+        "callSid": f"CA{rng.randrange(calls):032x}",
+        "transcript": " ".join(rng.choices(WORDS, k=rng.randint(6, 16))),
+        "is_final": True,
+        "fraud_detected": fraud,
+        "keywords": ["otp"] if fraud else [],
+        "confidence": round(rng.random(), 3),
+        "tier": "keywords",
+        "risk": round(rng.random(), 3),
+        "risk_level": "alert" if fraud else "ok",
+        "keywords_version": "1-2e18e63e983d",
+    }
+
+
+class InlineStore:
+    """The naive alternative: one INSERT + commit per event, on the caller's thread."""
+
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, ts REAL, call_sid TEXT, "
+                        "kind TEXT, body TEXT)")
+        self.db.execute("CREATE INDEX events_call ON events (call_sid, ts)")
+
+    def append(self, m: dict):
+        with self.db:
+            self.db.execute("INSERT INTO events (ts, call_sid, kind, body) VALUES (?, ?, ?, ?)",
+                            (m["ts"], m["callSid"], "final", json.dumps(m)))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.db.close()
+
+
+async def paced(store, rate: int, seconds: float, calls: int) -> dict:
+    rng = random.Random(0)
+    lags, costs = [], []
+    stop = asyncio.Event()
+
+    async def ticker():
+        deadline = time.perf_counter()
+        while not stop.is_set():
+            deadline += 0.010
+            await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+            lags.append(time.perf_counter() - deadline)
+
+    tick = asyncio.create_task(ticker())
+    batch = max(1, rate // 100)                 # events per 10 ms slot
+    start = time.perf_counter()
+    sent = 0
+    while time.perf_counter() - start < seconds:
+        for _ in range(batch):
+            event = make_event(rng, calls)
+            t0 = time.perf_counter()
+            store.append(event)
+            costs.append(time.perf_counter() - t0)
+        sent += batch
+        await asyncio.sleep(max(0.0, start + sent / rate - time.perf_counter()))
+    achieved = sent / (time.perf_counter() - start)
+    stop.set()
+    await tick
+    await asyncio.to_thread(store.flush)
+    lags.sort()
+    costs.sort()
+    return {"achieved": achieved, "append_p50": costs[len(costs) // 2], "append_p99": costs[int(len(costs) * 0.99)],
+            "lag_p99": lags[int(len(lags) * 0.99)], "lag_max": lags[-1]}
+
+
+def flood(path: str, events: int, calls: int) -> tuple[float, EventStore]:
+    rng = random.Random(1)
+    batch = [make_event(rng, calls) for _ in range(10_000)]
+    store = EventStore(path, batch_size=1000)
+    t0 = time.perf_counter()
+    for i in range(events):
+        store.append(batch[i % len(batch)])
+    store.flush()
+    return events / (time.perf_counter() - t0), store
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rates", default="1000,5000,20000")
+    ap.add_argument("--seconds", type=float, default=3.0)
+    ap.add_argument("--calls", type=int, default=100)
+    ap.add_argument("--rows", type=int, default=200_000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'store':>12} {'target/s':>9} {'achieved/s':>11} {'append p50':>11} {'append p99':>11} "
+              f"{'tick lag p99':>13} {'max':>8}")
+        for rate in (int(r) for r in args.rates.split(",")):
+            for name, make in (("write-behind", lambda p: EventStore(p)), ("inline", InlineStore)):
+                path = os.path.join(tmp, f"{name}-{rate}.sqlite3")
+                store = make(path)
+                r = asyncio.run(paced(store, rate, args.seconds, args.calls))
+                store.close()
+                print(f"{name:>12} {rate:>9} {r['achieved']:>11.0f} {r['append_p50'] * 1e6:>9.1f}µs "
+                      f"{r['append_p99'] * 1e6:>9.1f}µs {r['lag_p99'] * 1e3:>11.2f}ms {r['lag_max'] * 1e3:>6.1f}ms")
+
+        rate, store = flood(os.path.join(tmp, "flood.sqlite3"), args.rows, args.calls)
+        print(f"\nsustained: {args.rows} events committed at {rate:,.0f} events/s "
+              f"({store.batches} batches)")
+        sids = [f"CA{i:032x}" for i in range(args.calls)]
+        for label, query in (("GET /calls/{sid}/events", lambda sid: store.call(sid)),
+                             ("/ws?callSid=..&history=50", lambda sid: store.recent([sid], limit=50)),
+                             ("/ws?history=50 (all calls)", lambda sid: store.recent(limit=50))):
+            times = []
+            for sid in sids:
+                t0 = time.perf_counter()
+                query(sid)
+                times.append(time.perf_counter() - t0)
+            times.sort()
+            print(f"{label:>28}: p50 {times[len(times) // 2] * 1e3:.2f} ms, "
+                  f"p99 {times[int(len(times) * 0.99)] * 1e3:.2f} ms "
+                  f"({args.rows // args.calls} events per call)")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
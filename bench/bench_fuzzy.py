@@ -0,0 +1,148 @@
+"""
+Recall and latency of fuzzy vs. exact keyword matching on noisy transcripts.
+
+Builds a corpus of ASR-style corruptions of fraud and ordinary sentences:
+acronyms spelled out as letters or letter names ("kay why see"),
+phonetic respellings ("kard", "verifikashun", "paas word"), and single
+character slips in long words. Ground truth is what exact matching finds
+in the clean sentence. Reports keyword recall on the noisy fraud text,
+keywords invented on ordinary text, and per-segment matching cost with
+the shipped dictionary and a padded one (cold and warm token cache).
+
+    python -m bench.bench_fuzzy --variants 20 --sizes 25,10000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from bench.bench_classifier import BENIGN, FRAUD
+from bench.bench_keywords import document
+from stt.fuzzy import LETTER_NAMES
+from stt.keywords import KeywordSnapshot, load_entries, parse_entries
+from stt.classifier import SEED_CORPUS
+from stt.matcher import tokenize
+
+SCRIPTS = [
+    "sir please share the otp you just received to complete your kyc update",
+    "your upi pin is needed for the bank verification right now",
+    "madam read me the cvv and the expiry on your credit card",
+    "this is urgent your account will be blocked unless you send money immediately",
+    "we need your account number and debit card for the account verification",
+    "a government penalty is pending, transfer money today to avoid it",
+    "tell me the one time password and the secret code from the sms",
+    "kyc verification karna hai, otp batao turant",
+]
+
+SPOKEN = {letter: [name for name, ch in LETTER_NAMES.items() if ch == letter]
+          for letter in "abcdefghijklmnopqrstuvwxyz"}
+RESPELL = [("c", "k"), ("k", "c"), ("ph", "f"), ("tion", "shun"), ("ee", "i"),
+           ("v", "w"), ("ss", "s"), ("ou", "u"), ("y", "i"), ("i", "ee")]
+
+
+def corpus() -> tuple[list[str], list[str]]:
+    fraud, benign = list(SCRIPTS) + list(FRAUD), list(BENIGN)
+    with open(SEED_CORPUS, encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            (fraud if row["fraud"] else benign).append(row["text"])
+    return fraud, benign
+
+
+def corrupt(text: str, vocab: set[str], rng: random.Random, rate: float) -> str:
+    """One ASR-style mishearing of ``text``; keyword words are hit at ``rate``."""
+    out = []
+    for tok in tokenize(text):
+        p = rate if tok in vocab else rate / 4
+        if rng.random() >= p:
+            out.append(tok)
+        elif len(tok) <= 4 and tok.isalpha() and tok.isascii() and rng.random() < 0.6:
+            out.extend(rng.choice(SPOKEN[ch] or [ch]) if rng.random() < 0.5 else ch for ch in tok)
+        else:
+            rules = [(a, b) for a, b in RESPELL if a in tok]
+            if rules:
+                a, b = rng.choice(rules)
+                out.append(tok.replace(a, b, 1))
+            elif len(tok) >= 6:
+                i = rng.randrange(1, len(tok) - 1)
+                out.append(tok[:i] + tok[i + 1:])
+            else:
+                out.append(tok)
+    return " ".join(out)
+
+
+def quality(exact, fuzzy, fraud, benign, variants, rate, seed=0):
+    rng = random.Random(seed)
+    vocab = {t for kw in exact.weights for t in tokenize(kw)}
+    rows = {"exact": [0, 0, 0], "fuzzy": [0, 0, 0]}     # found, invented on fraud, invented on benign
+    gold_total = 0
+    for text in fraud:
+        gold = set(exact.matcher.keywords_in(text))
+        for _ in range(variants):
+            noisy = corrupt(text, vocab, rng, rate)
+            gold_total += len(gold)
+            for name, snap in (("exact", exact), ("fuzzy", fuzzy)):
+                found = set(snap.matcher.keywords_in(noisy))
+                rows[name][0] += len(found & gold)
+                rows[name][1] += len(found - gold)
+    benign_texts = 0
+    for text in benign:
+        gold = set(exact.matcher.keywords_in(text))
+        for noisy in [text] + [corrupt(text, vocab, rng, rate) for _ in range(variants)]:
+            benign_texts += 1
+            for name, snap in (("exact", exact), ("fuzzy", fuzzy)):
+                rows[name][2] += len(set(snap.matcher.keywords_in(noisy)) - gold)
+    print(f"{len(fraud)} fraud / {len(benign)} ordinary sentences x {variants} noisy variants "
+          f"(keyword words misheard at {rate:.0%}), {gold_total} keyword occurrences")
+    print(f"{'matching':>9} {'recall':>8} {'extra/fraud':>12} {'invented/ordinary':>18}")
+    for name, (found, extra, invented) in rows.items():
+        print(f"{name:>9} {found / gold_total:>8.1%} {extra / (len(fraud) * variants):>12.3f} "
+              f"{invented / benign_texts:>18.3f}")
+
+
+def latency(snapshot, segments: list[str]) -> tuple[float, float, float]:
+    """(cold p50, warm p50, warm p99) µs to stream one final segment."""
+    def run():
+        times = []
+        for text in segments:
+            stream = snapshot.matcher.stream()
+            t0 = time.perf_counter()
+            stream.feed(text, is_final=True)
+            times.append(time.perf_counter() - t0)
+        return sorted(times)
+    cold, warm = run(), run()
+    return (cold[len(cold) // 2] * 1e6, warm[len(warm) // 2] * 1e6,
+            warm[int(len(warm) * 0.99)] * 1e6)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--variants", type=int, default=20)
+    ap.add_argument("--rate", type=float, default=0.5)
+    ap.add_argument("--sizes", default="25,10000")
+    args = ap.parse_args()
+
+    entries = load_entries()
+    exact, fuzzy = KeywordSnapshot(entries), KeywordSnapshot(entries, fuzzy=True)
+    fraud, benign = corpus()
+    quality(exact, fuzzy, fraud, benign, args.variants, args.rate)
+
+    rng = random.Random(1)
+    vocab = {t for kw in exact.weights for t in tokenize(kw)}
+    segments = [corrupt(t, vocab, rng, args.rate) for t in fraud + benign for _ in range(5)]
+    print(f"\nper segment ({len(segments)} noisy segments, ~{sum(map(len, segments)) // len(segments)} chars)")
+    print(f"{'entries':>8} {'matching':>9} {'build ms':>9} {'cold p50 µs':>12} "
+          f"{'warm p50 µs':>12} {'warm p99 µs':>12}")
+    for size in (int(n) for n in args.sizes.split(",")):
+        entries = parse_entries(document(size))
+        for name, fz in (("exact", False), ("fuzzy", True)):
+            t0 = time.perf_counter()
+            snap = KeywordSnapshot(entries, fuzzy=fz)
+            build = (time.perf_counter() - t0) * 1e3
+            cold, warm, p99 = latency(snap, segments)
+            print(f"{len(entries):>8} {name:>9} {build:>9.1f} {cold:>12.1f} {warm:>12.1f} {p99:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: does a slow Twilio hangup stall the other live calls?
+
+A fake Twilio server answers after ``--delay`` seconds. While one hangup is
+in flight, ``--calls`` simulated calls each handle a 20 ms media frame
+tick; we record how late each tick runs. The old path (synchronous SDK
+request on the event loop) is compared with CallController. The fake
+server runs on its own loop in a thread, so the blocking request stalls
+the calls but can still be answered.
+
+    python -m bench.bench_hangup --calls 100 --delay 1.5
+"""
+
+import argparse
+import asyncio
+import contextlib
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client
+
+from bench.fake_twilio import FakeTwilioServer
+from call_control import CallController, make_async_client
+
+FRAME = 0.020
+
+
+class RebasedSyncHttpClient(TwilioHttpClient):
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        super().__init__(timeout=timeout)
+        self.base_url = base_url
+
+    def request(self, method, url, *args, **kwargs):
+        return super().request(method, self.base_url + urlsplit(url).path, *args, **kwargs)
+
+
+@contextlib.contextmanager
+def twilio_in_thread(delay: float):
+    """FakeTwilioServer on its own event loop, out of reach of a blocked caller."""
+    ready, box = threading.Event(), {}
+
+    async def serve():
+        async with FakeTwilioServer(delay=delay) as server:
+            box["server"], box["loop"], box["stop"] = server, asyncio.get_running_loop(), asyncio.Event()
+            ready.set()
+            await box["stop"].wait()
+
+    thread = threading.Thread(target=asyncio.run, args=(serve(),), name="fake-twilio", daemon=True)
+    thread.start()
+    ready.wait()
+    try:
+        yield box["server"]
+    finally:
+        box["loop"].call_soon_threadsafe(box["stop"].set)
+        thread.join()
+
+
+async def call_loop(lags: list[float], stop: asyncio.Event):
+    """One live call: a media frame every 20 ms, recording scheduling lag."""
+    deadline = time.perf_counter()
+    while not stop.is_set():
+        deadline += FRAME
+        await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+        lags.append(time.perf_counter() - deadline)
+
+
+async def run(mode: str, calls: int, delay: float) -> list[float]:
+    with twilio_in_thread(delay) as server:
+        lags: list[float] = []
+        stop = asyncio.Event()
+        loops = [asyncio.create_task(call_loop(lags, stop)) for _ in range(calls)]
+        await asyncio.sleep(0.2)
+
+        if mode == "sync":
+            client = Client("ACxxx", "token", http_client=RebasedSyncHttpClient(server.base_url))
+            client.calls("CA0").update(twiml="<Response><Hangup/></Response>")
+        else:
+            controller = CallController(make_async_client("ACxxx", "token", base_url=server.base_url))
+            for _ in range(5):                    # repeated detections → one request
+                controller.hangup("CA0")
+            await asyncio.sleep(delay + 0.2)
+            await controller.close()
+
+        await asyncio.sleep(0.2)
+        stop.set()
+        await asyncio.gather(*loops)
+        print(f"  hangup requests seen by fake Twilio: {len(server.hangups)}")
+        return lags
+
+
+def pct(values, q):
+    return statistics.quantiles(values, n=100)[q - 1] * 1e3
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=100)
+    ap.add_argument("--delay", type=float, default=1.5)
+    args = ap.parse_args()
+
+    for mode in ("sync", "async"):
+        print(f"{mode}:")
+        lags = asyncio.run(run(mode, args.calls, args.delay))
+        print(f"  frame lag p50={pct(lags, 50):.1f} ms  p99={pct(lags, 99):.1f} ms  "
+              f"max={max(lags) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
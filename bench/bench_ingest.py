@@ -0,0 +1,85 @@
+"""
+Throughput benchmark: Twilio media frames/sec per core.
+
+Compares the original forward_audio loop (json.loads + b64decode + one STT
+send per 20 ms frame) with MediaIngest batching into chunks.
+
+    python -m bench.bench_ingest --frames 200000
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+
+from media import FRAME_BYTES, MediaIngest
+
+
+def twilio_frames(n: int) -> list[str]:
+    audio = os.urandom(FRAME_BYTES)
+    return [
+        json.dumps({
+            "event": "media",
+            "sequenceNumber": str(i + 2),
+            "media": {"track": "inbound", "chunk": str(i + 1),
+                      "timestamp": str(i * 20), "payload": base64.b64encode(audio).decode()},
+            "streamSid": "MZ00000000000000000000000000000000",
+        }, separators=(",", ":"))
+        for i in range(n)
+    ]
+
+
+class Sink:
+    def __init__(self):
+        self.sends = 0
+        self.bytes = 0
+
+    async def send(self, data: bytes):
+        self.sends += 1
+        self.bytes += len(data)
+
+
+async def original(frames, sink):
+    for msg in frames:
+        data = json.loads(msg)
+        payload = data.get("media", {}).get("payload")
+        if not payload:
+            continue
+        pcm = base64.b64decode(payload)
+        await sink.send(pcm)
+
+
+async def batched(frames, sink, chunk_ms):
+    ingest = MediaIngest(chunk_ms)
+    for msg in frames:
+        chunk = ingest.feed(msg)
+        if chunk:
+            await sink.send(chunk)
+    tail = ingest.flush()
+    if tail:
+        await sink.send(tail)
+
+
+def bench(label, coro_fn, frames):
+    sink = Sink()
+    t0 = time.process_time()
+    asyncio.run(coro_fn(frames, sink))
+    cpu = time.process_time() - t0
+    print(f"{label:>16}: {len(frames) / cpu:>12,.0f} frames/s/core  "
+          f"{sink.sends:>7} sends  {sink.bytes:>10} bytes")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--frames", type=int, default=200_000)
+    args = ap.parse_args()
+    frames = twilio_frames(args.frames)
+    bench("original", original, frames)
+    for chunk_ms in (100, 160, 250):
+        bench(f"batched {chunk_ms} ms", lambda f, s, c=chunk_ms: batched(f, s, c), frames)
+
+
+if __name__ == "__main__":
+    main()
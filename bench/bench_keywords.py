@@ -0,0 +1,102 @@
+"""
+Keyword dictionary reloads: compile cost and event-loop impact.
+
+Compiles snapshots of the shipped dictionary padded with synthetic
+entries (each with three variants) and reports compile time and size.
+Then runs a 10 ms "media tick" on the event loop while the largest
+dictionary is replaced ``--reloads`` times through KeywordDictionary,
+showing how far reloads stall live calls.
+
+    python -m bench.bench_keywords --sizes 25,1000,10000 --reloads 5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import string
+import tempfile
+import time
+from pathlib import Path
+
+from stt.keywords import CATEGORIES, DEFAULT_PATH, KeywordDictionary, KeywordSnapshot, parse_entries
+
+TRANSCRIPT = ("hello sir I am calling from your bank, your khata band ho jayega today, "
+              "please share the ek baar ka password so we can stop the sarkari jurmana")
+
+
+def document(size: int, seed: int = 0) -> dict:
+    """The shipped dictionary plus synthetic entries up to ``size``."""
+    rng = random.Random(seed)
+    data = json.loads(DEFAULT_PATH.read_text(encoding="utf-8"))
+    taken = set()
+
+    def phrase():
+        while True:
+            p = " ".join("".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8)))
+                         for _ in range(rng.randint(1, 3)))
+            if p not in taken:
+                taken.add(p)
+                return p
+
+    while len(data["keywords"]) < size:
+        data["keywords"].append({"keyword": phrase(), "weight": round(rng.uniform(0.05, 0.9), 2),
+                                 "category": rng.choice(CATEGORIES),
+                                 "variants": [phrase() for _ in range(3)]})
+    return data
+
+
+async def reload_under_load(data: dict, reloads: int) -> tuple[list[float], list[float]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "keywords.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        dictionary = KeywordDictionary(path)
+        lags, swaps = [], []
+        stop = asyncio.Event()
+
+        async def ticker():
+            deadline = time.perf_counter()
+            while not stop.is_set():
+                deadline += 0.010
+                await asyncio.sleep(max(0.0, deadline - time.perf_counter()))
+                lags.append(time.perf_counter() - deadline)
+
+        tick = asyncio.create_task(ticker())
+        for _ in range(reloads):
+            t0 = time.perf_counter()
+            await dictionary.replace(data)
+            swaps.append(time.perf_counter() - t0)
+        stop.set()
+        await tick
+        return lags, swaps
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="25,1000,10000")
+    ap.add_argument("--reloads", type=int, default=5)
+    args = ap.parse_args()
+    sizes = [int(n) for n in args.sizes.split(",")]
+
+    print(f"{'entries':>8} {'phrases':>8} {'parse':>9} {'compile':>9}")
+    for size in sizes:
+        data = document(size)
+        t0 = time.perf_counter()
+        entries = parse_entries(data)
+        t1 = time.perf_counter()
+        snapshot = KeywordSnapshot(entries)
+        t2 = time.perf_counter()
+        phrases = sum(1 + len(e.variants) for e in entries)
+        print(f"{len(entries):>8} {phrases:>8} {(t1 - t0) * 1e3:>7.1f}ms {(t2 - t1) * 1e3:>7.1f}ms")
+    print("matches:", snapshot.matcher.keywords_in(TRANSCRIPT))
+
+    lags, swaps = asyncio.run(reload_under_load(document(sizes[-1]), args.reloads))
+    lags.sort()
+    print(f"\n{args.reloads} reloads of {sizes[-1]} entries: {sum(swaps) / len(swaps) * 1e3:.0f} ms each "
+          f"(parse, compile and save in a thread)")
+    print(f"10 ms tick lag meanwhile: p50 {lags[len(lags) // 2] * 1e3:.2f} ms, "
+          f"p99 {lags[int(len(lags) * 0.99)] * 1e3:.2f} ms, max {lags[-1] * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
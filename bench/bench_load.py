@@ -0,0 +1,365 @@
+"""
+End-to-end load test of main.py with no Twilio or Deepgram account.
+
+Starts the fake Deepgram (own process) and Twilio REST servers, runs
+main.py under uvicorn in a subprocess pointed at them and then ramps
+through ``--ramp`` stages of concurrent calls. The calls are spread over
+``--workers`` replay processes; each call is a FakeMediaClient replaying
+a recording into /media, and each worker watches its calls on a /ws
+dashboard. The fake Deepgram answers every call with the scripted scam
+conversation, so every call should end in a hangup, which stops its
+replay as Twilio would.
+
+Per stage it reports:
+  * frame sent → transcript on the dashboard, the latency a user sees
+  * frame sent → hangup reaching Twilio, for the audio that tipped the call
+  * the server's own /metrics histograms over the stage
+  * server CPU and peak RSS (sampled from /proc, so Linux only)
+  * audio sent to STT per track: with ``--tracks both`` each call also
+    streams a passenger side (talk/pause) that the server transcribes
+    per ``--passenger`` (off | speech | full) but never scores
+  * the load generator's own CPU and how many frames it sent late, so a
+    saturated bench host is not mistaken for a slow server; an evicted
+    dashboard on a busy host means the replay worker, not the server,
+    fell behind
+
+    python -m bench.bench_load --ramp 25,100,200,400 --seconds 15
+    python -m bench.bench_load --audio scam.wav --audio call.ulaw --speed 2
+    python -m bench.bench_load --ramp 50 --tracks both --passenger speech
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import httpx
+from websockets.asyncio.client import connect
+
+from bench.fake_deepgram import FakeDeepgramServer, default_script
+from bench.fake_media import (FRAME_S, FakeMediaClient, conversation, frame_payloads,
+                              load_mulaw, sent_time, tone)
+from bench.fake_twilio import FakeTwilioServer
+from metrics import Histogram
+
+ROOT = Path(__file__).resolve().parents[1]
+SERVER_HISTOGRAMS = {
+    "fraud_frame_to_stt_send_seconds":      "frame→send",
+    "fraud_stt_send_to_transcript_seconds": "send→transcript",
+    "fraud_transcript_to_verdict_seconds":  "transcript→verdict",
+    "fraud_verdict_to_hangup_seconds":      "verdict→hangup",
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def pct(samples: list[float], q: float) -> float:
+    if not samples:
+        return float("nan")
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def ms(samples: list[float], qs=(0.5, 0.95, 0.99)) -> str:
+    return "/".join(f"{pct(samples, q) * 1000:.0f}" for q in qs) if samples else "-"
+
+
+class ProcSampler:
+    """CPU % and RSS of one process, read from /proc every ``interval``."""
+
+    def __init__(self, pid: int, interval: float = 0.25):
+        self.pid = pid
+        self.interval = interval
+        self.tick = os.sysconf("SC_CLK_TCK")
+        self.page = os.sysconf("SC_PAGE_SIZE")
+        self.cpu: list[float] = []
+        self.rss: list[int] = []
+
+    def _read(self) -> tuple[float, int]:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{self.pid}/statm") as f:
+            rss = int(f.read().split()[1]) * self.page
+        return (int(fields[11]) + int(fields[12])) / self.tick, rss
+
+    async def run(self):
+        cpu, _ = self._read()
+        wall = time.perf_counter()
+        while True:
+            await asyncio.sleep(self.interval)
+            now_cpu, rss = self._read()
+            now = time.perf_counter()
+            self.cpu.append((now_cpu - cpu) / (now - wall) * 100)
+            self.rss.append(rss)
+            cpu, wall = now_cpu, now
+
+
+def parse_histograms(text: str) -> dict[str, list[int]]:
+    """Per-bucket (not cumulative) counts of the server histograms we report."""
+    cumulative: dict[str, list[int]] = {}
+    for line in text.splitlines():
+        name, _, rest = line.partition("_bucket{")
+        if name in SERVER_HISTOGRAMS:
+            cumulative.setdefault(name, []).append(int(rest.rsplit(" ", 1)[1]))
+    return {name: [c - p for c, p in zip(counts, [0] + counts[:-1])]
+            for name, counts in cumulative.items()}
+
+
+def stt_bytes(text: str) -> dict[str, float]:
+    """Audio bytes sent to STT so far, per track."""
+    sent = {}
+    for line in text.splitlines():
+        if line.startswith('fraud_stt_audio_bytes_total{track="'):
+            track, _, value = line[35:].partition('"} ')
+            sent[track] = float(value)
+    return sent
+
+
+def server_quantiles(before: dict, after: dict) -> str:
+    parts = []
+    for name, label in SERVER_HISTOGRAMS.items():
+        hist = Histogram(name, "")
+        hist.counts = [a - b for a, b in zip(after.get(name, []), before.get(name, []))]
+        hist.count = sum(hist.counts)
+        if hist.count:
+            parts.append(f"{label} {hist.quantile(0.5) * 1000:.1f}/{hist.quantile(0.99) * 1000:.1f}")
+    return ", ".join(parts) + " ms (p50/p99)"
+
+
+async def wait_ready(http: httpx.AsyncClient, server: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with {server.returncode}")
+        try:
+            if (await http.get("/")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not come up")
+
+
+# ─── Load generator (runs in worker processes) ────────────────────────────────
+
+_payloads: list[list[str]] = []
+_outbound: list[str] | None = None
+
+
+def _init_replay(payloads: list[list[str]], outbound: list[str] | None = None):
+    global _payloads, _outbound
+    _payloads, _outbound = payloads, outbound
+
+
+def replay(base: str, calls: list[tuple[str, int, float]], speed: float, settle: float) -> list[dict]:
+    """Replay ``(callSid, recording, start delay)`` calls and collect what they saw."""
+    return asyncio.run(_replay(base, calls, speed, settle))
+
+
+async def _replay(base, calls, speed, settle):
+    clients = {sid: FakeMediaClient(f"{base}/media", sid, _payloads[rec], speed, outbound=_outbound)
+               for sid, rec, _ in calls}
+    seen: dict[str, list[tuple]] = {sid: [] for sid in clients}
+
+    async def watch(ws):
+        async for msg in ws:
+            event = json.loads(msg)
+            sid = event["callSid"]
+            if sid not in seen or event.get("speaker") == "passenger":
+                continue
+            seen[sid].append((time.perf_counter(), event["transcript"], event["is_final"],
+                              event["risk_level"]))
+            if event["risk_level"] == "hangup":
+                clients[sid].hung_up.set()          # Twilio ends the stream once hung up
+
+    async def start(client: FakeMediaClient, delay: float):
+        await asyncio.sleep(delay)
+        await client.run()
+
+    cpu = time.process_time()
+
+    # This worker's own dashboard, subscribed to just its calls
+    query = "&".join(f"callSid={sid}" for sid in clients)
+    async with connect(f"{base}/ws?{query}", max_size=None) as ws:
+        watcher = asyncio.create_task(watch(ws))
+        await asyncio.gather(*(start(clients[sid], delay) for sid, _, delay in calls))
+        await asyncio.sleep(settle)
+        lost = watcher.done()                       # evicted as a slow consumer
+        watcher.cancel()
+    cpu = time.process_time() - cpu
+    return [{"callSid": sid, "sent_at": c.sent_at, "late": sum(d > FRAME_S for d in c.late),
+             "refused": c.refused, "error": c.error, "events": seen[sid], "lost": lost,
+             "cpu": cpu if i == 0 else 0.0}
+            for i, (sid, c) in enumerate(clients.items())]
+
+
+def serve_deepgram(port: int, handshake: float, delay: float):
+    """The fake Deepgram, in its own process so it doesn't compete with the replay."""
+    async def serve():
+        async with FakeDeepgramServer(handshake_delay=handshake, result_delay=delay, port=port):
+            await asyncio.Future()
+    asyncio.run(serve())
+
+
+# ─── Coordinator ──────────────────────────────────────────────────────────────
+
+async def run_stage(stage: int, calls: int, args, n_recordings: int, script_at: dict,
+                    twilio: FakeTwilioServer, http: httpx.AsyncClient, pids: tuple[int, int], pool):
+    plan = [(f"CA{stage:02d}{i:030x}", i % n_recordings, args.stagger * i / calls)
+            for i in range(calls)]
+    base = f"ws://127.0.0.1:{args.port}"
+    loop = asyncio.get_running_loop()
+
+    text = (await http.get("/metrics")).text
+    before, sent_before = parse_histograms(text), stt_bytes(text)
+    server, deepgram = ProcSampler(pids[0]), ProcSampler(pids[1])
+    sampling = [asyncio.create_task(server.run()), asyncio.create_task(deepgram.run())]
+    t0 = time.perf_counter()
+    shares = await asyncio.gather(*(
+        loop.run_in_executor(pool, replay, base, plan[w::args.workers], args.speed, args.settle)
+        for w in range(min(args.workers, calls))))
+    elapsed = time.perf_counter() - t0
+    for task in sampling:
+        task.cancel()
+    text = (await http.get("/metrics")).text
+    after, to_stt = parse_histograms(text), stt_bytes(text)
+    to_stt = {track: n - sent_before.get(track, 0.0) for track, n in to_stt.items()}
+
+    hangup_at = {r["call_sid"]: r["received"] for r in twilio.requests}
+    results = [r for share in shares for r in share]
+    dashboard, hangups = [], []
+    for r in results:
+        tipped = None
+        for received, transcript, is_final, level in r["events"]:
+            at = script_at.get((transcript, is_final))
+            sent = sent_time(r["sent_at"], at) if at is not None else None
+            if sent is None:
+                continue
+            dashboard.append(received - sent)
+            if tipped is None and level == "hangup":
+                tipped = sent
+        if tipped is not None and r["callSid"] in hangup_at:
+            hangups.append(hangup_at[r["callSid"]] - tipped)
+
+    frames = sum(len(r["sent_at"]) for r in results)
+    late = sum(r["late"] for r in results)
+    print(f"{calls:>5} calls  {sum(r['refused'] for r in results):>3} refused  "
+          f"{sum(r['error'] is not None for r in results):>3} errors  "
+          f"{sum(r['callSid'] in hangup_at for r in results):>4} hung up  "
+          f"{frames / elapsed:>6.0f} frames/s  dashboard {ms(dashboard):>12} ms  "
+          f"hangup {ms(hangups, (0.5, 0.99)):>9} ms  "
+          f"server CPU {statistics.fmean(server.cpu or [0]):3.0f}%/{max(server.cpu or [0]):3.0f}%  "
+          f"RSS {max(server.rss or [0]) / 2**20:4.0f} MiB"
+          + ("  (dashboard evicted)" if any(r["lost"] for r in results) else ""))
+    print(f"{'':>11}server: {server_quantiles(before, after)}")
+    audio_s = frames * FRAME_S
+    print(f"{'':>11}audio to STT: " + ", ".join(
+        f"{track} {n / 8000:.0f} s ({n / 8000 / audio_s:.0%} of caller audio)"
+        for track, n in sorted(to_stt.items())))
+    print(f"{'':>11}load generator: fake Deepgram CPU {statistics.fmean(deepgram.cpu or [0]):.0f}%, "
+          f"replay CPU {sum(r['cpu'] for r in results) / elapsed * 100:.0f}%, "
+          f"late frames {late / max(frames, 1):.1%}")
+
+
+async def wait_port(port: int, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def main_async(args):
+    audio = [load_mulaw(p) for p in args.audio] or [tone(args.seconds)]
+    payloads = [frame_payloads(a) for a in audio]
+    longest = max(len(p) for p in payloads) * FRAME_S
+    outbound = frame_payloads(conversation(longest)) if args.tracks == "both" else None
+    script_at = {(item["transcript"], item["is_final"]): item["at"] for item in default_script()}
+    ramp = [int(n) for n in args.ramp.split(",")]
+    args.port = args.port or free_port()
+    spawn = multiprocessing.get_context("spawn")
+
+    dg_port = free_port()
+    deepgram = spawn.Process(target=serve_deepgram, daemon=True,
+                             args=(dg_port, args.dg_handshake, args.dg_delay))
+    deepgram.start()
+    await wait_port(dg_port)
+
+    async with FakeTwilioServer(delay=args.twilio_delay) as twilio:
+        env = dict(os.environ,
+                   TWILIO_ACCOUNT_SID="AC" + "0" * 32, TWILIO_AUTH_TOKEN="bench",
+                   TWILIO_NUMBER="+15550000001", PASSENGER_NUMBER="+15550000002",
+                   DEEPGRAM_API_KEY="bench", PUBLIC_DOMAIN="localhost",
+                   DEEPGRAM_API_BASE=f"ws://127.0.0.1:{dg_port}",
+                   TWILIO_API_BASE=twilio.base_url, STT_BACKEND="deepgram",
+                   MAX_CALLS=str(args.max_calls or max(ramp)),
+                   DG_POOL_SIZE=str(args.dg_pool), LOG_LEVEL="WARNING", FRAUD_LLM="",
+                   MEDIA_TRACKS=args.tracks, PASSENGER_AUDIO=args.passenger, EVENT_STORE_PATH="")
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+             "--port", str(args.port), "--log-level", "warning"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL if args.quiet else None)
+        try:
+            with ProcessPoolExecutor(args.workers, mp_context=spawn,
+                                     initializer=_init_replay, initargs=(payloads, outbound)) as pool:
+                async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}") as http:
+                    await wait_ready(http, server)
+                    print(f"{len(audio)} recording(s), {len(payloads[0]) * FRAME_S:.0f} s each at "
+                          f"{args.speed or 'max'}x from {args.workers} worker(s); Deepgram result "
+                          f"delay {args.dg_delay * 1000:.0f} ms, Twilio delay "
+                          f"{args.twilio_delay * 1000:.0f} ms; tracks {args.tracks}"
+                          + (f" (passenger: {args.passenger})" if outbound else "")
+                          + "; latencies p50/p95/p99")
+                    for stage, calls in enumerate(ramp):
+                        await run_stage(stage, calls, args, len(payloads), script_at,
+                                        twilio, http, (server.pid, deepgram.pid), pool)
+        finally:
+            server.terminate()      # it still talks to our fake Twilio: wait without blocking it
+            await asyncio.to_thread(server.wait, 10)
+            deepgram.terminate()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--ramp", default="10,50,100,200",
+                    help="concurrent calls per stage, comma separated")
+    ap.add_argument("--audio", action="append", default=[],
+                    help="WAV or raw mu-law recording to replay (repeatable)")
+    ap.add_argument("--seconds", type=float, default=15.0, help="synthetic audio length")
+    ap.add_argument("--speed", type=float, default=1.0, help="replay pace; 0 = unpaced")
+    ap.add_argument("--stagger", type=float, default=2.0, help="seconds over which calls start")
+    ap.add_argument("--settle", type=float, default=1.0, help="wait after the last call ends")
+    ap.add_argument("--dg-delay", type=float, default=0.05)
+    ap.add_argument("--dg-handshake", type=float, default=0.0)
+    ap.add_argument("--dg-pool", type=int, default=2)
+    ap.add_argument("--twilio-delay", type=float, default=0.05)
+    ap.add_argument("--max-calls", type=int, default=0, help="server MAX_CALLS (default: top of ramp)")
+    ap.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                    help="replay processes")
+    ap.add_argument("--tracks", choices=("inbound", "both"), default="inbound",
+                    help="server MEDIA_TRACKS; both also streams a passenger side")
+    ap.add_argument("--passenger", choices=("off", "speech", "full"), default="speech",
+                    help="server PASSENGER_AUDIO (with --tracks both)")
+    ap.add_argument("--port", type=int, default=0)
+    ap.add_argument("--quiet", action="store_true", help="hide the server's log output")
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: per-transcript keyword scan cost vs. dictionary size.
+
+Compares the old per-keyword substring loop against the shared
+KeywordMatcher for 24 → 10k+ keywords, then compares rescanning every
+interim revision against the per-call StreamingMatcher.
+
+    python -m bench.bench_matcher
+"""
+
+import random
+import string
+import timeit
+
+from stt.matcher import KeywordMatcher
+
+BASE_KEYWORDS = [
+    "otp", "one time password", "ek baar ka password",
+    "account number", "bank account",
+    "debit card", "credit card",
+    "upi pin", "upi password",
+    "send money", "transfer money",
+    "bank verification", "account verification",
+    "kyc update", "kyc verification",
+    "government penalty", "fine", "penalty",
+    "urgent", "emergency", "immediately",
+    "password", "pin", "secret code",
+]
+
+TRANSCRIPT = (
+    "hello sir I am calling from your bank, there is an urgent problem with "
+    "your account verification, please share the one time password we just "
+    "sent so we can stop the government penalty on your debit card"
+)
+
+
+def synthetic_keywords(n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    extra = []
+    while len(BASE_KEYWORDS) + len(extra) < n:
+        words = rng.randint(1, 3)
+        extra.append(" ".join(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9)))
+            for _ in range(words)
+        ))
+    return BASE_KEYWORDS + extra
+
+
+def naive(keywords, text):
+    text_lower = text.lower()
+    return [kw for kw in keywords if kw in text_lower]
+
+
+def main():
+    print(f"{'keywords':>9} {'naive µs':>10} {'matcher µs':>11}")
+    for n in (24, 100, 1_000, 10_000, 50_000):
+        keywords = synthetic_keywords(n)
+        matcher = KeywordMatcher(keywords)
+        loops = 2_000
+        t_naive = timeit.timeit(lambda: naive(keywords, TRANSCRIPT), number=loops // 10) / (loops // 10)
+        t_match = timeit.timeit(lambda: matcher.keywords_in(TRANSCRIPT), number=loops) / loops
+        print(f"{n:>9} {t_naive * 1e6:>10.1f} {t_match * 1e6:>11.1f}")
+
+
+def interim_revisions(words: int) -> list[str]:
+    """Deepgram-style interims: the hypothesis grows one word at a time."""
+    tokens = (TRANSCRIPT.split() * (words // 30 + 1))[:words]
+    return [" ".join(tokens[:i]) for i in range(1, words + 1)]
+
+
+def streaming():
+    matcher = KeywordMatcher(synthetic_keywords(1_000))
+    print(f"\n{'words/utt':>9} {'rescan ms':>10} {'stream ms':>10}")
+    for words in (25, 50, 100, 200, 400):
+        revisions = interim_revisions(words)
+
+        def rescan():
+            for text in revisions:
+                matcher.keywords_in(text)
+
+        def stream():
+            s = matcher.stream()
+            for text in revisions[:-1]:
+                s.feed(text)
+            s.feed(revisions[-1], is_final=True)
+
+        t_rescan = timeit.timeit(rescan, number=20) / 20
+        t_stream = timeit.timeit(stream, number=20) / 20
+        print(f"{words:>9} {t_rescan * 1e3:>10.2f} {t_stream * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
+    streaming()
@@ -0,0 +1,88 @@
+"""
+Microphone coverage and per-stage latency: sequential loop vs. FraudPipeline.
+
+Runs with local stubs instead of the Groq client, so no network or
+microphone is needed. Recording is simulated in real time (scaled by
+``--speed``); the stubs sleep for the configured Whisper / LLM latency.
+
+    python -m bench.bench_pipeline --seconds 30 --speed 5
+"""
+
+import argparse
+import asyncio
+import time
+
+from stt.pipeline import FraudPipeline
+
+
+class StubGroq:
+    """Stand-in for the two Groq calls ll.py makes."""
+
+    def __init__(self, transcribe_s: float, classify_s: float):
+        self.transcribe_s = transcribe_s
+        self.classify_s = classify_s
+
+    def transcribe(self, audio: bytes) -> str:
+        time.sleep(self.transcribe_s)
+        return "please share the one time password to avoid the penalty"
+
+    def classify(self, text: str) -> tuple[bool, float]:
+        time.sleep(self.classify_s)
+        return True, 0.9
+
+
+def sequential(stub, record_s, duration):
+    """The old main_loop: record, then transcribe, then classify."""
+    heard, t0 = 0.0, time.monotonic()
+    while time.monotonic() - t0 < duration:
+        time.sleep(record_s)
+        heard += record_s
+        stub.classify(stub.transcribe(b""))
+        time.sleep(0.1)
+    return heard / (time.monotonic() - t0)
+
+
+def pipelined(stub, record_s, duration):
+    heard = 0.0
+
+    def capture(emit, stop):
+        nonlocal heard
+        while not stop.is_set():
+            time.sleep(record_s)
+            heard += record_s
+            emit(b"")
+
+    pipeline = FraudPipeline(stub.transcribe, stub.classify, lambda *a: None)
+
+    async def main():
+        try:
+            await asyncio.wait_for(pipeline.run(capture), duration)
+        except asyncio.TimeoutError:
+            pass
+
+    t0 = time.monotonic()
+    asyncio.run(main())
+    coverage = heard / (time.monotonic() - t0)
+    return coverage, pipeline.report()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=30.0, help="simulated run time")
+    ap.add_argument("--speed", type=float, default=5.0, help="time compression")
+    ap.add_argument("--transcribe", type=float, default=0.8, help="Whisper latency (s)")
+    ap.add_argument("--classify", type=float, default=1.2, help="LLM latency (s)")
+    args = ap.parse_args()
+
+    k = 1 / args.speed
+    stub = StubGroq(args.transcribe * k, args.classify * k)
+    record_s, duration = 5.0 * k, args.seconds * k
+
+    print(f"sequential: mic coverage {sequential(stub, record_s, duration):.0%}")
+    coverage, report = pipelined(stub, record_s, duration)
+    print(f"pipelined:  mic coverage {coverage:.0%}  (stage times scaled by 1/{args.speed:g})")
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
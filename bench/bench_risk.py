@@ -0,0 +1,81 @@
+"""
+Per-event update cost and per-call memory of the risk engine.
+
+Opens ``--calls`` concurrent CallRisk states, measures their memory with
+tracemalloc, then drives ``--events`` random STT events (one in twenty
+carries keywords, every fourth is a final with a model verdict) across them in
+time order and reports the cost per update. Two short scripted calls
+show the thresholds at work.
+
+    python -m bench.bench_risk --calls 10000 --events 1000000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from stt.classifier import KEYWORD_CATEGORIES, MODEL, Verdict
+from stt.risk import LEVELS, RiskEngine
+
+
+def scripted(engine: RiskEngine):
+    honest = [(0, ["urgent"]), (20, []), (45, ["fine"]), (90, ["emergency"])]
+    scam = [(0, ["bank verification"]), (8, ["urgent"]), (15, ["otp"]), (22, ["otp"])]
+    for name, events in (("honest call", honest), ("scam call", scam)):
+        risk = engine.open(name, 0.0)
+        for t, keywords in events:
+            update = risk.observe(float(t), keywords)
+            print(f"  {name:<12} t={t:>3}s {','.join(keywords) or '-':<18} "
+                  f"risk {update.score:4.2f} {LEVELS[update.level]}")
+        engine.close(name)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=10_000)
+    ap.add_argument("--events", type=int, default=1_000_000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+    rng = random.Random(args.seed)
+
+    engine = RiskEngine()
+    print("thresholds:", engine.policy.alert_at, "alert,", engine.policy.hangup_at, "hangup")
+    scripted(engine)
+
+    sids = [f"CA{i:032x}" for i in range(args.calls)]
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    states = [engine.open(sid, 0.0) for sid in sids]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(s.size_diff for s in after.compare_to(before, "filename"))
+    print(f"\n{args.calls} calls: {size / 1024:.0f} KiB total, {size / args.calls:.0f} B per call "
+          f"(state + registry entry, excluding the callSid strings)")
+
+    keywords = list(KEYWORD_CATEGORIES)
+    events = []
+    for i in range(args.events):
+        kws = [] if rng.random() < 0.95 else rng.sample(keywords, rng.choice((1, 1, 2)))
+        verdict = Verdict(rng.random() < 0.1, rng.random(), MODEL, tuple(kws)) if i % 4 == 0 else None
+        events.append((rng.randrange(args.calls), kws, verdict))
+
+    t0 = time.perf_counter()
+    for i, (call, kws, verdict) in enumerate(events):
+        now = i * 0.001
+        if verdict is None:
+            states[call].observe(now, kws)
+        else:
+            states[call].observe_verdict(now, verdict)
+    elapsed = time.perf_counter() - t0
+
+    levels = [0, 0, 0]
+    for state in states:
+        levels[state.level] += 1
+    print(f"{args.events} updates in {elapsed:.2f} s: {elapsed / args.events * 1e9:.0f} ns per event, "
+          f"{args.events / elapsed / 1e6:.2f} M events/s")
+    print("final levels:", {LEVELS[i]: n for i, n in enumerate(levels)})
+
+
+if __name__ == "__main__":
+    main()
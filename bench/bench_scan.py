@@ -0,0 +1,170 @@
+"""
+Throughput and resume of the offline archive scan (stt/scan.py).
+
+Writes an archive of synthetic recordings (16-bit PCM WAV at 8/16 kHz,
+mono and stereo, mu-law WAV and raw .ulaw). Each ``--window`` of audio
+is a pure tone whose pitch selects a sentence from the classifier
+bench's fraud and ordinary corpora. The stub engine reads that pitch
+back with an FFT and burns ``--rtf`` CPU seconds per audio second, so
+the run exercises file decoding, the pool, keyword matching,
+classification and risk scoring with a known ground truth and a
+Whisper-like cost.
+
+It first scans the archive and interrupts itself after half the files,
+then resumes. Then it does full scans at each ``--workers`` count and
+reports files/hour and audio-hours per CPU-hour.
+
+    python -m bench.bench_scan --files 40 --workers 1,2 --rtf 0.01
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from bench.bench_classifier import BENIGN, FRAUD
+from stt.audio import pcm16_to_mulaw
+from stt.backends import WHISPER_RATE
+from stt.scan import WAVE_MULAW, run
+
+SENTENCES = FRAUD + BENIGN
+BASE_HZ, STEP_HZ = 300.0, 40.0
+
+
+def tone_engine(rtf: float | str = 0.01):
+    """Transcriber stub: window pitch → sentence, at ``rtf`` CPU s per audio s."""
+    rtf = float(rtf)
+
+    def transcribe(samples: np.ndarray) -> str:
+        spectrum = np.abs(np.fft.rfft(samples))
+        hz = np.argmax(spectrum) * WHISPER_RATE / len(samples)
+        burn = time.process_time() + rtf * len(samples) / WHISPER_RATE
+        while time.process_time() < burn:
+            pass
+        i = int(round((hz - BASE_HZ) / STEP_HZ))
+        return SENTENCES[i] if 0 <= i < len(SENTENCES) else ""
+
+    return transcribe
+
+
+def synth(sentences: list[int], window_s: float, rate: int) -> np.ndarray:
+    t = np.arange(int(window_s * rate)) / rate
+    return np.concatenate([(np.sin(2 * np.pi * (BASE_HZ + STEP_HZ * i) * t) * 0.3 * 32767).astype(np.int16)
+                           for i in sentences])
+
+
+def write_wav(path: Path, pcm: np.ndarray, rate: int, channels: int = 1):
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(np.repeat(pcm, channels).tobytes())
+
+
+def write_mulaw_wav(path: Path, pcm: np.ndarray):
+    data = pcm16_to_mulaw(pcm)
+    fmt = (1).to_bytes(2, "little")
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + (4 + 26 + 8 + len(data)).to_bytes(4, "little") + b"WAVE")
+        f.write(b"fmt " + (18).to_bytes(4, "little") + WAVE_MULAW.to_bytes(2, "little") + fmt
+                + (8000).to_bytes(4, "little") + (8000).to_bytes(4, "little") + fmt
+                + (8).to_bytes(2, "little") + (0).to_bytes(2, "little"))
+        f.write(b"data" + len(data).to_bytes(4, "little") + data)
+
+
+def archive(root: Path, files: int, window_s: float, seed: int = 0) -> dict[str, bool]:
+    """Write the recordings; returns path → whether it is a scam call."""
+    rng = random.Random(seed)
+    truth = {}
+    for n in range(files):
+        # Ordinary talk doesn't repeat a sentence (or its stray "urgent") all call long
+        windows = rng.randint(6, len(BENIGN))
+        script = [len(FRAUD) + i for i in rng.sample(range(len(BENIGN)), windows)]
+        scam = rng.random() < 0.3
+        if scam:
+            at = rng.randrange(windows - 3)
+            script[at:at + 3] = rng.sample(range(len(FRAUD)), 3)
+        kind = n % 5
+        if kind == 0:
+            path = root / f"call{n:04d}.ulaw"
+            path.write_bytes(pcm16_to_mulaw(synth(script, window_s, 8000)))
+        elif kind == 1:
+            path = root / f"call{n:04d}-mulaw.wav"
+            write_mulaw_wav(path, synth(script, window_s, 8000))
+        else:
+            rate, channels = [(8000, 1), (16000, 1), (8000, 2)][kind - 2]
+            path = root / f"call{n:04d}.wav"
+            write_wav(path, synth(script, window_s, rate), rate, channels)
+        truth[str(path)] = scam
+    return truth
+
+
+def accuracy(report: str, truth: dict[str, bool]) -> str:
+    rows = {}
+    with open(report, encoding="utf-8") as f:
+        for line in f:
+            row = json.loads(line)
+            rows[row["path"]] = row
+    scams = {p for p, s in truth.items() if s}
+    line = f"{len(rows)} rows for {len(truth)} files;"
+    # The ordinary corpus is mostly hard negatives ("it is urgent", "credit card bill")
+    for level, reached in (("alert", ("alert", "hangup")), ("hangup", ("hangup",))):
+        at = {p for p, r in rows.items() if r.get("risk_level") in reached}
+        line += (f" {level}: {len(at & scams)}/{len(scams)} scam calls, "
+                 f"{len(at - scams)}/{len(truth) - len(scams)} ordinary;")
+    return line.rstrip(";")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=40)
+    ap.add_argument("--workers", default="1,2")
+    ap.add_argument("--rtf", type=float, default=0.01)
+    ap.add_argument("--window", type=float, default=5.0)
+    args = ap.parse_args()
+    engine = "bench.bench_scan:tone_engine"
+    quiet = lambda line: None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "archive"
+        root.mkdir()
+        truth = archive(root, args.files, args.window)
+        size = sum(os.path.getsize(p) for p in truth) / 1e6
+        print(f"archive: {args.files} recordings, {size:.1f} MB")
+
+        # Interrupted run, then resume from the report
+        report = os.path.join(tmp, "resume.jsonl")
+        seen = []
+
+        def interrupt_halfway(line: str):
+            if line.startswith("["):
+                seen.append(line)
+                if len(seen) == args.files // 2:
+                    raise KeyboardInterrupt
+        first = run([str(root)], report, 1, engine, {"rtf": args.rtf}, window_s=args.window,
+                    log=interrupt_halfway)
+        second = run([str(root)], report, 1, engine, {"rtf": args.rtf}, window_s=args.window, log=quiet)
+        print(f"interrupted after {first['files']} files; resume skipped {second['skipped']}, "
+              f"scanned {second['files']}")
+        print(accuracy(report, truth))
+
+        print(f"\n{'workers':>7} {'files':>6} {'audio h':>8} {'wall s':>7} {'cpu s':>7} "
+              f"{'files/h':>9} {'audio h/cpu h':>14} {'x realtime':>11}")
+        for workers in (int(w) for w in args.workers.split(",")):
+            report = os.path.join(tmp, f"scan-{workers}.jsonl")
+            s = run([str(root)], report, workers, engine, {"rtf": args.rtf}, window_s=args.window,
+                    log=quiet)
+            print(f"{workers:>7} {s['files']:>6} {s['audio_hours']:>8.2f} {s['wall_s']:>7.1f} "
+                  f"{s['cpu_s']:>7.1f} {s['files_per_hour']:>9.0f} {s['audio_h_per_cpu_h']:>14.1f} "
+                  f"{s['realtime_x']:>11.1f}")
+        print(f"(stub engine at {args.rtf} CPU s per audio s; {os.cpu_count()} CPU(s) here)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Memory per call session and registry overhead.
+
+Admits ``--calls`` sessions, each with the per-call state main.py attaches
+(MediaIngest buffer, CallRisk, streaming keyword matcher), feeds every
+one a few seconds of Twilio frames and measures the total with
+tracemalloc. Then releases them all and shows that only ``keep_recent``
+summaries stay behind.
+
+    python -m bench.bench_sessions --calls 1000
+"""
+
+import argparse
+import base64
+import json
+import tracemalloc
+
+from media import MediaIngest
+from sessions import SessionRegistry
+from stt.classifier import KeywordScorer
+from stt.risk import RiskEngine
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=1000)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--chunk-ms", type=int, default=100)
+    args = ap.parse_args()
+
+    matcher = KeywordScorer().matcher
+    risk_engine = RiskEngine()
+    registry = SessionRegistry(max_calls=args.calls, keep_recent=100)
+    frame = json.dumps({"event": "media", "media": {
+        "payload": base64.b64encode(bytes(160)).decode()}})
+    frames = int(args.seconds * 50)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    streams = []
+    for i in range(args.calls):
+        sid = f"CA{i:032x}"
+        session = registry.admit(sid, 8000)
+        session.ingest = MediaIngest(args.chunk_ms)
+        session.risk = risk_engine.open(sid, 0.0)
+        streams.append(matcher.stream())
+        for _ in range(frames):
+            session.ingest.feed(frame)
+        streams[-1].feed("hello this is a perfectly normal call", True)
+    live = tracemalloc.get_traced_memory()[0] - base
+
+    for session in list(registry.active.values()):
+        risk_engine.close(session.call_sid)
+        registry.release(session)
+    streams.clear()
+    after = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    print(f"{args.calls} live sessions: {live / 1024:.0f} KiB, {live / args.calls:.0f} B per call")
+    print(f"after release: {after / 1024:.0f} KiB ({len(registry.recent)} summaries kept, "
+          f"{len(registry.active)} active)")
+    print(f"a registry at MAX_CALLS={args.calls} stays under "
+          f"{(live + after) / 1024 / 1024:.1f} MiB of per-call state")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Local stand-in for Deepgram's live transcription WebSocket.
+
+Accepts binary audio, counts how much has arrived and emits scripted
+``Results`` messages once enough audio has been received, each after
+``result_delay`` seconds. ``handshake_delay`` simulates the TLS/WebSocket
+setup cost of the real service. Like Deepgram, a stream that receives
+neither audio nor a KeepAlive for ``idle_timeout`` seconds is closed
+(1011); CloseStream flushes the remaining script and closes.
+"""
+
+import asyncio
+import json
+
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+SCRIPT_TEXT = (
+    "hello sir I am calling from your bank your account will be blocked today "
+    "please share the one time password we sent you to stop the penalty"
+)
+
+
+def default_script(text: str = SCRIPT_TEXT, words_per_second: float = 2.5,
+                   words_per_final: int = 6) -> list[dict]:
+    """Interims that grow a word at a time, finalized every few words."""
+    words = text.split()
+    script, segment, seg_start = [], [], 0.0
+    for i, word in enumerate(words):
+        segment.append(word)
+        at = (i + 1) / words_per_second
+        is_final = len(segment) == words_per_final or i == len(words) - 1
+        script.append({"at": at, "start": seg_start, "transcript": " ".join(segment),
+                       "is_final": is_final})
+        if is_final:
+            segment, seg_start = [], at
+    return script
+
+
+def result(item: dict) -> str:
+    return json.dumps({
+        "type": "Results",
+        "channel_index": [0, 1],
+        "start": item["start"],
+        "duration": item["at"] - item["start"],
+        "is_final": item["is_final"],
+        "speech_final": item["is_final"],
+        "channel": {"alternatives": [{
+            "transcript": item["transcript"],
+            "confidence": 0.95,
+            "words": [],
+        }]},
+    })
+
+
+class FakeDeepgramServer:
+    def __init__(self, script: list[dict] | None = None, bytes_per_second: int = 8000,
+                 handshake_delay: float = 0.0, result_delay: float = 0.0,
+                 idle_timeout: float | None = 10.0, host: str = "127.0.0.1", port: int = 0):
+        self.script = script if script is not None else default_script()
+        self.bytes_per_second = bytes_per_second
+        self.handshake_delay = handshake_delay
+        self.result_delay = result_delay
+        self.idle_timeout = idle_timeout
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self.audio_bytes = 0
+        self.keepalives = 0
+        self.timeouts = 0             # streams closed for sending nothing in time
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/v1/listen?encoding=mulaw&sample_rate=8000"
+
+    async def start(self):
+        self._server = await serve(self._handle, self.host, self.port,
+                                   process_request=self._process_request)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _process_request(self, connection, request):
+        if self.handshake_delay:
+            await asyncio.sleep(self.handshake_delay)
+        return None
+
+    async def _handle(self, ws):
+        self.connections += 1
+        received, next_item = 0, 0
+        pending: set[asyncio.Task] = set()
+
+        async def emit(item):
+            if self.result_delay:
+                await asyncio.sleep(self.result_delay)
+            try:
+                await ws.send(result(item))
+            except ConnectionClosed:
+                pass
+
+        try:
+            while True:
+                try:
+                    msg = await asyncio.wait_for(ws.recv(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    await ws.close(1011, "Deepgram did not receive audio data or a text "
+                                         "message within the timeout window")
+                    return
+                if isinstance(msg, str):
+                    kind = json.loads(msg).get("type")
+                    if kind == "CloseStream":
+                        await asyncio.gather(*pending, return_exceptions=True)
+                        for item in self.script[next_item:]:
+                            await ws.send(result(item))
+                        break
+                    if kind == "KeepAlive":
+                        self.keepalives += 1
+                    continue
+                received += len(msg)
+                self.audio_bytes += len(msg)
+                heard = received / self.bytes_per_second
+                while next_item < len(self.script) and self.script[next_item]["at"] <= heard:
+                    task = asyncio.create_task(emit(self.script[next_item]))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                    next_item += 1
+        except ConnectionClosed:
+            pass            # the client hung up mid-script
+        finally:
+            for task in pending:
+                task.cancel()
+        await ws.close()
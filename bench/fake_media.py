@@ -0,0 +1,139 @@
+"""
+Local stand-in for Twilio's media-stream client.
+
+Replays a recording into the server's /media WebSocket the way Twilio
+does: ``connected`` and ``start`` events, one compact JSON ``media``
+message per 20 ms mu-law frame, then ``stop``. Pacing is real time scaled
+by ``speed`` (0 sends as fast as the socket allows). The send time of
+every frame is kept, so a transcript covering call time ``t`` can be
+traced back to when its audio left the "phone". Setting ``hung_up`` ends
+the replay early, as Twilio ends the stream of a call that was hung up.
+Given ``outbound`` payloads too, it streams ``both_tracks``: each inbound
+(caller) frame is followed by the outbound (passenger) frame for the same
+20 ms, as Twilio interleaves them.
+
+Recordings may be WAV (16-bit PCM, any rate, mixed down to mono and
+resampled to 8 kHz) or raw 8 kHz mu-law (.ulaw/.mulaw/.ul/.raw).
+"""
+
+import asyncio
+import base64
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed, InvalidStatus
+
+from media import FRAME_BYTES, TWILIO_SAMPLE_RATE
+from stt.audio import pcm16_to_mulaw, resample
+
+FRAME_S = FRAME_BYTES / TWILIO_SAMPLE_RATE
+MULAW_SUFFIXES = {".ulaw", ".mulaw", ".ul", ".raw"}
+
+
+def load_mulaw(path: str | Path) -> bytes:
+    """A recording as 8 kHz mono mu-law, ready to be cut into frames."""
+    path = Path(path)
+    if path.suffix.lower() in MULAW_SUFFIXES:
+        return path.read_bytes()
+    with wave.open(str(path), "rb") as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        rate, channels = wf.getframerate(), wf.getnchannels()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return pcm16_to_mulaw(resample(samples, rate, TWILIO_SAMPLE_RATE))
+
+
+def tone(seconds: float, hz: float = 440.0, level: float = 0.2) -> bytes:
+    """Synthetic mu-law audio for when no recording is given."""
+    t = np.arange(int(seconds * TWILIO_SAMPLE_RATE)) / TWILIO_SAMPLE_RATE
+    return pcm16_to_mulaw((np.sin(2 * np.pi * hz * t) * level * 32767).astype(np.int16))
+
+
+def conversation(seconds: float, talk_s: float = 2.0, pause_s: float = 3.0,
+                 hz: float = 220.0) -> bytes:
+    """Synthetic other side of a call: ``talk_s`` of tone, then ``pause_s`` of silence."""
+    period = tone(talk_s, hz) + b"\xff" * int(pause_s * TWILIO_SAMPLE_RATE)
+    size = int(seconds * TWILIO_SAMPLE_RATE)
+    return (period * (size // len(period) + 1))[:size]
+
+
+def frame_payloads(audio: bytes) -> list[str]:
+    """Base64 payload per 20 ms frame; encode once and share across calls."""
+    audio += b"\xff" * (-len(audio) % FRAME_BYTES)          # pad with mu-law silence
+    return [base64.b64encode(audio[i:i + FRAME_BYTES]).decode()
+            for i in range(0, len(audio), FRAME_BYTES)]
+
+
+def sent_time(sent_at: list[float], call_s: float) -> float | None:
+    """When the frame holding call time ``call_s`` was sent."""
+    i = max(0, int(call_s / FRAME_S - 1e-9))
+    return sent_at[i] if i < len(sent_at) else None
+
+
+class FakeMediaClient:
+    def __init__(self, url: str, call_sid: str, payloads: list[str], speed: float = 1.0,
+                 hung_up: asyncio.Event | None = None, outbound: list[str] | None = None):
+        self.url = url
+        self.call_sid = call_sid
+        self.stream_sid = "MZ" + call_sid[2:]
+        self.payloads = payloads
+        self.outbound = outbound
+        self.speed = speed
+        self.hung_up = hung_up or asyncio.Event()
+        self.sent_at: list[float] = []      # perf_counter per frame sent
+        self.late: list[float] = []         # how far behind schedule each frame went out
+        self.refused = False
+        self._seq = 1                       # sequenceNumber of the last message sent
+        self.error: str | None = None
+
+    def _event(self, seq: int, body: str) -> str:
+        return f'{{"sequenceNumber":"{seq}",{body},"streamSid":"{self.stream_sid}"}}'
+
+    async def run(self):
+        try:
+            async with connect(f"{self.url}?callSid={self.call_sid}") as ws:
+                await ws.send('{"event":"connected","protocol":"Call","version":"1.0.0"}')
+                tracks = '"inbound","outbound"' if self.outbound else '"inbound"'
+                await ws.send(self._event(1, (
+                    f'"event":"start","start":{{"streamSid":"{self.stream_sid}",'
+                    f'"callSid":"{self.call_sid}","tracks":[{tracks}],"mediaFormat":'
+                    '{"encoding":"audio/x-mulaw","sampleRate":8000,"channels":1}}')))
+                await self._stream(ws)
+                await ws.send(self._event(self._seq + 1, (
+                    f'"event":"stop","stop":{{"callSid":"{self.call_sid}"}}')))
+        except InvalidStatus:
+            self.refused = True                 # admission control said no
+        except ConnectionClosed:
+            pass                                # server ended the stream first
+        except OSError as e:
+            self.error = repr(e)
+        return self
+
+    async def _stream(self, ws):
+        step = FRAME_S / self.speed if self.speed else 0.0
+        deadline = time.perf_counter()
+        for i, payload in enumerate(self.payloads):
+            if self.hung_up.is_set():
+                return
+            if step:
+                deadline += step
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.late.append(-delay)
+            self._seq += 1
+            await ws.send(self._event(self._seq, (
+                f'"event":"media","media":{{"track":"inbound","chunk":"{i + 1}",'
+                f'"timestamp":"{i * 20}","payload":"{payload}"}}')))
+            self.sent_at.append(time.perf_counter())
+            if self.outbound and i < len(self.outbound):
+                self._seq += 1
+                await ws.send(self._event(self._seq, (
+                    f'"event":"media","media":{{"track":"outbound","chunk":"{i + 1}",'
+                    f'"timestamp":"{i * 20}","payload":"{self.outbound[i]}"}}')))
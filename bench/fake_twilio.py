@@ -0,0 +1,87 @@
+"""
+Minimal local stand-in for the Twilio REST API.
+
+Speaks just enough HTTP/1.1 (keep-alive, Content-Length bodies) for the
+Twilio SDK's call updates, answers after a configurable delay and records
+every request so benchmarks can check what was hung up.
+"""
+
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs
+
+
+class FakeTwilioServer:
+    def __init__(self, delay: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.delay = delay
+        self.host = host
+        self.port = port
+        self.requests: list[dict] = []
+        self._server: asyncio.base_events.Server | None = None
+        self._handlers: set[asyncio.Task] = set()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def hangups(self) -> list[str]:
+        return [r["call_sid"] for r in self.requests if "Hangup" in r["form"].get("Twiml", "")]
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        for task in list(self._handlers):
+            task.cancel()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    key, _, value = line.decode().partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                form = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+                call_sid = path.split("?")[0].rstrip("/").rsplit("/", 1)[-1].removesuffix(".json")
+                self.requests.append({
+                    "method": method, "path": path, "call_sid": call_sid,
+                    "form": form, "received": time.perf_counter(),
+                })
+
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                payload = json.dumps({"sid": call_sid, "status": "completed"}).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Connection: keep-alive\r\n"
+                    + f"Content-Length: {len(payload)}\r\n\r\n".encode()
+                    + payload
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(task)
+            writer.close()
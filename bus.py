@@ -0,0 +1,188 @@
+"""
+Pub/sub event bus between uvicorn workers.
+
+A call's /media socket and the dashboards watching it may live on
+different workers (or hosts). Every worker publishes transcript and fraud
+events to the bus, and every worker delivers what comes off the bus to its
+own dashboard sockets.
+
+Backends, chosen by URL (EVENT_BUS_URL):
+    memory://                 single process, the default
+    unix:///tmp/fraud.sock    local broker, see ``python -m bus``
+    redis://localhost:6379/0  Redis (or compatible) pub/sub
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Callable
+from urllib.parse import urlsplit
+
+Deliver = Callable[[dict, str | None], None]
+
+CHANNEL = "fraud-events"
+MAX_LINE = 1 << 20                  # largest event accepted by the broker
+MAX_PENDING_BYTES = 4 << 20         # unsent bytes before we start dropping
+
+log = logging.getLogger(__name__)
+
+
+class InMemoryBus:
+    """Delivers straight back to this process."""
+
+    def __init__(self, deliver: Deliver | None = None):
+        self._deliver = deliver
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    async def publish(self, message: dict):
+        self._deliver(message, None)
+
+    async def close(self):
+        pass
+
+
+class UnixSocketBus:
+    """Client of the local broker; reconnects if the broker restarts."""
+
+    def __init__(self, path: str, retry: float = 0.5):
+        self.path = path
+        self.retry = retry
+        self.dropped = 0
+        self._writer: asyncio.StreamWriter | None = None
+        self._connected = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    async def start(self, deliver: Deliver, timeout: float = 5.0):
+        self._deliver = deliver
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            log.warning("⚠️ Event bus broker not reachable, retrying in background",
+                        extra={"path": self.path})
+
+    async def _run(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=MAX_LINE)
+            except OSError:
+                await asyncio.sleep(self.retry)
+                continue
+            self._writer = writer
+            self._connected.set()
+            try:
+                while line := await reader.readline():
+                    text = line.decode().rstrip("\n")
+                    self._deliver(json.loads(text), text)
+            except (ConnectionError, ValueError) as e:
+                log.warning("⚠️ Event bus connection lost", extra={"error": repr(e)})
+            finally:
+                self._connected.clear()
+                self._writer = None
+                writer.close()
+
+    async def publish(self, message: dict):
+        writer = self._writer
+        if writer is None or writer.transport.get_write_buffer_size() > MAX_PENDING_BYTES:
+            self.dropped += 1
+            return
+        writer.write(json.dumps(message).encode() + b"\n")
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class RedisBus:
+    """Redis pub/sub on a single channel. Needs the ``redis`` package."""
+
+    def __init__(self, url: str, channel: str = CHANNEL):
+        self.url = url
+        self.channel = channel
+        self._task: asyncio.Task | None = None
+
+    async def start(self, deliver: Deliver):
+        from redis import asyncio as aioredis
+
+        self._deliver = deliver
+        self._redis = aioredis.from_url(self.url)
+        self._pubsub = self._redis.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._task = asyncio.create_task(self._listen())
+
+    async def _listen(self):
+        async for msg in self._pubsub.listen():
+            if msg["type"] != "message":
+                continue
+            text = msg["data"].decode()
+            self._deliver(json.loads(text), text)
+
+    async def publish(self, message: dict):
+        await self._redis.publish(self.channel, json.dumps(message))
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            await self._pubsub.unsubscribe(self.channel)
+            await self._redis.aclose()
+
+
+def bus_from_url(url: str | None):
+    url = url or "memory://"
+    scheme = urlsplit(url).scheme
+    if scheme == "memory":
+        return InMemoryBus()
+    if scheme == "unix":
+        return UnixSocketBus(urlsplit(url).path)
+    if scheme in ("redis", "rediss"):
+        return RedisBus(url)
+    raise ValueError(f"Unsupported EVENT_BUS_URL: {url}")
+
+
+# ─── Local broker ─────────────────────────────────────────────────────────────
+
+async def serve_broker(path: str) -> asyncio.AbstractServer:
+    """Relay every line from any client to all clients (itself included)."""
+    clients: set[asyncio.StreamWriter] = set()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        clients.add(writer)
+        try:
+            while line := await reader.readline():
+                for w in list(clients):
+                    # A worker that can't keep up loses events, not the others.
+                    if w.transport.get_write_buffer_size() <= MAX_PENDING_BYTES:
+                        w.write(line)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            clients.discard(writer)
+            writer.close()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    return await asyncio.start_unix_server(handle, path, limit=MAX_LINE)
+
+
+async def _main(path: str):
+    server = await serve_broker(path)
+    print(f"📮 Event bus broker listening on {path}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Local event bus broker")
+    ap.add_argument("--path", default="/tmp/fraud-bus.sock")
+    args = ap.parse_args()
+    try:
+        asyncio.run(_main(args.path))
+    except KeyboardInterrupt:
+        pass
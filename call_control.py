@@ -0,0 +1,120 @@
+"""
+Non-blocking Twilio REST calls for the media pipeline.
+
+The Twilio SDK is driven through its aiohttp-based async HTTP client, so
+REST requests share one keep-alive connection pool and never block the
+event loop. CallController adds per-request timeouts, retry with
+exponential backoff, and collapses repeated hangups for the same call
+into a single request.
+"""
+
+import asyncio
+import logging
+import random
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from aiohttp import ClientError
+from twilio.base.exceptions import TwilioRestException
+from twilio.http.async_http_client import AsyncTwilioHttpClient
+from twilio.rest import Client
+
+HANGUP_TWIML = "<Response><Hangup/></Response>"
+
+log = logging.getLogger(__name__)
+
+
+class RebasedHttpClient(AsyncTwilioHttpClient):
+    """Async Twilio HTTP client that sends every request to ``base_url``."""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip("/")
+
+    async def request(self, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        url = self.base_url + parts.path + (f"?{parts.query}" if parts.query else "")
+        return await super().request(method, url, *args, **kwargs)
+
+
+def make_async_client(account_sid: str, auth_token: str,
+                      base_url: str | None = None,
+                      timeout: float = 5.0) -> Client:
+    """Twilio client on a pooled async transport (optionally rebased)."""
+    if base_url:
+        http = RebasedHttpClient(base_url, pool_connections=True, timeout=timeout)
+    else:
+        http = AsyncTwilioHttpClient(pool_connections=True, timeout=timeout)
+    return Client(account_sid, auth_token, http_client=http)
+
+
+def _retryable(exc: BaseException) -> bool:
+    if isinstance(exc, TwilioRestException):
+        return exc.status == 429 or exc.status >= 500
+    return isinstance(exc, (asyncio.TimeoutError, ClientError, OSError))
+
+
+class CallController:
+    """Fire-and-forget call updates with timeouts, retries and hangup dedupe."""
+
+    def __init__(self, client: Client | None = None, timeout: float = 5.0,
+                 retries: int = 3, backoff: float = 0.25,
+                 remember: int = 10_000):
+        self.client = client        # may be set later, once an event loop runs
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._remember = remember
+        self._pending: dict[str, asyncio.Task] = {}
+        self._hung_up: OrderedDict[str, None] = OrderedDict()
+
+    async def update_call(self, call_sid: str, **params):
+        """``calls(sid).update`` with a timeout and backoff on transient errors."""
+        for attempt in range(self.retries + 1):
+            try:
+                return await asyncio.wait_for(
+                    self.client.calls(call_sid).update_async(**params),
+                    self.timeout,
+                )
+            except Exception as exc:
+                if attempt == self.retries or not _retryable(exc):
+                    raise
+                delay = self.backoff * (2 ** attempt)
+                await asyncio.sleep(delay + random.uniform(0, delay))
+
+    def hangup(self, call_sid: str) -> asyncio.Task | None:
+        """
+        Schedule a hangup and return immediately.
+
+        While a hangup for ``call_sid`` is in flight the same task is
+        returned; once it has succeeded further requests are ignored.
+        """
+        if call_sid in self._hung_up:
+            return None
+        task = self._pending.get(call_sid)
+        if task is None:
+            task = asyncio.create_task(self._hangup(call_sid))
+            self._pending[call_sid] = task
+        return task
+
+    async def _hangup(self, call_sid: str) -> bool:
+        """True once Twilio has accepted the hangup."""
+        try:
+            await self.update_call(call_sid, twiml=HANGUP_TWIML)
+        except Exception as exc:
+            log.warning("⚠️ Hangup failed", extra={"callSid": call_sid, "error": repr(exc)})
+            return False
+        else:
+            self._hung_up[call_sid] = None
+            if len(self._hung_up) > self._remember:
+                self._hung_up.popitem(last=False)
+            return True
+        finally:
+            self._pending.pop(call_sid, None)
+
+    async def close(self):
+        """Wait for in-flight requests, then release the connection pool."""
+        if self._pending:
+            await asyncio.gather(*self._pending.values(), return_exceptions=True)
+        if self.client:
+            await self.client.http_client.close()
@@ -0,0 +1,239 @@
+"""
+Dashboard WebSocket fan-out.
+
+Every subscriber gets its own bounded outbound queue drained by its own
+writer task, so one slow or dead browser tab can't hold up the others or
+the STT loop that publishes. Messages are serialized to JSON once and the
+same text is queued for every client.
+
+When a queue is full the oldest droppable message is discarded, interims
+first and then finals. Fraud alerts are never dropped; a client whose
+queue is full of alerts, or whose send doesn't finish in ``send_timeout``,
+is evicted.
+
+Clients subscribe to topics (a callSid or every call, times a message
+kind), and the manager keeps an index from topic to subscribers, so a
+message is only serialized and queued for the clients that asked for it.
+
+``broadcast`` goes through an event bus (see bus.py) so dashboards on any
+worker see events from calls handled by any other worker; ``deliver`` is
+the local fan-out the bus calls back into.
+
+A client may ask for recent history on connect (from event_store.py). It
+is queued ahead of live events, which are held back until the history
+has been read, so the client sees one ordered stream without gaps or
+repeats.
+"""
+
+import asyncio
+import json
+from collections import deque
+from typing import Awaitable
+
+from fastapi import WebSocket
+
+from bus import InMemoryBus
+
+INTERIM, FINAL, FRAUD = "interim", "final", "fraud"
+ALL_CALLS = "*"
+
+
+def message_kind(message: dict) -> str:
+    if message.get("fraud_detected"):
+        return FRAUD
+    return FINAL if message.get("is_final") else INTERIM
+
+
+class Subscription:
+    """Which calls and which message kinds a dashboard wants."""
+
+    __slots__ = ("call_sids", "kinds")
+
+    def __init__(self, call_sids=(), kinds=(INTERIM, FINAL, FRAUD)):
+        self.call_sids = frozenset(call_sids)   # empty means every call
+        self.kinds = frozenset(kinds)
+
+    @classmethod
+    def from_params(cls, call_sids=(), fraud_only: bool = False,
+                    finals_only: bool = False) -> "Subscription":
+        if isinstance(call_sids, str):              # one sid, not its characters
+            call_sids = (call_sids,)
+        if not isinstance(call_sids, (list, tuple, set, frozenset)) or \
+                not all(isinstance(sid, str) for sid in call_sids):
+            raise TypeError("callSids must be a list of call SIDs")
+        if fraud_only:
+            kinds = (FRAUD,)
+        elif finals_only:
+            kinds = (FINAL, FRAUD)
+        else:
+            kinds = (INTERIM, FINAL, FRAUD)
+        return cls(call_sids, kinds)
+
+    def topics(self) -> list[tuple[str, str]]:
+        calls = self.call_sids or (ALL_CALLS,)
+        return [(call, kind) for call in calls for kind in self.kinds]
+
+
+class Subscriber:
+    __slots__ = ("ws", "topics", "queue", "ready", "task", "dropped")
+
+    def __init__(self, ws: WebSocket):
+        self.ws = ws
+        self.topics: list[tuple[str, str]] = []
+        self.queue: deque[tuple[str, str]] = deque()   # (kind, json text)
+        self.ready = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.dropped = 0
+
+
+class ConnectionManager:
+    def __init__(self, max_queue: int = 64, send_timeout: float = 5.0,
+                 drop_order: tuple[str, ...] = (INTERIM, FINAL), bus=None):
+        self.bus = bus or InMemoryBus(self.deliver)    # usable before start()
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.drop_order = drop_order
+        self.subscribers: dict[WebSocket, Subscriber] = {}
+        self.index: dict[tuple[str, str], set[Subscriber]] = {}
+        self.broadcasts = 0
+        self.dropped = 0
+        self.evicted = 0
+        self._closing: set[asyncio.Task] = set()
+
+    @property
+    def connections(self) -> list[WebSocket]:
+        return list(self.subscribers)
+
+    async def connect(self, ws: WebSocket, subscription: Subscription | None = None,
+                      history: Awaitable[list[str]] | None = None):
+        """
+        ``history`` resolves to stored events (JSON text, oldest first) to
+        replay before live ones; live events it already holds are skipped.
+        """
+        await ws.accept()
+        sub = Subscriber(ws)
+        self.subscribers[ws] = sub
+        self.subscribe(ws, subscription or Subscription())
+        if history is not None:
+            texts = await history
+            if self.subscribers.get(ws) is not sub:
+                return                      # gone while the history was read
+            held = set(texts)
+            live = [item for item in sub.queue if item[1] not in held]
+            sub.queue.clear()
+            # Replayed events are expendable like finals, oldest first
+            sub.queue.extend((FINAL, text) for text in texts)
+            sub.queue.extend(live)
+            if sub.queue:
+                sub.ready.set()
+        sub.task = asyncio.create_task(self._writer(sub))
+
+    def subscribe(self, ws: WebSocket, subscription: Subscription):
+        """Replace a connected client's subscription."""
+        sub = self.subscribers.get(ws)
+        if sub is None:
+            return
+        self._unindex(sub)
+        sub.topics = subscription.topics()
+        for topic in sub.topics:
+            self.index.setdefault(topic, set()).add(sub)
+
+    def _unindex(self, sub: Subscriber):
+        for topic in sub.topics:
+            subs = self.index.get(topic)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self.index[topic]
+        sub.topics = []
+
+    def disconnect(self, ws: WebSocket):
+        sub = self.subscribers.pop(ws, None)
+        if sub is None:
+            return
+        self._unindex(sub)
+        if sub.task is not None and sub.task is not asyncio.current_task():
+            sub.task.cancel()
+
+    async def start(self):
+        await self.bus.start(self.deliver)
+
+    async def close(self):
+        await self.bus.close()
+
+    async def broadcast(self, message: dict):
+        """Publish ``message`` to dashboards on every worker via the bus."""
+        self.broadcasts += 1
+        await self.bus.publish(message)
+
+    def deliver(self, message: dict, text: str | None = None):
+        """Queue ``message`` for local subscribers; never waits on a socket."""
+        kind = message_kind(message)
+        targets = self.index.get((message.get("callSid"), kind), set())
+        everyone = self.index.get((ALL_CALLS, kind))
+        if everyone:
+            targets = targets | everyone
+        if not targets:
+            return
+        if text is None:
+            text = json.dumps(message)
+        for sub in list(targets):
+            self._enqueue(sub, kind, text)
+
+    def _enqueue(self, sub: Subscriber, kind: str, text: str):
+        queue = sub.queue
+        if len(queue) >= self.max_queue and not self._make_room(sub, kind):
+            if kind == FRAUD:
+                # Full of undelivered alerts: the client isn't keeping up.
+                self._evict(sub)
+                return
+            sub.dropped += 1
+            self.dropped += 1
+            return
+        queue.append((kind, text))
+        sub.ready.set()
+
+    def _make_room(self, sub: Subscriber, incoming: str) -> bool:
+        """Drop the oldest message of the most expendable kind, if allowed."""
+        order = self.drop_order
+        # Never discard a more important message to make room for a lesser one.
+        limit = order.index(incoming) + 1 if incoming in order else len(order)
+        for kind in order[:limit]:
+            for i, (queued_kind, _) in enumerate(sub.queue):
+                if queued_kind == kind:
+                    del sub.queue[i]
+                    sub.dropped += 1
+                    self.dropped += 1
+                    return True
+        return False
+
+    async def _writer(self, sub: Subscriber):
+        queue, ws = sub.queue, sub.ws
+        try:
+            while True:
+                if not queue:
+                    sub.ready.clear()
+                    await sub.ready.wait()
+                _, text = queue.popleft()
+                await asyncio.wait_for(ws.send_text(text), self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._evict(sub)
+
+    def _evict(self, sub: Subscriber):
+        """Drop a stuck client now; close its socket in the background."""
+        if self.subscribers.get(sub.ws) is not sub:
+            return
+        self.evicted += 1
+        self.disconnect(sub.ws)
+        task = asyncio.create_task(self._close(sub.ws))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _close(ws: WebSocket):
+        try:
+            await asyncio.wait_for(ws.close(code=1013), 1.0)
+        except Exception:
+            pass
@@ -0,0 +1,234 @@
+"""
+Pre-warmed Deepgram streaming connections.
+
+Opening a Deepgram socket costs a TLS + WebSocket handshake, and the first
+words of a scam call matter most. DeepgramPool keeps ``size`` connections
+open and idle (with KeepAlive messages so Deepgram doesn't time them out),
+hands one to each call as soon as it arrives and refills in the
+background.
+
+STTSession wraps the connection for one call. If the stream drops
+mid-call it checks out a new one, replays the last ``resume_ms`` of audio
+and shifts result timestamps so they stay on the call's timeline.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+import websockets
+
+KEEPALIVE = json.dumps({"type": "KeepAlive"})
+CLOSE_STREAM = json.dumps({"type": "CloseStream"})
+
+log = logging.getLogger(__name__)
+
+
+class DeepgramPool:
+    def __init__(self, url: str, size: int = 2, keepalive: float = 5.0,
+                 max_idle: float = 300.0, **connect_kwargs):
+        self.url = url
+        self.size = size
+        self.keepalive = keepalive
+        self.max_idle = max_idle
+        self.connect_kwargs = connect_kwargs
+        self.hits = 0          # calls served from a warm connection
+        self.misses = 0        # calls that had to connect on demand
+        self._idle: deque[tuple[float, object]] = deque()   # (opened_at, ws)
+        self._wanted = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        self._tasks = [asyncio.create_task(self._refill()),
+                       asyncio.create_task(self._keepalive())]
+        self._wanted.set()
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        while self._idle:
+            _, ws = self._idle.popleft()
+            await ws.close()
+
+    async def _connect(self):
+        return await websockets.connect(self.url, **self.connect_kwargs)
+
+    async def acquire(self):
+        """A ready connection: warm if one is idle, otherwise a fresh one."""
+        self._wanted.set()
+        while self._idle:
+            _, ws = self._idle.popleft()
+            if _is_open(ws):
+                self.hits += 1
+                return ws
+        self.misses += 1
+        return await self._connect()
+
+    def session(self, bytes_per_second: int, resume_ms: int = 2000) -> "STTSession":
+        return STTSession(self, bytes_per_second, resume_ms)
+
+    async def _refill(self):
+        backoff = 0.5
+        while True:
+            await self._wanted.wait()
+            self._wanted.clear()
+            while len(self._idle) < self.size:
+                try:
+                    ws = await self._connect()
+                except (OSError, websockets.WebSocketException) as e:
+                    log.warning("⚠️ Deepgram pre-connect failed", extra={"error": repr(e)})
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 30.0)
+                    continue
+                backoff = 0.5
+                self._idle.append((time.monotonic(), ws))
+
+    async def _keepalive(self):
+        """Health-check idle connections; drop dead or stale ones."""
+        while True:
+            await asyncio.sleep(self.keepalive)
+            now = time.monotonic()
+            for _ in range(len(self._idle)):
+                opened, ws = self._idle.popleft()
+                try:
+                    if now - opened > self.max_idle:
+                        raise TimeoutError("idle too long")
+                    await ws.send(KEEPALIVE)
+                except Exception:
+                    await _close_quietly(ws)
+                    self._wanted.set()
+                    continue
+                self._idle.append((opened, ws))
+
+
+def _is_open(ws) -> bool:
+    state = getattr(ws, "state", None)
+    return getattr(state, "name", "OPEN") == "OPEN"
+
+
+async def _close_quietly(ws):
+    try:
+        await ws.close()
+    except Exception:
+        pass
+
+
+class STTSession:
+    """One call's Deepgram stream, with reconnect-and-resume."""
+
+    def __init__(self, pool: DeepgramPool, bytes_per_second: int,
+                 resume_ms: int = 2000, max_reconnects: int = 3):
+        self.pool = pool
+        self.bytes_per_second = bytes_per_second
+        self.max_reconnects = max_reconnects
+        self.reconnects = 0
+        self.opened_at = 0.0
+        self.first_transcript_at: float | None = None
+        self._ws = None
+        self._gen = 0
+        self._lock = asyncio.Lock()
+        self._finished = False
+        self._sent = 0                   # audio bytes sent on this call
+        self._offset = 0.0               # call time at which the current stream starts
+        self._recent: deque[bytes] = deque()
+        self._recent_bytes = 0
+        self._resume_bytes = bytes_per_second * resume_ms // 1000
+
+    @property
+    def ttft(self) -> float | None:
+        """Seconds from checkout to the first non-empty transcript."""
+        if self.first_transcript_at is None:
+            return None
+        return self.first_transcript_at - self.opened_at
+
+    async def __aenter__(self):
+        self.opened_at = time.perf_counter()
+        self._ws = await self.pool.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self._finished = True
+        await _close_quietly(self._ws)
+
+    async def send(self, chunk: bytes):
+        self._remember(chunk)
+        gen = self._gen
+        try:
+            await self._ws.send(chunk)
+        except websockets.ConnectionClosed:
+            # The reconnect replays recent audio, this chunk included.
+            if not await self._reconnect(gen):
+                raise
+
+    async def finish(self):
+        """Ask Deepgram to flush pending results and close the stream."""
+        self._finished = True
+        try:
+            await self._ws.send(CLOSE_STREAM)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def keepalive(self):
+        """Hold the stream open through a pause in the audio (Deepgram drops it after ~10 s)."""
+        try:
+            await self._ws.send(KEEPALIVE)
+        except websockets.ConnectionClosed:
+            pass                        # the results loop reconnects
+
+    def _remember(self, chunk: bytes):
+        self._sent += len(chunk)
+        self._recent.append(chunk)
+        self._recent_bytes += len(chunk)
+        recent = self._recent
+        while len(recent) > 1 and self._recent_bytes - len(recent[0]) >= self._resume_bytes:
+            self._recent_bytes -= len(recent.popleft())
+
+    async def _reconnect(self, gen: int) -> bool:
+        async with self._lock:
+            if gen != self._gen:
+                return True                     # the other side already did it
+            if self._finished or self.reconnects >= self.max_reconnects:
+                return False
+            self.reconnects += 1
+            await _close_quietly(self._ws)
+            self._ws = await self.pool.acquire()
+            self._gen += 1
+            # Replay recent audio so words at the break aren't lost.
+            self._offset = (self._sent - self._recent_bytes) / self.bytes_per_second
+            for chunk in self._recent:
+                await self._ws.send(chunk)
+            return True
+
+    def __aiter__(self):
+        return self._results()
+
+    async def _results(self):
+        """Deepgram ``Results`` messages, parsed, on the call's timeline."""
+        while True:
+            gen, ws = self._gen, self._ws
+            try:
+                async for msg in ws:
+                    res = json.loads(msg)
+                    if res.get("type", "Results") != "Results":
+                        continue
+                    if self._offset:
+                        _shift(res, self._offset)
+                    if (self.first_transcript_at is None
+                            and res["channel"]["alternatives"][0]["transcript"].strip()):
+                        self.first_transcript_at = time.perf_counter()
+                    yield res
+            except websockets.ConnectionClosed:
+                pass
+            if self._finished or not await self._reconnect(gen):
+                return
+
+
+def _shift(res: dict, offset: float):
+    res["start"] = res.get("start", 0.0) + offset
+    for alt in res["channel"]["alternatives"]:
+        for word in alt.get("words", ()):
+            word["start"] += offset
+            word["end"] += offset
@@ -0,0 +1,190 @@
+"""
+Durable, append-only log of dashboard events (transcripts and alerts).
+
+Everything ``receive_stt`` broadcasts is also appended here, so a
+dashboard that reconnects can replay what it missed and an investigator
+can read a call back afterwards. Storage is one SQLite table in WAL mode,
+indexed by (callSid, ts) and by ts:
+
+    events(id, ts, call_sid, kind, body)     body: the JSON text broadcast
+
+Writes are write-behind: ``append`` only puts the message on a queue and
+one background thread serializes, batches (up to ``batch_size`` events or
+``flush_interval`` seconds) and commits them in a single transaction. The
+STT loop never waits on the disk. Readers use their own connection, which
+WAL lets run alongside the writer. Rows older than ``retention_s`` are
+pruned by the writer once an hour.
+
+Several workers may share one file: each appends the events of the calls
+it handles, and SQLite serializes their commits.
+"""
+
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from typing import Iterable
+
+from connections import FINAL, FRAUD, INTERIM, message_kind
+
+log = logging.getLogger(__name__)
+
+PRUNE_EVERY_S = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id       INTEGER PRIMARY KEY,
+    ts       REAL NOT NULL,
+    call_sid TEXT NOT NULL,
+    kind     TEXT NOT NULL,
+    body     TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_call ON events (call_sid, ts);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+"""
+
+
+class EventStore:
+    def __init__(self, path: str, kinds: Iterable[str] = (FINAL, FRAUD),
+                 batch_size: int = 500, flush_interval: float = 0.2,
+                 retention_s: float = 30 * 86400, read_timeout: float = 2.0):
+        """
+        Only messages of ``kinds`` are kept; interims are superseded by
+        their final within seconds, so by default they are not. Reads
+        wait at most ``read_timeout`` seconds for pending writes.
+        """
+        self.path = path
+        self.kinds = frozenset(kinds)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_s = retention_s
+        self.read_timeout = read_timeout
+        self.appended = self.written = self.batches = self.errors = 0
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._lock = threading.Lock()           # guards the read connection
+        self._reader = self._connect()
+        self._writer = threading.Thread(target=self._run, name="event-store", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")     # WAL: durable at checkpoint, never corrupt
+        db.executescript(_SCHEMA)
+        return db
+
+    # ── writing ──────────────────────────────────────────────────────────────
+
+    def append(self, message: dict):
+        """Queue a broadcast message for storage; never blocks."""
+        if message_kind(message) in self.kinds:
+            self.appended += 1
+            self._queue.put(message)
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until everything appended so far is committed."""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _settle(self):
+        """Before a read: wait (bounded) for pending writes to commit."""
+        if not self.flush(self.read_timeout):
+            log.warning("⚠️ Event store behind; reading what is committed", extra={
+                "pending": self._queue.qsize(), "timeout_s": self.read_timeout})
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            self._reader.close()
+
+    def _run(self):
+        db = self._connect()
+        next_prune = time.monotonic()
+        stop = False
+        while not stop:
+            batch, waiters = [], []
+            item = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if stop or waiters or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                self._write(db, batch)
+            if time.monotonic() >= next_prune:
+                self._prune(db)
+                next_prune = time.monotonic() + PRUNE_EVERY_S
+            for done in waiters:
+                done.set()
+        db.close()
+
+    def _write(self, db: sqlite3.Connection, batch: list[dict]):
+        rows = [(m.get("ts") or time.time(), m.get("callSid") or "", message_kind(m), json.dumps(m))
+                for m in batch]
+        try:
+            with db:
+                db.executemany("INSERT INTO events (ts, call_sid, kind, body) VALUES (?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            self.errors += len(rows)
+            log.error("💥 Event store write failed", extra={"events": len(rows), "error": repr(e)})
+            return
+        self.written += len(rows)
+        self.batches += 1
+
+    def _prune(self, db: sqlite3.Connection):
+        try:
+            with db:
+                db.execute("DELETE FROM events WHERE ts < ?", (time.time() - self.retention_s,))
+        except sqlite3.Error as e:
+            log.warning("⚠️ Event store prune failed", extra={"error": repr(e)})
+
+    # ── reading (blocking: call through asyncio.to_thread) ───────────────────
+
+    def recent(self, call_sids: Iterable[str] = (), kinds: Iterable[str] = (INTERIM, FINAL, FRAUD),
+               limit: int = 100, since: float | None = None) -> list[str]:
+        """
+        The last ``limit`` stored events (JSON text, oldest first) for
+        ``call_sids`` (empty: every call) of ``kinds``, optionally only
+        those after ``since``. Includes everything appended before the call,
+        unless the writer is more than ``read_timeout`` behind.
+        """
+        self._settle()
+        call_sids, kinds = list(call_sids), list(kinds)
+        where = [f"kind IN ({','.join('?' * len(kinds))})"]
+        args: list = kinds
+        if call_sids:
+            where.append(f"call_sid IN ({','.join('?' * len(call_sids))})")
+            args += call_sids
+        if since is not None:
+            where.append("ts > ?")
+            args.append(since)
+        sql = (f"SELECT body FROM (SELECT id, ts, body FROM events WHERE {' AND '.join(where)} "
+               f"ORDER BY ts DESC, id DESC LIMIT ?) ORDER BY ts, id")
+        with self._lock:
+            return [body for (body,) in self._reader.execute(sql, (*args, limit))]
+
+    def call(self, call_sid: str) -> list[dict]:
+        """Every stored event of one call, oldest first."""
+        self._settle()
+        with self._lock:
+            rows = self._reader.execute(
+                "SELECT body FROM events WHERE call_sid = ? ORDER BY ts, id", (call_sid,)).fetchall()
+        return [json.loads(body) for (body,) in rows]
+
+    def stats(self) -> dict:
+        return {"appended": self.appended, "written": self.written,
+                "batches": self.batches, "errors": self.errors, "pending": self._queue.qsize()}
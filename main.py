@@ -1,16 +1,34 @@
 import os
+import hmac
 import json
 import asyncio
-import base64
+import contextlib
+import logging
+import time
 
-from fastapi import FastAPI, WebSocket, Query
+from fastapi import FastAPI, Header, HTTPException, WebSocket, WebSocketDisconnect, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, Response
 from twilio.twiml.voice_response import VoiceResponse
-from twilio.rest import Client
-import websockets
 from dotenv import load_dotenv
 
+from bus import bus_from_url
+from call_control import CallController, make_async_client
+from connections import ConnectionManager, Subscription
+from dg_pool import DeepgramPool
+from event_store import EventStore
+from log import setup_logging
+from media import (INBOUND, OUTBOUND, MediaIngest, SpeechGate, TWILIO_ENCODING, TWILIO_SAMPLE_RATE,
+                   media_track)
+from metrics import Registry
+from sessions import AdmissionError, SessionRegistry
+from stt.backends import create_backend
+from stt.cache import ContentCache, cached_classifier
+from stt.classifier import KeywordScorer, Thresholds, TieredClassifier, groq_llm
+from stt.keywords import DEFAULT_PATH as DEFAULT_KEYWORDS_PATH, KeywordDictionary
+from stt.risk import ALERT, HANGUP, LEVELS, CallRisk, RiskEngine, RiskPolicy
+from stt.stability import CONFIRMED, POLICIES as STABILITY_POLICIES, SUSPECTED, HitStability
+
 # ─── 1) Load & validate environment ─────────────────────────────────────────────
 
 load_dotenv()  # read .env
@@ -20,8 +38,53 @@ TWILIO_AUTH_TOKEN  = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_NUMBER      = os.getenv("TWILIO_NUMBER")
 PASSENGER_NUMBER   = os.getenv("PASSENGER_NUMBER")
 DG_API_KEY         = os.getenv("DEEPGRAM_API_KEY")
+DG_API_BASE        = os.getenv("DEEPGRAM_API_BASE", "wss://api.deepgram.com")
 DOMAIN             = os.getenv("PUBLIC_DOMAIN")  
 #   e.g. abcd1234.ngrok.io or your real HTTPS domain
+TWILIO_API_BASE    = os.getenv("TWILIO_API_BASE")   # optional, e.g. a local fake
+MEDIA_CHUNK_MS     = int(os.getenv("MEDIA_CHUNK_MS", "100"))  # audio per STT send
+MEDIA_TRACKS       = os.getenv("MEDIA_TRACKS", "inbound")
+#   inbound: the caller only; both: the passenger too, on its own track (never scored)
+PASSENGER_AUDIO    = os.getenv("PASSENGER_AUDIO", "speech")
+#   with MEDIA_TRACKS=both, how much of the passenger to transcribe: off | speech | full
+STT_KEEPALIVE_S    = float(os.getenv("STT_KEEPALIVE_S", "5"))
+#   KeepAlive interval on the passenger stream while its gate holds back silence
+EVENT_BUS_URL      = os.getenv("EVENT_BUS_URL", "memory://")
+#   memory:// (one worker), unix:///tmp/fraud-bus.sock or redis://host:6379/0
+STT_BACKEND        = os.getenv("STT_BACKEND", "deepgram")
+#   deepgram | groq | whisper | whisper-batched
+DG_POOL_SIZE       = int(os.getenv("DG_POOL_SIZE", "2"))   # warm Deepgram sockets
+MAX_CALLS          = int(os.getenv("MAX_CALLS", "100"))    # concurrent monitored calls
+LOG_LEVEL          = os.getenv("LOG_LEVEL", "INFO")        # DEBUG logs every transcript
+KEYWORDS_PATH      = os.getenv("KEYWORDS_PATH", str(DEFAULT_KEYWORDS_PATH))
+#   fraud keyword dictionary (JSON); edits and PUT /keywords apply without a restart
+KEYWORDS_EDIT_PATH = os.getenv("KEYWORDS_EDIT_PATH", "fraud_keywords.local.json")
+#   where PUT /keywords saves; preferred over KEYWORDS_PATH once it exists
+ADMIN_TOKEN        = os.getenv("ADMIN_TOKEN", "")
+#   bearer token for PUT /keywords; unset = keyword edits over HTTP are disabled
+CORS_ORIGINS       = os.getenv("CORS_ORIGINS", "*").split(",")  # dashboard origins
+KEYWORDS_RELOAD_S  = float(os.getenv("KEYWORDS_RELOAD_S", "5"))  # 0 = don't watch the file
+KEYWORD_MATCHING   = os.getenv("KEYWORD_MATCHING", "fuzzy")
+#   fuzzy: also catch misheard / spelled-out keywords ("kay why see"); exact: as written
+EARLY_ALERT        = os.getenv("EARLY_ALERT", "stable")
+#   stable: warn while interim keyword hits hold ("suspected"), hang up once they
+#   settle or reach a final ("confirmed"); interim: act on any interim; final: finals only
+FRAUD_LLM          = os.getenv("FRAUD_LLM", "")   # "groq": uncertain finals go to the LLM
+LLM_CACHE_PATH     = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")  # persisted verdicts
+EVENT_STORE_PATH   = os.getenv("EVENT_STORE_PATH", "events.sqlite3")
+#   transcripts + alerts kept for replay and review; empty = don't keep them
+EVENT_RETENTION_D  = float(os.getenv("EVENT_RETENTION_DAYS", "30"))
+MAX_REPLAY         = int(os.getenv("MAX_REPLAY", "500"))   # most events a /ws client may replay
+RISK_POLICY        = RiskPolicy(
+    half_life_s=float(os.getenv("RISK_HALF_LIFE_S", "30")),
+    alert_at=float(os.getenv("RISK_ALERT_AT", "0.6")),
+    hangup_at=float(os.getenv("RISK_HANGUP_AT", "1.2")),
+)
+FRAUD_THRESHOLDS   = Thresholds(
+    keyword_fraud=float(os.getenv("FRAUD_KEYWORD_THRESHOLD", "0.85")),
+    model_fraud=float(os.getenv("FRAUD_MODEL_THRESHOLD", "0.8")),
+    model_clear=float(os.getenv("FRAUD_CLEAR_THRESHOLD", "0.2")),
+)
 
 if not all([TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN,
             TWILIO_NUMBER, PASSENGER_NUMBER,
@@ -36,32 +99,100 @@ if not all([TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN,
 app = FastAPI(title="Fraud Detection Proxy")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-
-# ─── 3) In-memory WebSocket manager for frontend clients ───────────────────────
-
-class ConnectionManager:
-    def __init__(self):
-        self.connections: list[WebSocket] = []
-
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        self.connections.append(ws)
-
-    def disconnect(self, ws: WebSocket):
-        self.connections.remove(ws)
-
-    async def broadcast(self, message: dict):
-        for ws in self.connections:
-            await ws.send_json(message)
-
-manager = ConnectionManager()
+# JSON logs are formatted and written by a background thread, off the event loop
+log_listener = setup_logging(LOG_LEVEL)
+log = logging.getLogger("fraud")
+
+# Hot-path latency histograms and counters, scraped from /metrics
+metrics = Registry()
+FRAME_TO_SEND = metrics.histogram(
+    "fraud_frame_to_stt_send_seconds", "Twilio frame arrival to the chunk holding it being sent to STT")
+SEND_TO_TRANSCRIPT = metrics.histogram(
+    "fraud_stt_send_to_transcript_seconds", "STT send of a chunk to a transcript covering it")
+TRANSCRIPT_TO_VERDICT = metrics.histogram(
+    "fraud_transcript_to_verdict_seconds", "Transcript received to classifier verdict and risk update")
+VERDICT_TO_HANGUP = metrics.histogram(
+    "fraud_verdict_to_hangup_seconds", "Hangup decision to Twilio accepting the hangup")
+FIRST_TRANSCRIPT = metrics.histogram(
+    "fraud_stt_first_transcript_seconds", "STT stream opened to first non-empty transcript")
+FRAMES = metrics.counter("fraud_media_frames_total", "Twilio media frames received")
+MEDIA_BYTES = metrics.counter("fraud_media_bytes_total", "Decoded audio bytes received")
+STT_AUDIO = metrics.counter("fraud_stt_audio_bytes_total", "Audio bytes sent to STT", ("track",))
+STT_SKIPPED = metrics.counter("fraud_stt_skipped_bytes_total",
+                              "Audio bytes not sent to STT (silence on a gated track)", ("track",))
+TRANSCRIPTS = metrics.counter("fraud_transcripts_total", "Non-empty STT results", ("final",))
+VERDICTS = metrics.counter("fraud_verdicts_total", "Classifier verdicts by deciding tier", ("tier",))
+ALERTS = metrics.counter("fraud_alerts_total", "Calls whose risk crossed the alert threshold")
+SUSPECTED_CALLS = metrics.counter(
+    "fraud_suspected_total", "Calls whose unsettled (interim) risk crossed the hangup threshold")
+UNCONFIRMED = metrics.counter(
+    "fraud_suspected_unconfirmed_total", "Suspected calls that ended without being confirmed")
+SUSPECTED_TO_CONFIRMED = metrics.histogram(
+    "fraud_suspected_to_confirmed_seconds", "Suspected alert to the confirmed hangup decision")
+HANGUPS = metrics.counter("fraud_hangups_total", "Hangups requested")
+
+# Pooled async transport: hangups never block the event loop. Its aiohttp
+# session needs a running loop, so the client is made at startup.
+call_controller = CallController()
+
+@app.on_event("startup")
+async def start_twilio():
+    call_controller.client = make_async_client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN,
+                                               base_url=TWILIO_API_BASE)
+
+@app.on_event("shutdown")
+async def close_twilio():
+    await call_controller.close()
+
+# ─── 3) WebSocket manager for frontend clients ────────────────────────────────
+
+# Events travel over the bus so dashboards on any worker see every call
+manager = ConnectionManager(bus=bus_from_url(EVENT_BUS_URL))
+
+@app.on_event("startup")
+async def start_event_bus():
+    await manager.start()
+
+@app.on_event("shutdown")
+async def close_event_bus():
+    await manager.close()
+
+# Transcripts and alerts are also appended to a durable log (written by a
+# background thread) so dashboards can replay and calls can be reviewed
+event_store = EventStore(EVENT_STORE_PATH, retention_s=EVENT_RETENTION_D * 86400) \
+    if EVENT_STORE_PATH else None
+
+if event_store:
+    metrics.counter("fraud_events_stored_total", "Transcripts and alerts committed to the event store",
+                    fn=lambda: event_store.written)
+    metrics.gauge("fraud_events_pending", "Events waiting for the event store writer",
+                  fn=lambda: event_store.stats()["pending"])
+
+@app.on_event("shutdown")
+async def close_event_store():
+    if event_store:
+        await asyncio.to_thread(event_store.close)
+        log.info("🗄 Event store closed", extra=event_store.stats())
+
+# Every live /media stream, with admission control and per-call stats
+sessions = SessionRegistry(max_calls=MAX_CALLS)
+
+metrics.gauge("fraud_active_calls", "Media streams in progress", fn=lambda: len(sessions.active))
+metrics.counter("fraud_calls_rejected_total", "Media streams refused by admission control",
+                fn=lambda: sessions.rejected)
+metrics.counter("fraud_calls_failed_total", "Sessions ended by an error", fn=lambda: sessions.failed)
+metrics.gauge("fraud_dashboard_clients", "Connected /ws clients", fn=lambda: len(manager.subscribers))
+metrics.counter("fraud_broadcasts_total", "Events published to dashboards",
+                fn=lambda: manager.broadcasts)
+metrics.counter("fraud_dashboard_dropped_total", "Dashboard messages dropped for slow clients",
+                fn=lambda: manager.dropped)
+metrics.counter("fraud_dashboard_evicted_total", "Dashboard clients evicted", fn=lambda: manager.evicted)
 
 # ─── 4) Health-check ───────────────────────────────────────────────────────────
 
@@ -74,105 +205,427 @@ async def health_check():
 @app.post("/voice")
 async def voice_webhook():
     twiml = VoiceResponse()
-    # 1) Launch media stream
-    stream_url = f"wss://{DOMAIN}/media?callSid={{{{CallSid}}}}"
-    twiml.start().stream(url=stream_url)
+    # 1) Launch media stream (unless we're already monitoring MAX_CALLS)
+    if sessions.full:
+        log.warning("⛔ At capacity: connecting without monitoring", extra={"max_calls": MAX_CALLS})
+    else:
+        stream_url = f"wss://{DOMAIN}/media?callSid={{{{CallSid}}}}"
+        if MEDIA_TRACKS == "both":
+            twiml.start().stream(url=stream_url, track="both_tracks")
+        else:
+            twiml.start().stream(url=stream_url)
     # 2) Bridge to the passenger’s device
     twiml.dial(PASSENGER_NUMBER)
     return PlainTextResponse(str(twiml), media_type="application/xml")
 
-# ─── 6) Deepgram media-stream & fraud detection ────────────────────────────────
-
-FRAUD_KEYWORDS = {
-    "otp", "one time password", "ek baar ka password",
-    "account number", "bank account",
-    "debit card", "credit card",
-    "upi pin", "upi password",
-    "send money", "transfer money",
-    "bank verification", "account verification",
-    "kyc update", "kyc verification",
-    "government penalty", "fine", "penalty",
-    "urgent", "emergency", "immediately",
-    "password", "pin", "secret code"
-}
+# ─── 6) Media stream → STT backend & fraud detection ───────────────────────────
+
+# Keyword dictionary: each version is compiled once (off the loop) into an
+# immutable snapshot shared by all calls, then swapped in whole
+keyword_dictionary = KeywordDictionary(KEYWORDS_PATH, fuzzy=KEYWORD_MATCHING == "fuzzy",
+                                       edit_path=KEYWORDS_EDIT_PATH)
+
+@app.on_event("startup")
+async def watch_keywords():
+    if KEYWORDS_RELOAD_S > 0:
+        await keyword_dictionary.start(KEYWORDS_RELOAD_S)
+
+@app.on_event("shutdown")
+async def close_keywords():
+    await keyword_dictionary.close()
+
+# Keywords → local model → LLM; each tier only sees what the last couldn't settle.
+# LLM verdicts are cached by transcript text: scam scripts repeat across calls.
+verdict_cache = ContentCache(LLM_CACHE_PATH, "verdicts:groq") if FRAUD_LLM == "groq" else None
+fraud_classifier = TieredClassifier(
+    scorer=KeywordScorer.from_snapshot(keyword_dictionary.current),
+    llm=cached_classifier(groq_llm(), verdict_cache) if verdict_cache is not None else None,
+    thresholds=FRAUD_THRESHOLDS,
+)
+
+if verdict_cache is not None:
+    metrics.counter("fraud_llm_cache_hits_total", "LLM verdicts answered from the cache (exact text)",
+                    fn=lambda: verdict_cache.hits)
+    metrics.counter("fraud_llm_cache_near_hits_total", "LLM verdicts answered from a near-duplicate text",
+                    fn=lambda: verdict_cache.near_hits)
+    metrics.counter("fraud_llm_cache_misses_total", "LLM verdicts not in the cache (LLM called)",
+                    fn=lambda: verdict_cache.misses)
+
+@app.on_event("shutdown")
+async def close_verdict_cache():
+    if verdict_cache is not None:
+        log.info("🗄 LLM verdict cache", extra=verdict_cache.stats())
+        verdict_cache.close()
+
+# Verdicts add to a decaying per-call score; one stray "urgent" is not a scam
+risk_engine = RiskEngine(RISK_POLICY)
+stability_policy = STABILITY_POLICIES[EARLY_ALERT]
+
+def use_keywords(snapshot):
+    fraud_classifier.scorer = KeywordScorer.from_snapshot(snapshot)
+    risk_engine.use_keywords(snapshot)
+
+use_keywords(keyword_dictionary.current)
+keyword_dictionary.subscribe(use_keywords)
 
 DG_URL = (
-    "wss://api.deepgram.com/v1/listen"
+    f"{DG_API_BASE}/v1/listen"
     f"?access_token={DG_API_KEY}"
-    "&encoding=linear16"
-    "&sample_rate=16000"
+    f"&encoding={TWILIO_ENCODING}"
+    f"&sample_rate={TWILIO_SAMPLE_RATE}"
     "&channels=1"
     "&punctuate=true"
     "&interim_results=true"
 )
 
+# Warm Deepgram sockets so a new call doesn't wait on a TLS/WS handshake
+dg_pool = DeepgramPool(DG_URL, size=DG_POOL_SIZE) if STT_BACKEND == "deepgram" else None
+stt_backend = create_backend(STT_BACKEND, dg_pool=dg_pool)
+
+@app.on_event("startup")
+async def start_dg_pool():
+    if dg_pool:
+        await dg_pool.start()
+
+@app.on_event("shutdown")
+async def close_dg_pool():
+    if dg_pool:
+        await dg_pool.close()
+
 @app.websocket("/media")
 async def media_stream(ws: WebSocket, callSid: str = Query(...)):
+    # Admission control: over MAX_CALLS the stream is refused (the call
+    # itself still goes through, just unmonitored)
+    try:
+        session = sessions.admit(callSid, TWILIO_SAMPLE_RATE)   # mu-law: 1 byte/sample
+    except AdmissionError as e:
+        log.warning("⛔ Media WS refused", extra={"callSid": callSid, "reason": str(e)})
+        await ws.close(code=1013)
+        return
     await ws.accept()
-    print(f"[{callSid}] 📡 Media WS connected")
-
-    async with websockets.connect(DG_URL) as dg_ws:
-        async def forward_audio():
-            async for msg in ws.iter_text():
-                data = json.loads(msg)
-                payload = data.get("media", {}).get("payload")
-                if not payload:
-                    continue
-                pcm = base64.b64decode(payload)
-                await dg_ws.send(pcm)
-
-        async def receive_stt():
-            async for dg_msg in dg_ws:
-                res = json.loads(dg_msg)
-                transcript = res["channel"]["alternatives"][0]["transcript"].strip()
-                is_final   = res.get("is_final", False)
-                if not transcript:
-                    continue
-                print(f"[{callSid}] 🗣 {transcript}")
-
-                # Detect fraud keywords
-                text_lower = transcript.lower()
-                detected = [kw for kw in FRAUD_KEYWORDS if kw in text_lower]
-                fraud = bool(detected)
-
-                # Broadcast to any UI clients
-                await manager.broadcast({
-                    "callSid":        callSid,
-                    "transcript":     transcript,
-                    "is_final":       is_final,
-                    "fraud_detected": fraud,
-                    "keywords":       detected,
-                })
-
-                # If fraud, hang up the call immediately
-                if fraud:
-                    print(f"[{callSid}] 🚨 Fraud! Hanging up")
-                    twilio_client.calls(callSid).update(
-                        twiml="<Response><Hangup/></Response>"
-                    )
-                    break
-
-        # Run both loops concurrently
-        await asyncio.gather(forward_audio(), receive_stt())
-
-    await ws.close()
-    print(f"[{callSid}] 📴 Media WS closed")
-
-# ─── 7) Front-end WebSocket for live updates ───────────────────────────────────
+    log.info("📡 Media WS connected", extra={"callSid": callSid})
+
+    risk = session.risk = risk_engine.open(callSid, time.monotonic())
+    # Same scoring over keyword hits that are only suspected (still unsettled
+    # in interims): crossing hangup here warns, only ``risk`` hangs up
+    early_risk = CallRisk(risk_engine, time.monotonic())
+    ingest = session.ingest = MediaIngest(MEDIA_CHUNK_MS)
+    # both_tracks: the passenger's side is demultiplexed onto its own STT
+    # stream, for the transcript only. Its budget: nothing, speech, or all.
+    two_tracks = MEDIA_TRACKS == "both"
+    passenger = MediaIngest(MEDIA_CHUNK_MS) if two_tracks and PASSENGER_AUDIO != "off" else None
+    gate = SpeechGate() if passenger and PASSENGER_AUDIO == "speech" else None
+
+    try:
+        # Configured STT engine (Deepgram streams come warm from the pool)
+        async with stt_backend.open(TWILIO_ENCODING, TWILIO_SAMPLE_RATE) as stt, \
+                (stt_backend.open(TWILIO_ENCODING, TWILIO_SAMPLE_RATE) if passenger
+                 else contextlib.nullcontext()) as passenger_stt:
+            async def send(chunk: bytes, first_at: float):
+                await stt.send(chunk)
+                now = time.perf_counter()
+                FRAME_TO_SEND.observe(now - first_at)
+                session.sent(len(chunk), now)
+                STT_AUDIO.labels(INBOUND).inc(len(chunk))
+
+            passenger_sent_at = time.monotonic()
+
+            async def send_passenger(chunk: bytes):
+                nonlocal passenger_sent_at
+                if gate:
+                    skipped = gate.skipped
+                    chunk = gate.feed(chunk)
+                    STT_SKIPPED.labels(OUTBOUND).inc(gate.skipped - skipped)
+                now = time.monotonic()
+                if chunk:
+                    await passenger_stt.send(chunk)
+                    STT_AUDIO.labels(OUTBOUND).inc(len(chunk))
+                elif now - passenger_sent_at >= STT_KEEPALIVE_S:
+                    # A long silence mustn't let Deepgram time the stream out:
+                    # the reconnect would replay audio and repeat transcripts
+                    await passenger_stt.keepalive()
+                else:
+                    return
+                passenger_sent_at = now
+
+            async def forward_audio():
+                first_at = None             # arrival of the oldest frame in the chunk
+                frames = bytes_in = 0
+                async for msg in ws.iter_text():
+                    if two_tracks and media_track(msg) == OUTBOUND:
+                        if passenger:
+                            chunk = passenger.feed(msg)
+                            if chunk:
+                                await send_passenger(chunk)
+                        continue
+                    if first_at is None:
+                        first_at = time.perf_counter()
+                    chunk = ingest.feed(msg)
+                    if chunk:
+                        await send(chunk, first_at)
+                        first_at = None
+                        FRAMES.inc(ingest.frames - frames)
+                        MEDIA_BYTES.inc(ingest.bytes_in - bytes_in)
+                        frames, bytes_in = ingest.frames, ingest.bytes_in
+                tail = ingest.flush()
+                if tail:
+                    await send(tail, first_at or time.perf_counter())
+                FRAMES.inc(ingest.frames - frames)
+                MEDIA_BYTES.inc(ingest.bytes_in - bytes_in)
+                await stt.finish()
+                if passenger:
+                    tail = passenger.flush()
+                    if tail:
+                        await send_passenger(tail)
+                    FRAMES.inc(passenger.frames)
+                    MEDIA_BYTES.inc(passenger.bytes_in)
+                    await passenger_stt.finish()
+
+            async def receive_stt():
+                # Per-call matcher state: only new text is scanned, and phrases
+                # that straddle two final segments are still caught.
+                snapshot = keyword_dictionary.current
+                keyword_stream = snapshot.matcher.stream()
+                stability = HitStability(stability_policy)
+                suspected_at = None
+                ttft_logged = False
+                last_final = None
+                async for event in stt:
+                    transcript = event.transcript
+                    is_final   = event.is_final
+
+                    # A reloaded dictionary takes over between segments; the new
+                    # stream is primed with the last final (its matches were
+                    # already reported) so phrases spanning the boundary still fire
+                    if last_final is not None and keyword_dictionary.current is not snapshot:
+                        snapshot = keyword_dictionary.current
+                        keyword_stream = snapshot.matcher.stream()
+                        keyword_stream.feed(last_final, True)
+
+                    # Detect fraud keywords (fed even when empty so finals commit)
+                    keyword_stream.feed(transcript, is_final)
+                    suspected, confirmed = stability.update(
+                        keyword_stream.live(), time.monotonic() * 1000, is_final)
+                    last_final = transcript if is_final else None
+                    if not transcript:
+                        continue
+                    received = time.perf_counter()
+                    session.transcribed(event.end)
+                    lag = session.send_latency(event.end, received)
+                    if lag is not None:
+                        SEND_TO_TRANSCRIPT.observe(lag)
+                    TRANSCRIPTS.labels(is_final).inc()
+                    if stt.ttft is not None and not ttft_logged:
+                        FIRST_TRANSCRIPT.observe(stt.ttft)
+                        log.info("⏱ time to first transcript",
+                                 extra={"callSid": callSid, "ttft_ms": round(stt.ttft * 1000)})
+                        ttft_logged = True
+                    log.debug("🗣 transcript", extra={"callSid": callSid, "text": transcript,
+                                                      "is_final": is_final})
+
+                    # The classifier sees every keyword in this result's text, reported
+                    # before or not; risk is scored on the stability stages, which
+                    # report each hit once. Local tiers run on every result; only
+                    # finals may escalate
+                    present = list(dict.fromkeys(keyword_stream.live()))
+                    verdict = await fraud_classifier.aclassify(transcript, present,
+                                                               escalate=is_final)
+                    now = time.monotonic()
+                    was_alerted = risk.level >= ALERT
+                    update = risk.observe_verdict(now, verdict, final=is_final, keywords=confirmed)
+                    early = early_risk.observe_verdict(now, verdict, final=is_final, keywords=suspected)
+                    # Per message: this segment's verdict, or the escalation it
+                    # caused. The call's running state is only in risk_level, so
+                    # later ordinary interims stay droppable and out of fraud_only
+                    stage = (CONFIRMED if update.escalated and update.level == HANGUP else
+                             SUSPECTED if early.escalated and early.level == HANGUP else None)
+                    fraud = verdict.fraud or update.escalated or stage is not None
+                    decided = time.perf_counter()
+                    TRANSCRIPT_TO_VERDICT.observe(decided - received)
+                    VERDICTS.labels(verdict.tier).inc()
+
+                    # Broadcast to any UI clients, and keep it
+                    message = {
+                        "ts":             time.time(),
+                        "callSid":        callSid,
+                        "speaker":        "caller",
+                        "transcript":     transcript,
+                        "is_final":       is_final,
+                        "fraud_detected": fraud,
+                        "keywords":       list(verdict.keywords),
+                        "confidence":     round(verdict.confidence, 3),
+                        "tier":           verdict.tier,
+                        "risk":           round(update.score, 3),
+                        "risk_level":     LEVELS[update.level],
+                        "stage":          stage,
+                        "keywords_version": snapshot.tag,
+                    }
+                    if event_store:
+                        event_store.append(message)
+                    await manager.broadcast(message)
+
+                    if stage == SUSPECTED:
+                        SUSPECTED_CALLS.inc()
+                        suspected_at = decided
+                        log.warning("🟠 Suspected fraud (unconfirmed)", extra={
+                            "callSid": callSid, "risk": round(early.score, 3),
+                            "keywords_version": snapshot.tag})
+                    if update.level >= ALERT and not was_alerted:     # once per call
+                        ALERTS.inc()
+                    if update.escalated and update.level == ALERT:
+                        log.warning("⚠️ Risk over alert threshold", extra={
+                            "callSid": callSid, "risk": round(update.score, 3),
+                            "keywords_version": snapshot.tag})
+                    # Over the hangup threshold: hang up (scheduled; doesn't block other calls)
+                    if update.level == HANGUP:
+                        log.warning("🚨 Fraud! Hanging up", extra={
+                            "callSid": callSid, "risk": round(update.score, 3),
+                            "tier": verdict.tier, "confidence": round(verdict.confidence, 3),
+                            "keywords_version": snapshot.tag})
+                        HANGUPS.inc()
+                        if suspected_at is not None:
+                            SUSPECTED_TO_CONFIRMED.observe(decided - suspected_at)
+                        task = call_controller.hangup(callSid)
+                        if task:
+                            task.add_done_callback(lambda t: t.cancelled() or not t.result() or
+                                                   VERDICT_TO_HANGUP.observe(time.perf_counter() - decided))
+                        break
+                if suspected_at is not None and risk.level < HANGUP:
+                    UNCONFIRMED.inc()
+
+            async def receive_passenger():
+                # Shown alongside the caller's side, never classified or scored:
+                # "I won't share my OTP" must not count against the call
+                async for event in passenger_stt:
+                    if not event.transcript:
+                        continue
+                    TRANSCRIPTS.labels(event.is_final).inc()
+                    message = {
+                        "ts":             time.time(),
+                        "callSid":        callSid,
+                        "speaker":        "passenger",
+                        "transcript":     event.transcript,
+                        "is_final":       event.is_final,
+                        "fraud_detected": False,
+                        "keywords":       [],
+                    }
+                    if event_store:
+                        event_store.append(message)
+                    await manager.broadcast(message)
+
+            async def receive_transcripts():
+                if not passenger:
+                    return await receive_stt()
+                async with asyncio.TaskGroup() as tg:
+                    tg.create_task(receive_passenger())
+                    tg.create_task(receive_stt())
+
+            # Both loops run as one task group: if either fails, the other
+            # is cancelled and the STT streams are closed on the way out
+            await sessions.run(session, forward_audio(), receive_transcripts())
+    except Exception as e:
+        sessions.fail(session, repr(e))     # STT stream failed to open
+    finally:
+        risk_engine.close(callSid)
+        sessions.release(session)
+
+    if session.error:
+        log.error("💥 Session failed", extra={"callSid": callSid, "error": session.error})
+    try:
+        await ws.close()
+    except (RuntimeError, WebSocketDisconnect):
+        pass        # already closed by the client
+    log.info("📴 Media WS closed", extra=session.snapshot())
+
+# ─── 7) Admin: live call sessions, keywords + metrics ─────────────────────────
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=Registry.CONTENT_TYPE)
+
+@app.get("/keywords")
+async def get_keywords():
+    return keyword_dictionary.current.to_json()
+
+def require_admin(authorization: str | None):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Set ADMIN_TOKEN to enable this endpoint")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Admin token required",
+                            headers={"WWW-Authenticate": "Bearer"})
+
+@app.put("/keywords")
+async def put_keywords(dictionary: dict, authorization: str | None = Header(default=None)):
+    # Same format as the KEYWORDS_PATH file; saved to KEYWORDS_EDIT_PATH, never
+    # over the shipped list. Needs "Authorization: Bearer $ADMIN_TOKEN"
+    require_admin(authorization)
+    try:
+        snapshot = await keyword_dictionary.replace(dictionary)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"version": snapshot.tag, "keywords": len(snapshot.entries)}
+
+@app.get("/calls")
+async def list_calls():
+    return sessions.snapshot()
+
+@app.get("/calls/{call_sid}")
+async def get_call(call_sid: str):
+    call = sessions.get(call_sid)
+    if call is None:
+        raise HTTPException(status_code=404, detail="Unknown callSid")
+    return call
+
+@app.get("/calls/{call_sid}/events")
+async def get_call_events(call_sid: str):
+    # Stored transcripts and alerts of a call, live or finished
+    if event_store is None:
+        raise HTTPException(status_code=404, detail="Event store disabled")
+    return await asyncio.to_thread(event_store.call, call_sid)
+
+# ─── 8) Front-end WebSocket for live updates ───────────────────────────────────
 
 @app.websocket("/ws")
-async def websocket_endpoint(ws: WebSocket):
-    await manager.connect(ws)
+async def websocket_endpoint(
+    ws: WebSocket,
+    callSid: list[str] = Query(default=[]),
+    fraud_only: bool = False,
+    finals_only: bool = False,
+    history: int = 0,
+):
+    # e.g. /ws?callSid=CA123&callSid=CA456&finals_only=true&history=50
+    # history=N replays the last N stored events of the subscription first
+    subscription = Subscription.from_params(callSid, fraud_only, finals_only)
+    replay = None
+    if history > 0 and event_store:
+        replay = asyncio.to_thread(event_store.recent, subscription.call_sids,
+                                   subscription.kinds, min(history, MAX_REPLAY))
+    await manager.connect(ws, subscription, replay)
     try:
         while True:
-            # Keep the connection open; we never expect the client to send data here
-            await ws.receive_text()
+            # Clients may change their subscription by sending
+            # {"callSids": [...], "fraud_only": bool, "finals_only": bool}
+            msg = await ws.receive_text()
+            try:
+                sub = json.loads(msg)
+                manager.subscribe(ws, Subscription.from_params(
+                    sub.get("callSids", []),
+                    bool(sub.get("fraud_only")),
+                    bool(sub.get("finals_only")),
+                ))
+            except (ValueError, AttributeError, TypeError):
+                continue
     except:
         pass
     finally:
         manager.disconnect(ws)
 
-# ─── 8) Run the app ───────────────────────────────────────────────────────────
+@app.on_event("shutdown")
+async def flush_logs():
+    log_listener.stop()     # registered last: flushes what the other hooks logged
+
+# ─── 9) Run the app ───────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
     import uvicorn
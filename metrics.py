@@ -0,0 +1,153 @@
+"""
+Prometheus-style metrics without the client library.
+
+Counters, gauges and histograms are plain objects updated in place on
+the event loop (no locks, no allocation per observation); the registry
+renders them in the Prometheus text exposition format for /metrics.
+Counters and gauges can also read a callback at scrape time, so existing
+counters (ConnectionManager.evicted, len(sessions.active), ...) are
+exported without touching their hot paths.
+"""
+
+from bisect import bisect_left
+from typing import Callable, Iterator
+
+# Seconds; spans sub-millisecond local work up to slow remote calls.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(v: float) -> str:
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), **kwargs):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._kwargs = kwargs
+        self._children: dict[tuple[str, ...], "_Metric"] = {}
+
+    def labels(self, *values) -> "_Metric":
+        """The child for one combination of label values."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = type(self)(self.name, self.help, **self._kwargs)
+        return child
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        if self.labelnames:
+            for values, child in self._children.items():
+                yield from child._samples(_labels(self.labelnames, values), values)
+        else:
+            yield from self._samples("", ())
+
+    def _samples(self, labels: str, values: tuple[str, ...]) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (),
+                 fn: Callable[[], float] | None = None):
+        super().__init__(name, help, labelnames)
+        self.value = 0
+        self.fn = fn
+
+    def inc(self, n: float = 1):
+        self.value += n
+
+    def _samples(self, labels, values):
+        yield f"{self.name}{labels} {_num(self.fn() if self.fn else self.value)}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float):
+        self.value = value
+
+    def dec(self, n: float = 1):
+        self.value -= n
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames, buckets=buckets)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate from the buckets, interpolating linearly inside one."""
+        if not self.count:
+            return None
+        rank, seen, lower = q * self.count, 0, 0.0
+        for upper, n in zip(self.buckets, self.counts):
+            if seen + n >= rank and n:
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = upper
+        return self.buckets[-1]
+
+    def _samples(self, labels, values):
+        cumulative = 0
+        for upper, n in zip(self.buckets, self.counts):
+            cumulative += n
+            le = _labels(self.labelnames, values, f'le="{_num(upper)}"')
+            yield f"{self.name}_bucket{le} {cumulative}"
+        inf = _labels(self.labelnames, values, 'le="+Inf"')
+        yield f"{self.name}_bucket{inf} {self.count}"
+        yield f"{self.name}_sum{labels} {_num(self.sum)}"
+        yield f"{self.name}_count{labels} {self.count}"
+
+
+class Registry:
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self.metrics: dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"metric {metric.name!r} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = (),
+                fn: Callable[[], float] | None = None) -> Counter:
+        return self._add(Counter(name, help, labelnames, fn))
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = (),
+              fn: Callable[[], float] | None = None) -> Gauge:
+        return self._add(Gauge(name, help, labelnames, fn))
+
+    def histogram(self, name: str, help: str, labelnames: tuple[str, ...] = (),
+                  buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        return "\n".join(line for m in self.metrics.values() for line in m.render()) + "\n"
@@ -0,0 +1,177 @@
+"""
+Registry of live media-stream sessions.
+
+Every /media connection becomes a CallSession keyed by callSid. The
+registry admits at most ``max_calls`` at once, records each session's
+lifecycle
+
+    admitted → streaming → draining → closed
+                    └──────────┴──────→ failed
+
+and runs its audio and STT loops as one task group: if either side
+raises, the other is cancelled, the STT stream is closed by its context
+manager and the session ends as ``failed``.
+
+Per-session state is a fixed set of counters (``__slots__``), and only
+the last ``keep_recent`` finished sessions are kept, as summaries, so
+registry memory is bounded by max_calls + keep_recent.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Coroutine
+
+ADMITTED, STREAMING, DRAINING, CLOSED, FAILED = (
+    "admitted", "streaming", "draining", "closed", "failed")
+
+SEND_HISTORY = 200      # STT sends remembered per call for latency (20 s at 100 ms)
+
+
+class AdmissionError(Exception):
+    """The registry is full or the callSid already has a live session."""
+
+
+class CallSession:
+    __slots__ = ("call_sid", "state", "started", "ended", "bytes_per_second",
+                 "ingest", "risk", "chunks_sent", "bytes_sent", "transcripts",
+                 "transcript_end", "last_transcript_at", "error", "_sends")
+
+    def __init__(self, call_sid: str, bytes_per_second: int):
+        self.call_sid = call_sid
+        self.state = ADMITTED
+        self.started = time.time()
+        self.ended: float | None = None
+        self.bytes_per_second = bytes_per_second
+        self.ingest = None                 # MediaIngest: frames and bytes received
+        self.risk = None                   # CallRisk, if the call is scored
+        self.chunks_sent = 0
+        self.bytes_sent = 0
+        self.transcripts = 0
+        self.transcript_end = 0.0          # call time (s) covered by transcripts
+        self.last_transcript_at: float | None = None
+        self.error: str | None = None
+        # (call time the chunk ends at, perf_counter when sent) for recent chunks
+        self._sends: deque[tuple[float, float]] = deque(maxlen=SEND_HISTORY)
+
+    def sent(self, n_bytes: int, at: float):
+        """Record an STT send of ``n_bytes`` of audio, completed at ``at``."""
+        self.chunks_sent += 1
+        self.bytes_sent += n_bytes
+        self._sends.append((self.bytes_sent / self.bytes_per_second, at))
+
+    def send_latency(self, end: float, now: float) -> float | None:
+        """
+        Time since the chunk holding call time ``end`` was sent. Chunks
+        wholly before ``end`` are dropped; transcripts only move forward.
+        """
+        sends = self._sends
+        while sends and sends[0][0] < end:
+            sends.popleft()
+        return now - sends[0][1] if sends else None
+
+    def transcribed(self, end: float):
+        """Record a transcript covering call audio up to ``end`` seconds."""
+        self.transcripts += 1
+        self.transcript_end = max(self.transcript_end, end)
+        self.last_transcript_at = time.time()
+
+    @property
+    def audio_s(self) -> float:
+        return self.ingest.bytes_in / self.bytes_per_second if self.ingest else 0.0
+
+    @property
+    def transcript_lag_s(self) -> float:
+        """Audio received but not yet covered by any transcript."""
+        return max(0.0, self.audio_s - self.transcript_end)
+
+    def snapshot(self) -> dict:
+        return {
+            "callSid":          self.call_sid,
+            "state":            self.state,
+            "started":          self.started,
+            "duration_s":       round((self.ended or time.time()) - self.started, 3),
+            "frames":           self.ingest.frames if self.ingest else 0,
+            "bytes_in":         self.ingest.bytes_in if self.ingest else 0,
+            "chunks_sent":      self.chunks_sent,
+            "transcripts":      self.transcripts,
+            "transcript_lag_s": round(self.transcript_lag_s, 3),
+            "risk":             self.risk.snapshot() if self.risk else None,
+            "error":            self.error,
+        }
+
+
+class SessionRegistry:
+    def __init__(self, max_calls: int = 100, keep_recent: int = 100):
+        self.max_calls = max_calls
+        self.active: dict[str, CallSession] = {}
+        self.recent: deque[dict] = deque(maxlen=keep_recent)
+        self.admitted = 0
+        self.rejected = 0
+        self.failed = 0
+
+    @property
+    def full(self) -> bool:
+        return len(self.active) >= self.max_calls
+
+    def admit(self, call_sid: str, bytes_per_second: int) -> CallSession:
+        if call_sid in self.active:
+            self.rejected += 1
+            raise AdmissionError(f"{call_sid} already has a live session")
+        if self.full:
+            self.rejected += 1
+            raise AdmissionError(f"at capacity ({self.max_calls} calls)")
+        session = self.active[call_sid] = CallSession(call_sid, bytes_per_second)
+        self.admitted += 1
+        return session
+
+    async def run(self, session: CallSession, audio: Coroutine, transcripts: Coroutine):
+        """
+        Run the audio and transcript loops together. The session drains
+        once audio ends and closes when both are done; any exception
+        cancels the other loop and fails the session.
+        """
+        async def audio_then_drain():
+            await audio
+            if session.state == STREAMING:
+                session.state = DRAINING
+
+        session.state = STREAMING
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(audio_then_drain())
+                tg.create_task(transcripts)
+        except* Exception as eg:
+            self.fail(session, "; ".join(repr(e) for e in eg.exceptions))
+        else:
+            session.state = CLOSED
+
+    def fail(self, session: CallSession, error: str):
+        """Mark ``session`` failed with ``error`` and count it."""
+        session.state, session.error = FAILED, error
+        self.failed += 1
+
+    def release(self, session: CallSession):
+        """Forget a finished session, keeping a summary of it."""
+        if session.state not in (CLOSED, FAILED):
+            session.state = CLOSED
+        session.ended = time.time()
+        if self.active.get(session.call_sid) is session:
+            del self.active[session.call_sid]
+        self.recent.append(session.snapshot())
+
+    def get(self, call_sid: str) -> dict | None:
+        session = self.active.get(call_sid)
+        if session:
+            return session.snapshot()
+        return next((s for s in reversed(self.recent) if s["callSid"] == call_sid), None)
+
+    def snapshot(self) -> dict:
+        return {
+            "max_calls": self.max_calls,
+            "active":    [s.snapshot() for s in self.active.values()],
+            "recent":    list(self.recent),
+            "admitted":  self.admitted,
+            "rejected":  self.rejected,
+            "failed":    self.failed,
+        }
@@ -0,0 +1,112 @@
+"""
+Audio format helpers shared by the STT backends and clients.
+
+Everything is vectorized NumPy: mu-law decoding is a 256-entry lookup
+table and resampling is linear interpolation over the whole block
+(``Resampler`` does the same for a stream arriving in blocks).
+"""
+
+import io
+import wave
+
+import numpy as np
+
+
+def _mulaw_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (u >> 4) & 0x07
+    mantissa = u & 0x0F
+    magnitude = (((mantissa << 3) + 0x84) << exponent) - 0x84
+    return np.where(u & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+MULAW_TO_PCM16 = _mulaw_table()
+
+
+def mulaw_to_pcm16(data: bytes) -> np.ndarray:
+    """G.711 mu-law bytes → int16 samples."""
+    return MULAW_TO_PCM16[np.frombuffer(data, dtype=np.uint8)]
+
+
+def pcm16_to_mulaw(samples: np.ndarray) -> bytes:
+    """int16 samples → G.711 mu-law bytes (the inverse of MULAW_TO_PCM16)."""
+    s = samples.astype(np.int32) >> 2                      # 14-bit, as in G.711
+    sign = np.where(s < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(s), 8159) + 0x21
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 5
+    mantissa = (magnitude >> (exponent + 1)) & 0x0F
+    code = np.where(exponent > 7, 0x7F, (exponent << 4) | mantissa)      # clipped
+    return (code ^ sign).astype(np.uint8).tobytes()
+
+
+def pcm16_to_float32(samples: np.ndarray) -> np.ndarray:
+    return samples.astype(np.float32) / 32768.0
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """Linear-interpolation resample of a mono block."""
+    if src_rate == dst_rate or len(samples) == 0:
+        return samples
+    n_out = int(round(len(samples) * dst_rate / src_rate))
+    positions = np.arange(n_out, dtype=np.float64) * (src_rate / dst_rate)
+    out = np.interp(positions, np.arange(len(samples)), samples)
+    if np.issubdtype(samples.dtype, np.integer):
+        out = np.rint(out)
+    return out.astype(samples.dtype, copy=False)
+
+
+class Resampler:
+    """
+    ``resample`` for one continuous signal fed in blocks of any size: the
+    interpolation phase and the last sample carry over, so block edges
+    leave no seams and block lengths don't have to divide evenly.
+    Downsampling first low-passes with a short windowed-sinc FIR, so
+    energy above the new Nyquist (a 44.1 kHz microphone's top octave)
+    doesn't fold back into the speech band.
+    """
+
+    __slots__ = ("src_rate", "dst_rate", "step", "_pos", "_last", "_taps", "_tail")
+
+    def __init__(self, src_rate: int, dst_rate: int, taps: int = 31):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.step = src_rate / dst_rate
+        self._pos = 0.0            # next output position, in input samples from _last
+        self._last: float | None = None
+        self._taps = self._tail = None
+        if dst_rate < src_rate and taps > 1:
+            n = np.arange(taps) - (taps - 1) / 2
+            cutoff = 0.45 * dst_rate / src_rate              # cycles per input sample
+            h = np.sinc(2 * cutoff * n) * np.hamming(taps)
+            self._taps = h / h.sum()
+            self._tail = np.zeros(taps - 1)
+
+    def __call__(self, samples: np.ndarray) -> np.ndarray:
+        if self.src_rate == self.dst_rate or len(samples) == 0:
+            return samples
+        x = samples.astype(np.float64)
+        if self._taps is not None:
+            x = np.concatenate((self._tail, x))
+            self._tail = x[len(x) - len(self._tail):]
+            x = np.convolve(x, self._taps, "valid")
+        if self._last is not None:
+            x = np.concatenate(((self._last,), x))
+        n = int((len(x) - 1 - self._pos) // self.step) + 1 if len(x) - 1 >= self._pos else 0
+        out = np.interp(self._pos + np.arange(n) * self.step, np.arange(len(x)), x)
+        self._pos += n * self.step - (len(x) - 1)
+        self._last = x[-1]
+        if np.issubdtype(samples.dtype, np.integer):
+            info = np.iinfo(samples.dtype)
+            out = np.clip(np.rint(out), info.min, info.max)
+        return out.astype(samples.dtype, copy=False)
+
+
+def wav_bytes(samples: np.ndarray, rate: int) -> bytes:
+    """Mono int16 samples → an in-memory WAV file."""
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.astype(np.int16, copy=False).tobytes())
+    return buf.getvalue()
@@ -0,0 +1,312 @@
+"""
+Pluggable speech-to-text backends.
+
+Every engine in the repo sits behind the same async interface: open a
+stream for a call, ``send`` audio to it, iterate TranscriptEvents (with
+word timings), and ``finish`` when the audio ends.
+
+    deepgram  streaming Deepgram via the warm connection pool (dg_pool.py)
+    groq      Groq-hosted Whisper, transcribing fixed-length windows
+    whisper   local openai-whisper, transcribing fixed-length windows
+    whisper-batched
+              one local Whisper model shared by all calls, micro-batched
+              across calls (stt/batch_server.py)
+
+Audio always arrives in the caller's format (Twilio mu-law/8000 for
+/media); batch engines convert it to 16 kHz themselves.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import AsyncIterator, NamedTuple, Protocol
+
+import numpy as np
+
+from stt.audio import mulaw_to_pcm16, pcm16_to_float32, resample, wav_bytes
+
+WHISPER_RATE = 16000
+
+log = logging.getLogger(__name__)
+
+
+class Word(NamedTuple):
+    word: str
+    start: float      # seconds on the call timeline
+    end: float
+    confidence: float = 1.0
+
+
+class TranscriptEvent(NamedTuple):
+    transcript: str
+    is_final: bool
+    start: float
+    end: float
+    words: tuple[Word, ...] = ()
+    backend: str = ""
+
+
+class STTStream(Protocol):
+    ttft: float | None
+
+    async def send(self, audio: bytes) -> None: ...
+    async def keepalive(self) -> None: ...      # nothing to send for a while
+    async def finish(self) -> None: ...
+    def __aiter__(self) -> AsyncIterator[TranscriptEvent]: ...
+
+
+class STTBackend(Protocol):
+    name: str
+
+    def open(self, encoding: str, sample_rate: int) -> "STTStream":
+        """A per-call stream; use it as ``async with backend.open(...) as s``."""
+        ...
+
+
+# ─── Deepgram (streaming) ─────────────────────────────────────────────────────
+
+class DeepgramBackend:
+    name = "deepgram"
+
+    def __init__(self, pool):
+        self.pool = pool
+
+    def open(self, encoding: str, sample_rate: int) -> "DeepgramStream":
+        bytes_per_second = sample_rate * (1 if encoding == "mulaw" else 2)
+        return DeepgramStream(self.pool.session(bytes_per_second))
+
+
+class DeepgramStream:
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def ttft(self) -> float | None:
+        return self.session.ttft
+
+    async def __aenter__(self):
+        await self.session.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.__aexit__(*exc)
+
+    async def send(self, audio: bytes):
+        await self.session.send(audio)
+
+    async def keepalive(self):
+        await self.session.keepalive()
+
+    async def finish(self):
+        await self.session.finish()
+
+    async def __aiter__(self):
+        async for res in self.session:
+            alt = res["channel"]["alternatives"][0]
+            start = res.get("start", 0.0)
+            yield TranscriptEvent(
+                transcript=alt["transcript"].strip(),
+                is_final=res.get("is_final", False),
+                start=start,
+                end=start + res.get("duration", 0.0),
+                words=tuple(
+                    Word(w.get("punctuated_word", w["word"]), w["start"], w["end"],
+                         w.get("confidence", 1.0))
+                    for w in alt.get("words", ())
+                ),
+                backend=DeepgramBackend.name,
+            )
+
+
+# ─── Window-based engines (Groq Whisper, local Whisper) ───────────────────────
+
+class WindowedStream:
+    """
+    Buffers audio into ``window_s`` windows and transcribes each one in a
+    worker thread, in order. Every window yields one final event.
+    """
+
+    def __init__(self, backend: "WindowedBackend", encoding: str, sample_rate: int):
+        self.backend = backend
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.ttft: float | None = None
+        self._opened_at = 0.0
+        self._window_bytes = int(backend.window_s * sample_rate) * (1 if encoding == "mulaw" else 2)
+        self._buf = bytearray()
+        self._offset = 0.0
+        self._windows: asyncio.Queue = asyncio.Queue()
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._worker: asyncio.Task | None = None
+
+    async def __aenter__(self):
+        self._opened_at = time.perf_counter()
+        self._worker = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, *exc):
+        self._worker.cancel()
+        await asyncio.gather(self._worker, return_exceptions=True)
+
+    async def send(self, audio: bytes):
+        self._buf += audio
+        if len(self._buf) >= self._window_bytes:
+            self._windows.put_nowait(bytes(self._buf))
+            self._buf.clear()
+
+    async def keepalive(self):
+        pass                            # no connection to hold open
+
+    async def finish(self):
+        if self._buf:
+            self._windows.put_nowait(bytes(self._buf))
+            self._buf.clear()
+        self._windows.put_nowait(None)
+
+    def _to_float16k(self, audio: bytes) -> np.ndarray:
+        if self.encoding == "mulaw":
+            pcm = mulaw_to_pcm16(audio)
+        else:
+            pcm = np.frombuffer(audio, dtype=np.int16)
+        return resample(pcm16_to_float32(pcm), self.sample_rate, WHISPER_RATE)
+
+    async def _run(self):
+        try:
+            while (audio := await self._windows.get()) is not None:
+                samples = self._to_float16k(audio)
+                start = self._offset
+                self._offset += len(samples) / WHISPER_RATE
+                try:
+                    text, words = await self.backend.transcribe_async(samples)
+                except Exception as e:
+                    log.warning("⚠️ Transcription failed",
+                                extra={"backend": self.backend.name, "error": repr(e)})
+                    continue
+                if text and self.ttft is None:
+                    self.ttft = time.perf_counter() - self._opened_at
+                self._events.put_nowait(TranscriptEvent(
+                    transcript=text, is_final=True, start=start, end=self._offset,
+                    words=tuple(Word(w, s + start, e + start, c) for w, s, e, c in words),
+                    backend=self.backend.name,
+                ))
+        finally:
+            self._events.put_nowait(None)
+
+    async def __aiter__(self):
+        while (event := await self._events.get()) is not None:
+            yield event
+
+
+class WindowedBackend:
+    name = "windowed"
+
+    def __init__(self, window_s: float = 5.0):
+        self.window_s = window_s
+
+    def open(self, encoding: str, sample_rate: int) -> WindowedStream:
+        return WindowedStream(self, encoding, sample_rate)
+
+    def transcribe(self, samples: np.ndarray) -> tuple[str, list[tuple[str, float, float, float]]]:
+        """Blocking: float32 16 kHz mono → (text, [(word, start, end, confidence)])."""
+        raise NotImplementedError
+
+    async def transcribe_async(self, samples: np.ndarray):
+        return await asyncio.to_thread(self.transcribe, samples)
+
+
+def _field(obj, key, default=None):
+    return obj.get(key, default) if isinstance(obj, dict) else getattr(obj, key, default)
+
+
+class GroqWhisperBackend(WindowedBackend):
+    name = "groq"
+
+    def __init__(self, client=None, model: str = "whisper-large-v3-turbo", window_s: float = 5.0):
+        super().__init__(window_s)
+        if client is None:
+            from groq import Groq
+            client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        self.client = client
+        self.model = model
+
+    def transcribe(self, samples):
+        pcm = np.clip(samples * 32768.0, -32768, 32767).astype(np.int16)
+        result = self.client.audio.transcriptions.create(
+            file=("chunk.wav", wav_bytes(pcm, WHISPER_RATE)),
+            model=self.model,
+            response_format="verbose_json",
+            timestamp_granularities=["word"],
+        )
+        words = [
+            (_field(w, "word", "").strip(), _field(w, "start", 0.0), _field(w, "end", 0.0), 1.0)
+            for w in _field(result, "words", None) or ()
+        ]
+        return result.text.strip(), words
+
+
+class LocalWhisperBackend(WindowedBackend):
+    name = "whisper"
+
+    def __init__(self, model=None, model_name: str = "small", window_s: float = 5.0,
+                 language: str | None = None):
+        super().__init__(window_s)
+        self.language = language        # None: detect per window
+        if model is None:
+            import whisper
+            model = whisper.load_model(model_name)
+        self.model = model
+        self._lock = threading.Lock()   # one model, one forward pass at a time
+
+    def transcribe(self, samples):
+        with self._lock:
+            result = self.model.transcribe(samples, fp16=False, word_timestamps=True,
+                                           language=self.language)
+        words = [
+            (w["word"].strip(), w["start"], w["end"], w.get("probability", 1.0))
+            for seg in result.get("segments", ())
+            for w in seg.get("words", ())
+        ]
+        return result["text"].strip(), words
+
+
+class BatchedWhisperBackend(WindowedBackend):
+    """Local Whisper shared by every call through one micro-batching server."""
+
+    name = "whisper-batched"
+
+    def __init__(self, server=None, model_name: str = "small", window_s: float = 5.0,
+                 max_batch: int = 8, max_wait_ms: float = 200.0, language: str | None = None):
+        super().__init__(window_s)
+        if server is None:
+            import whisper
+            from stt.batch_server import BatchInferenceServer, whisper_batch_fn
+            model = whisper.load_model(model_name)
+            server = BatchInferenceServer(whisper_batch_fn(model, language), max_batch, max_wait_ms)
+        self.server = server
+
+    async def transcribe_async(self, samples):
+        # Batched decoding runs without timestamps, so no word timings here.
+        return await self.server.transcribe(samples), []
+
+
+def create_backend(name: str, dg_pool=None) -> STTBackend:
+    """Backend by name, as configured with STT_BACKEND."""
+    if name == "deepgram":
+        if dg_pool is None:
+            raise ValueError("the deepgram backend needs a DeepgramPool")
+        return DeepgramBackend(dg_pool)
+    if name == "groq":
+        return GroqWhisperBackend()
+    if name == "whisper":
+        return LocalWhisperBackend(model_name=os.getenv("WHISPER_MODEL", "small"),
+                                   language=os.getenv("WHISPER_LANGUAGE") or None)
+    if name == "whisper-batched":
+        return BatchedWhisperBackend(
+            model_name=os.getenv("WHISPER_MODEL", "small"),
+            max_batch=int(os.getenv("WHISPER_MAX_BATCH", "8")),
+            max_wait_ms=float(os.getenv("WHISPER_MAX_WAIT_MS", "200")),
+            language=os.getenv("WHISPER_LANGUAGE") or None,     # e.g. hi; unset: detect
+        )
+    raise ValueError(f"Unknown STT backend: {name!r}")
@@ -0,0 +1,106 @@
+"""
+One Whisper model serving many concurrent calls.
+
+Call sessions submit audio windows; a single batcher collects them into
+micro-batches of up to ``max_batch`` windows, waiting at most
+``max_wait_ms`` after the first one arrives, and runs each batch through
+one batched forward pass in a worker thread. Every caller gets back the
+text for its own window.
+"""
+
+import asyncio
+import time
+from typing import Callable, Sequence
+
+import numpy as np
+
+InferFn = Callable[[Sequence[np.ndarray]], list[str]]
+
+
+def whisper_batch_fn(model, language: str | None = None) -> InferFn:
+    """
+    Batched decode of ≤30 s windows with openai-whisper. ``language`` None
+    detects it per window, as calls switch between Hindi and English.
+    """
+    import torch
+    import whisper
+
+    options = whisper.DecodingOptions(fp16=False, language=language, without_timestamps=True)
+    n_mels = getattr(model.dims, "n_mels", 80)
+
+    def infer(windows: Sequence[np.ndarray]) -> list[str]:
+        mel = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(w)), n_mels)
+            for w in windows
+        ]).to(model.device)
+        with torch.no_grad():
+            results = model.decode(mel, options)
+        return [r.text.strip() for r in results]
+
+    return infer
+
+
+class BatchInferenceServer:
+    def __init__(self, infer: InferFn, max_batch: int = 8, max_wait_ms: float = 200.0):
+        self.infer = infer
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.batches = 0
+        self.windows = 0
+        self.latencies: list[float] = []          # submit → result, seconds
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._batcher())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def transcribe(self, samples: np.ndarray) -> str:
+        """Queue one 16 kHz float32 window and wait for its text."""
+        await self.start()
+        fut = asyncio.get_running_loop().create_future()
+        submitted = time.perf_counter()
+        self._queue.put_nowait((samples, fut))
+        text = await fut
+        self.latencies.append(time.perf_counter() - submitted)
+        return text
+
+    @property
+    def mean_batch(self) -> float:
+        return self.windows / self.batches if self.batches else 0.0
+
+    async def _batcher(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            batch = [(s, f) for s, f in batch if not f.cancelled()]
+            if not batch:
+                continue
+            self.batches += 1
+            self.windows += len(batch)
+            try:
+                texts = await asyncio.to_thread(self.infer, [s for s, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut), text in zip(batch, texts):
+                if not fut.done():
+                    fut.set_result(text)
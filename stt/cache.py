@@ -0,0 +1,261 @@
+"""
+Content-addressed cache for remote STT and LLM results.
+
+Scam scripts repeat almost word for word across calls, so the same
+transcript (or the same recorded audio) keeps going to Groq. Results are
+cached under a key derived from the content itself:
+
+    verdicts     normalized transcript text, plus an optional 64-bit
+                 simhash so near-duplicates ("share the OTP" vs "share
+                 your OTP") also hit
+    transcripts  a fingerprint of the audio's spectral shape (signs of
+                 band-energy differences), so volume doesn't matter
+
+Entries leave by LRU (``max_entries``) or age (``ttl``). With a ``path``
+every entry is also written to SQLite, so a restarted process starts
+warm. Counters: hits, near_hits, misses, expired, evictions.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+import numpy as np
+
+from stt.matcher import tokenize
+
+_MISSING = object()
+_SIGN = 1 << 63
+
+
+# ─── Keys ─────────────────────────────────────────────────────────────────────
+
+def normalize_text(text: str) -> str:
+    """Case, punctuation and spacing don't change what was said."""
+    return " ".join(tokenize(text))
+
+
+def _hash64(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little")
+
+
+def simhash(text: str) -> int:
+    """64-bit simhash over word unigrams and bigrams."""
+    tokens = tokenize(text)
+    feats = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not feats:
+        return 0
+    hashes = np.fromiter((_hash64(f) for f in feats), np.uint64, len(feats))
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(feats)
+    return int(np.packbits(votes > 0, bitorder="little").view("<u8")[0])
+
+
+def audio_fingerprint(samples: np.ndarray, rate: int, frame_ms: int = 100, bands: int = 8) -> str:
+    """
+    Key for a block of audio: per frame, which of two neighbouring bands
+    gained energy relative to the previous frame. Coarse on purpose: a
+    replay of the same recording, even at another volume or re-encoded,
+    usually lands on the same key.
+    """
+    x = np.asarray(samples, dtype=np.float32)
+    frame = rate * frame_ms // 1000
+    n = len(x) // frame
+    if n < 2:
+        return hashlib.blake2b(x.tobytes(), digest_size=16).hexdigest()
+    spec = np.abs(np.fft.rfft(x[:n * frame].reshape(n, frame), axis=1)) ** 2
+    edges = np.geomspace(300, min(3400, rate / 2), bands + 1) * frame / rate
+    edges = np.unique(edges.astype(int))
+    energy = np.log(np.add.reduceat(spec, edges[:-1], axis=1) + 1e-10)
+    diff = energy[:, :-1] - energy[:, 1:]
+    bits = (diff[1:] - diff[:-1]) > 0
+    digest = hashlib.blake2b(np.packbits(bits).tobytes(), digest_size=16)
+    digest.update(n.to_bytes(4, "little"))
+    return digest.hexdigest()
+
+
+# ─── Cache ────────────────────────────────────────────────────────────────────
+
+class ContentCache:
+    def __init__(self, path: str | None = None, namespace: str = "default",
+                 max_entries: int = 10_000, ttl: float = 7 * 86400, near_bits: int = 0):
+        """
+        ``near_bits`` > 0 enables near-duplicate lookups: an entry whose
+        simhash differs in at most that many bits counts as a hit. The
+        64 bits are split into ``near_bits + 1`` bands, so any such entry
+        shares at least one band exactly and only those are compared.
+        """
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.near_bits = near_bits
+        self.hits = self.near_hits = self.misses = self.expired = self.evictions = 0
+
+        self._entries: OrderedDict[str, tuple[Any, float, int | None]] = OrderedDict()
+        self._band_width = 64 // (near_bits + 1)
+        self._bands: dict[tuple[int, int], set[str]] = {}
+        self._touched: dict[str, float] = {}
+        self._lock = threading.Lock()     # ll.py calls in from worker threads
+        self._db: sqlite3.Connection | None = None
+        if path:
+            self._open(path)
+
+    # ─── persistence ──────────────────────────────────────────────────────
+
+    def _open(self, path: str):
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("""CREATE TABLE IF NOT EXISTS cache (
+                          ns TEXT, key TEXT, value TEXT, expires REAL, sim INTEGER, used REAL,
+                          PRIMARY KEY (ns, key))""")
+        db.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+        rows = db.execute(
+            "SELECT key, value, expires, sim FROM cache WHERE ns = ? ORDER BY used DESC LIMIT ?",
+            (self.namespace, self.max_entries),
+        ).fetchall()
+        for key, value, expires, sim in reversed(rows):     # least recent first
+            self._insert(key, json.loads(value), expires, None if sim is None else sim % (1 << 64))
+        db.commit()
+        self._db = db
+
+    def close(self):
+        """Persist recency of entries hit since they were written."""
+        with self._lock:
+            if self._db is None:
+                return
+            self._db.executemany("UPDATE cache SET used = ? WHERE ns = ? AND key = ?",
+                                 [(t, self.namespace, k) for k, t in self._touched.items()])
+            self._db.commit()
+            self._db.close()
+            self._db = None
+            self._touched.clear()
+
+    # ─── index ────────────────────────────────────────────────────────────
+
+    def _band_keys(self, sim: int):
+        w = self._band_width
+        mask = (1 << w) - 1
+        return [(b, (sim >> (b * w)) & mask) for b in range(self.near_bits + 1)]
+
+    def _insert(self, key, value, expires, sim):
+        self._entries[key] = (value, expires, sim)
+        if self.near_bits and sim is not None:
+            for band in self._band_keys(sim):
+                self._bands.setdefault(band, set()).add(key)
+
+    def _remove(self, key):
+        _, _, sim = self._entries.pop(key)
+        self._touched.pop(key, None)
+        if self.near_bits and sim is not None:
+            for band in self._band_keys(sim):
+                keys = self._bands.get(band)
+                if keys:
+                    keys.discard(key)
+                    if not keys:
+                        del self._bands[band]
+        if self._db:
+            self._db.execute("DELETE FROM cache WHERE ns = ? AND key = ?", (self.namespace, key))
+
+    def _near(self, sim: int, now: float) -> str | None:
+        for band in self._band_keys(sim):
+            for key in self._bands.get(band, ()):
+                _, expires, other = self._entries[key]
+                if expires >= now and bin(sim ^ other).count("1") <= self.near_bits:
+                    return key
+        return None
+
+    # ─── API ──────────────────────────────────────────────────────────────
+
+    def get(self, key: str, sim: int | None = None, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] < now:
+                self._remove(key)
+                self.expired += 1
+                entry = None
+            if entry is None and self.near_bits and sim is not None:
+                near = self._near(sim, now)
+                if near is not None:
+                    key, entry = near, self._entries[near]
+                    self.near_hits += 1
+            elif entry is not None:
+                self.hits += 1
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self._touched[key] = now
+            return entry[0]
+
+    def put(self, key: str, value, sim: int | None = None):
+        now = time.time()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._insert(key, value, now + self.ttl, sim)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            if self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), now + self.ttl,
+                     None if sim is None else (sim ^ _SIGN) - _SIGN, now),   # SQLite ints are signed
+                )
+                self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+        }
+
+
+# ─── Wrappers ─────────────────────────────────────────────────────────────────
+
+def cached_classifier(classify: Callable[[str], tuple[bool, float]],
+                      cache: ContentCache) -> Callable[[str], tuple[bool, float]]:
+    """text → (fraud, confidence), answered from ``cache`` when possible."""
+
+    def wrapper(text: str) -> tuple[bool, float]:
+        key = normalize_text(text)
+        sim = simhash(key) if cache.near_bits else None
+        hit = cache.get(key, sim, _MISSING)
+        if hit is not _MISSING:
+            return bool(hit[0]), float(hit[1])
+        fraud, conf = classify(text)
+        cache.put(key, [fraud, conf], sim)
+        return fraud, conf
+
+    return wrapper
+
+
+def cached_transcriber(transcribe: Callable[[bytes], str], cache: ContentCache,
+                       rate: int) -> Callable[[bytes], str]:
+    """16-bit PCM bytes → text, answered from ``cache`` when possible."""
+
+    def wrapper(audio: bytes) -> str:
+        key = audio_fingerprint(np.frombuffer(audio, dtype=np.int16), rate)
+        hit = cache.get(key, default=_MISSING)
+        if hit is not _MISSING:
+            return hit
+        text = transcribe(audio)
+        cache.put(key, text)
+        return text
+
+    return wrapper
@@ -0,0 +1,200 @@
+"""
+Audio capture for the desktop clients, off the event loop.
+
+The input device never blocks a coroutine: PyAudio runs it in callback
+mode, and PortAudio's own thread only copies each block into a
+RingBuffer (stt/local_stream.py) and wakes the loop. ``AudioCapture`` is
+the consumer side, an async iterator of fixed-duration int16 frames at
+whatever rate the STT backend wants:
+
+    async with AudioCapture(MicrophoneSource(), rate=16000, frame_ms=20) as mic:
+        async for frame in mic:
+            await ws.send(frame.tobytes())
+
+The device keeps its own rate (often 44.1 or 48 kHz) and frames are
+resampled on the way out with stt.audio.Resampler. Audio the consumer
+is too slow to collect is overwritten in the ring and counted, never
+queued without bound.
+
+A source is anything with a ``rate`` and ``start(write, done)`` /
+``stop()``, where ``write`` is called with int16 blocks from the source's
+thread. SyntheticSource plays a signal in real time from a thread, so
+clients and benches run without a device; ``open_source`` returns one
+for the WAV file in AUDIO_INPUT, if set, and the microphone otherwise.
+"""
+
+import asyncio
+import os
+import threading
+import time
+import wave
+from typing import Callable
+
+import numpy as np
+
+from stt.audio import Resampler
+from stt.local_stream import RingBuffer
+
+Write = Callable[[np.ndarray], None]
+
+
+class MicrophoneSource:
+    """An input device through PyAudio, in callback mode."""
+
+    def __init__(self, rate: int | None = None, device: int | None = None, block_ms: int = 20):
+        """``rate`` defaults to the device's own, so it never resamples in the driver."""
+        import pyaudio      # only the desktop clients need PortAudio
+        self._pyaudio = pyaudio
+        self._pa = pyaudio.PyAudio()
+        info = (self._pa.get_device_info_by_index(device) if device is not None
+                else self._pa.get_default_input_device_info())
+        self.device = device
+        self.rate = rate or int(info["defaultSampleRate"])
+        self.block = self.rate * block_ms // 1000
+        self._stream = None
+
+    def start(self, write: Write, done: Callable[[], None]):
+        def callback(in_data, frame_count, time_info, status):
+            write(np.frombuffer(in_data, dtype=np.int16))
+            return None, self._pyaudio.paContinue
+
+        self._stream = self._pa.open(format=self._pyaudio.paInt16, channels=1, rate=self.rate,
+                                     input=True, input_device_index=self.device,
+                                     frames_per_buffer=self.block, stream_callback=callback)
+        self._stream.start_stream()
+
+    def stop(self):
+        if self._stream:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        self._pa.terminate()
+
+
+class SyntheticSource:
+    """
+    Plays ``samples`` from a thread in ``block_ms`` blocks, at ``speed``
+    times real time (0: as fast as possible), then reports done.
+    """
+
+    def __init__(self, samples: np.ndarray, rate: int, block_ms: int = 20, speed: float = 1.0):
+        self.samples = np.asarray(samples, dtype=np.int16)
+        self.rate = rate
+        self.block = max(1, rate * block_ms // 1000)
+        self.speed = speed
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def tone(cls, seconds: float, rate: int = 44100, hz: float = 440.0, level: float = 0.2,
+             **kwargs) -> "SyntheticSource":
+        t = np.arange(int(seconds * rate)) / rate
+        return cls((np.sin(2 * np.pi * hz * t) * level * 32767).astype(np.int16), rate, **kwargs)
+
+    @classmethod
+    def from_wav(cls, path: str, **kwargs) -> "SyntheticSource":
+        """A 16-bit PCM WAV at its own rate, mixed down to mono."""
+        with wave.open(path, "rb") as wf:
+            if wf.getsampwidth() != 2:
+                raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+            rate, channels = wf.getframerate(), wf.getnchannels()
+            samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1).astype(np.int16)
+        return cls(samples, rate, **kwargs)
+
+    def start(self, write: Write, done: Callable[[], None]):
+        def play():
+            step = self.block / self.rate / self.speed if self.speed else 0.0
+            deadline = time.perf_counter()
+            for i in range(0, len(self.samples), self.block):
+                if step:
+                    deadline += step
+                    if self._stop.wait(max(0.0, deadline - time.perf_counter())):
+                        return
+                elif self._stop.is_set():
+                    return
+                write(self.samples[i:i + self.block])
+            done()
+
+        self._thread = threading.Thread(target=play, name="synthetic-audio", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+
+def open_source(rate: int | None = None):
+    """The WAV file in AUDIO_INPUT (played in real time) if set, else the microphone."""
+    path = os.getenv("AUDIO_INPUT")
+    return SyntheticSource.from_wav(path) if path else MicrophoneSource(rate)
+
+
+class AudioCapture:
+    def __init__(self, source, rate: int = 16000, frame_ms: int = 20, ring_s: float = 5.0):
+        self.source = source
+        self.rate = rate
+        self.frame = rate * frame_ms // 1000
+        self.frames = 0
+        self.ring = RingBuffer(int(ring_s * source.rate))
+        self._resample = Resampler(source.rate, rate)
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ready = asyncio.Event()
+        self._done = False
+
+    # ─── source thread ──────────────────────────────────────────────────────
+
+    def _write(self, samples: np.ndarray):
+        self.ring.write(samples)
+        self._wake()
+
+    def _finished(self):
+        self._done = True
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            pass        # loop already closed: shutting down
+
+    # ─── event loop ─────────────────────────────────────────────────────────
+
+    async def __aenter__(self) -> "AudioCapture":
+        self._loop = asyncio.get_running_loop()
+        self.source.start(self._write, self._finished)
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.to_thread(self.source.stop)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> np.ndarray:
+        """The next ``frame_ms`` of audio as int16 at ``rate``."""
+        while len(self._pending) < self.frame:
+            done = self._done                   # read before draining: nothing can follow it
+            _, samples = self.ring.read()
+            if len(samples):
+                out = self._resample(np.rint(samples).astype(np.int16))
+                self._pending = np.concatenate((self._pending, out))
+                continue
+            if done:
+                if not len(self._pending):
+                    raise StopAsyncIteration
+                self._pending = np.concatenate(         # pad the last frame with silence
+                    (self._pending, np.zeros(self.frame - len(self._pending), dtype=np.int16)))
+                break
+            self._ready.clear()
+            await self._ready.wait()
+        frame, self._pending = self._pending[:self.frame], self._pending[self.frame:]
+        self.frames += 1
+        return frame
+
+    def stats(self) -> dict:
+        return {"frames": self.frames, "audio_s": self.frames * self.frame / self.rate,
+                "dropped_s": self.ring.overruns / self.source.rate}
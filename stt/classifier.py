@@ -0,0 +1,381 @@
+"""
+Tiered fraud classification.
+
+Most transcript windows are ordinary conversation, so a remote LLM call
+per window is wasted latency and money. Each window goes through a
+cascade and stops at the first tier that is confident:
+
+    keywords  weighted keywords (stt/keywords.py) + regexes on the matcher;
+              settles windows that name an OTP, UPI PIN, card number, ...
+    model     hashed TF-IDF + logistic regression in NumPy, trained from
+              a small labelled corpus (prebuilt in stt/data); settles
+              clearly benign or clearly fraudulent windows, small talk
+              included
+    llm       the remote LLM, only for windows the model is unsure about
+
+Every Verdict records the tier that made it. Thresholds live in one
+Thresholds tuple so deployments can trade escalations for recall.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+import zlib
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Sequence
+
+import numpy as np
+
+from stt.keywords import CREDENTIAL, PAYMENT, KeywordSnapshot, load_entries
+from stt.fuzzy import normalize_text
+from stt.matcher import KeywordMatcher, tokenize
+
+KEYWORDS, MODEL, LLM = "keywords", "model", "llm"
+TIERS = (KEYWORDS, MODEL, LLM)
+
+SEED_CORPUS = Path(__file__).parent / "data" / "fraud_seed.jsonl"
+SEED_MODEL = Path(__file__).parent / "data" / "fraud_model.npz"    # python -m stt.classifier
+
+log = logging.getLogger(__name__)
+
+# The shipped dictionary (stt/data/fraud_keywords.json). Weights are the
+# probability that a window is fraud given the keyword alone; a window's
+# keyword score combines its hits as independent evidence. Categories let
+# the per-call risk engine (stt/risk.py) weigh a mix (urgency +
+# credentials) above any one of them. Servers reload the file at runtime
+# through stt.keywords.KeywordDictionary.
+DEFAULT_KEYWORDS = KeywordSnapshot(load_entries())
+KEYWORD_WEIGHTS = DEFAULT_KEYWORDS.weights
+
+# Things people read out that no keyword covers.
+PATTERN_WEIGHTS = {
+    "<card number>": (re.compile(r"\b(?:\d[ -]?){13,19}\b"), 0.7),
+    "<code>": (re.compile(r"\b\d{4,6}\b"), 0.2),
+}
+PATTERN_CATEGORIES = {"<card number>": PAYMENT, "<code>": CREDENTIAL}
+KEYWORD_CATEGORIES = DEFAULT_KEYWORDS.categories | PATTERN_CATEGORIES
+
+
+class Thresholds(NamedTuple):
+    keyword_fraud: float = 0.85   # keyword score that settles "fraud" outright
+    model_fraud: float = 0.8      # model probability at or above: fraud
+    model_clear: float = 0.2      # model probability at or below: not fraud
+
+
+class Verdict(NamedTuple):
+    fraud: bool
+    confidence: float             # confidence in ``fraud``, 0.0–1.0
+    tier: str                     # which tier decided
+    keywords: tuple[str, ...] = ()
+    latency_ms: float = 0.0       # time spent in the cascade
+
+
+# ─── Tier 1: keywords ─────────────────────────────────────────────────────────
+
+class KeywordScorer:
+    __slots__ = ("weights", "patterns", "matcher")
+
+    def __init__(self, weights: dict[str, float] | None = None,
+                 patterns: dict[str, tuple[re.Pattern, float]] = PATTERN_WEIGHTS,
+                 matcher: KeywordMatcher | None = None):
+        """Defaults to the shipped dictionary, variants included."""
+        if weights is None:
+            weights, matcher = KEYWORD_WEIGHTS, matcher or DEFAULT_KEYWORDS.matcher
+        self.weights = dict(weights)
+        self.patterns = dict(patterns)
+        self.matcher = matcher or KeywordMatcher(self.weights)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: KeywordSnapshot,
+                      patterns: dict[str, tuple[re.Pattern, float]] = PATTERN_WEIGHTS):
+        return cls(snapshot.weights, patterns, snapshot.matcher)
+
+    def score(self, text: str, keywords: Iterable[str] | None = None) -> tuple[float, tuple[str, ...]]:
+        """
+        (score, hits). Pass ``keywords`` when a streaming matcher already
+        found them; otherwise ``text`` is scanned here.
+        """
+        if keywords is None:
+            keywords = self.matcher.keywords_in(text)
+        hits = list(dict.fromkeys(keywords))
+        if self.matcher.fuzzy:
+            text = normalize_text(text)     # "four five six seven" reads as 4567
+        hits += [name for name, (rx, _) in self.patterns.items() if rx.search(text)]
+        miss = 1.0
+        for hit in hits:
+            miss *= 1.0 - self.weights.get(hit, self.patterns.get(hit, (None, 0.0))[1])
+        return 1.0 - miss, tuple(hits)
+
+
+# ─── Tier 2: local model ──────────────────────────────────────────────────────
+
+def _features(text: str) -> list[str]:
+    tokens = tokenize(text)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+class TextModel:
+    """
+    Logistic regression over hashed unigram + bigram TF-IDF features.
+    No vocabulary to store and no scikit-learn needed; a model is two
+    vectors and a bias, saved as one .npz file.
+    """
+
+    __slots__ = ("dim", "idf", "coef", "bias")
+
+    def __init__(self, dim: int = 1 << 16):
+        self.dim = dim
+        self.idf = np.ones(dim, dtype=np.float32)
+        self.coef = np.zeros(dim, dtype=np.float32)
+        self.bias = 0.0
+
+    def _hashed(self, text: str) -> tuple[np.ndarray, np.ndarray]:
+        feats = _features(text)
+        idx = np.fromiter((zlib.crc32(f.encode()) for f in feats), np.int64, len(feats)) % self.dim
+        return np.unique(idx, return_counts=True)
+
+    def vector(self, text: str) -> tuple[np.ndarray, np.ndarray]:
+        """Sparse L2-normalized TF-IDF vector as (indices, values)."""
+        idx, counts = self._hashed(text)
+        vals = (1.0 + np.log(counts)) * self.idf[idx]
+        norm = np.sqrt(np.dot(vals, vals))
+        return idx, vals / norm if norm else vals
+
+    def predict_proba(self, text: str) -> float:
+        idx, vals = self.vector(text)
+        z = float(np.dot(self.coef[idx], vals)) + self.bias
+        return float(1.0 / (1.0 + np.exp(-z)))
+
+    def fit(self, texts: Sequence[str], labels: Sequence[int], epochs: int = 2000,
+            lr: float = 10.0, l2: float = 1e-5) -> "TextModel":
+        """
+        Full-batch gradient descent; fine for corpora of a few thousand
+        windows. Classes are weighted equally, so a corpus that is mostly
+        small talk (as calls are) doesn't pull every score towards 0.
+        """
+        n = len(texts)
+        hashed = [self._hashed(t) for t in texts]
+        df = np.zeros(self.dim, dtype=np.float32)
+        for idx, _ in hashed:
+            df[idx] += 1
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+
+        rows, cols, vals = [], [], []
+        for i, text in enumerate(texts):
+            idx, v = self.vector(text)
+            rows.append(np.full(len(idx), i))
+            cols.append(idx)
+            vals.append(v)
+        rows, cols, vals = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+        y = np.asarray(labels, dtype=np.float64)
+        pos = y.mean()
+        balance = np.where(y == 1, 0.5 / pos, 0.5 / (1 - pos)) if 0 < pos < 1 else 1.0
+
+        coef = np.zeros(self.dim, dtype=np.float64)
+        bias = 0.0
+        for _ in range(epochs):
+            z = np.bincount(rows, weights=coef[cols] * vals, minlength=n) + bias
+            err = (1.0 / (1.0 + np.exp(-z)) - y) * balance
+            grad = np.bincount(cols, weights=err[rows] * vals, minlength=self.dim) / n
+            coef -= lr * (grad + l2 * coef)
+            bias -= lr * err.mean()
+        self.coef = coef.astype(np.float32)
+        self.bias = float(bias)
+        return self
+
+    def save(self, path: str | Path, source: str = ""):
+        """``source`` identifies the training data, see ``seed``."""
+        np.savez_compressed(path, idf=self.idf, coef=self.coef, bias=self.bias, source=source)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TextModel":
+        data = np.load(path)
+        model = cls(len(data["coef"]))
+        model.idf, model.coef, model.bias = data["idf"], data["coef"], float(data["bias"])
+        return model
+
+    @classmethod
+    def seed(cls) -> "TextModel":
+        """
+        The model for SEED_CORPUS: loaded from SEED_MODEL when that was
+        built from the corpus as it is now, otherwise trained here (~0.5 s).
+        """
+        source = _digest(SEED_CORPUS)
+        try:
+            with np.load(SEED_MODEL) as data:
+                fresh = str(data["source"]) == source
+            if fresh:
+                return cls.load(SEED_MODEL)
+        except (OSError, KeyError, ValueError):
+            pass
+        log.info("🧠 Training the seed model (prebuilt one missing or stale)",
+                 extra={"path": str(SEED_MODEL)})
+        return cls.from_jsonl(SEED_CORPUS)
+
+    @classmethod
+    def from_jsonl(cls, path: str | Path = SEED_CORPUS, **fit_kwargs) -> "TextModel":
+        """Train on lines of {"text": ..., "fraud": 0/1}."""
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        return cls().fit([r["text"] for r in rows], [int(r["fraud"]) for r in rows], **fit_kwargs)
+
+
+def _digest(path: Path) -> str:
+    return f"{zlib.crc32(path.read_bytes()):08x}"
+
+
+# ─── Tier 3: LLM ──────────────────────────────────────────────────────────────
+
+LLMFn = Callable[[str], tuple[bool, float]]
+
+
+def groq_llm(client=None, model: str = "llama3-70b-8192") -> LLMFn:
+    """
+    Blocking Groq chat classifier: text → (fraud, confidence). Raises
+    ValueError when the reply is not the JSON verdict asked for.
+    """
+    if client is None:
+        from groq import Groq
+        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+
+    def detect_fraud(text: str) -> tuple[bool, float]:
+        prompt = (
+            "Classify whether the following transcript contains fraud or malicious intent.\n"
+            "Respond only with JSON: {\"fraud\":true/false,\"confidence\":<0.0–1.0>}.\n\n"
+            f"Transcript: \"\"\"{text}\"\"\""
+        )
+        response = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": "You are a helpful assistant that outputs JSON only."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.0,
+            max_tokens=100
+        )
+        out = response.choices[0].message.content.strip()
+        # No guessing on a reply we can't read: the caller falls back to the
+        # local verdict, and nothing is cached
+        try:
+            fraud_obj = json.loads(out)
+            fraud, confidence = fraud_obj["fraud"], float(fraud_obj["confidence"])
+            if not isinstance(fraud, bool) or not 0.0 <= confidence <= 1.0:
+                raise ValueError(f"unexpected verdict {fraud_obj!r}")
+        except (ValueError, KeyError, TypeError) as e:
+            log.warning("⚠️ Unreadable LLM verdict", extra={"error": repr(e), "reply": out[:200]})
+            raise ValueError(f"unreadable LLM verdict: {out[:200]!r}") from e
+        return fraud, confidence
+
+    return detect_fraud
+
+
+# ─── Cascade ──────────────────────────────────────────────────────────────────
+
+class TieredClassifier:
+    def __init__(self, scorer: KeywordScorer | None = None, model: TextModel | None = None,
+                 llm: LLMFn | None = None, thresholds: Thresholds = Thresholds()):
+        """
+        ``llm`` is optional; without it, windows the model can't settle
+        are reported as not fraud (tier "model") rather than guessed.
+        """
+        self.scorer = scorer or KeywordScorer()
+        self.model = model or TextModel.seed()
+        self.llm = llm
+        self.thresholds = thresholds
+        self.decided = dict.fromkeys(TIERS, 0)      # verdicts per deciding tier
+        self.calls = dict.fromkeys(TIERS, 0)        # windows that reached each tier
+        self.seconds = dict.fromkeys(TIERS, 0.0)    # time spent in each tier
+
+    def _timed(self, tier: str, started: float) -> float:
+        now = time.perf_counter()
+        self.calls[tier] += 1
+        self.seconds[tier] += now - started
+        return now
+
+    def _verdict(self, fraud: bool, confidence: float, tier: str,
+                 hits: tuple[str, ...], started: float) -> Verdict:
+        self.decided[tier] += 1
+        return Verdict(fraud, confidence, tier, hits, (time.perf_counter() - started) * 1000)
+
+    def _local(self, text: str, keywords: Iterable[str] | None, started: float):
+        """Tiers 1 and 2: (verdict or None if uncertain, hits, probability)."""
+        th = self.thresholds
+        score, hits = self.scorer.score(text, keywords)
+        t = self._timed(KEYWORDS, started)
+        if score >= th.keyword_fraud:
+            return self._verdict(True, score, KEYWORDS, hits, started), hits, score
+
+        # Keyword evidence the model never saw still counts.
+        prob = 1.0 - (1.0 - self.model.predict_proba(text)) * (1.0 - score)
+        self._timed(MODEL, t)
+        if prob >= th.model_fraud:
+            return self._verdict(True, prob, MODEL, hits, started), hits, prob
+        if prob <= th.model_clear:
+            return self._verdict(False, 1.0 - prob, MODEL, hits, started), hits, prob
+        return None, hits, prob
+
+    def _undecided(self, hits, prob, started) -> Verdict:
+        return self._verdict(False, 1.0 - prob, MODEL, hits, started)
+
+    def classify(self, text: str, keywords: Iterable[str] | None = None,
+                 escalate: bool = True) -> Verdict:
+        """Blocking; the LLM (if any) is only called when ``escalate`` is set."""
+        started = time.perf_counter()
+        verdict, hits, prob = self._local(text, keywords, started)
+        if verdict:
+            return verdict
+        if not (escalate and self.llm):
+            return self._undecided(hits, prob, started)
+        t = time.perf_counter()
+        try:
+            fraud, conf = self.llm(text)
+        except Exception as e:
+            self._timed(LLM, t)             # reached the LLM, even if it didn't answer
+            log.warning("⚠️ LLM classification failed", extra={"error": repr(e)})
+            return self._undecided(hits, prob, started)
+        self._timed(LLM, t)
+        return self._verdict(fraud, conf, LLM, hits, started)
+
+    async def aclassify(self, text: str, keywords: Iterable[str] | None = None,
+                        escalate: bool = True) -> Verdict:
+        """Local tiers inline (sub-millisecond); the LLM in a worker thread."""
+        started = time.perf_counter()
+        verdict, hits, prob = self._local(text, keywords, started)
+        if verdict:
+            return verdict
+        if not (escalate and self.llm):
+            return self._undecided(hits, prob, started)
+        t = time.perf_counter()
+        try:
+            fraud, conf = await asyncio.to_thread(self.llm, text)
+        except Exception as e:
+            self._timed(LLM, t)             # reached the LLM, even if it didn't answer
+            log.warning("⚠️ LLM classification failed", extra={"error": repr(e)})
+            return self._undecided(hits, prob, started)
+        self._timed(LLM, t)
+        return self._verdict(fraud, conf, LLM, hits, started)
+
+    @property
+    def escalation_rate(self) -> float:
+        """Share of windows that had to go to the LLM."""
+        total = sum(self.decided.values())
+        return self.calls[LLM] / total if total else 0.0
+
+    def report(self) -> str:
+        lines = []
+        for tier in TIERS:
+            n = self.calls[tier]
+            mean = self.seconds[tier] / n * 1e3 if n else 0.0
+            lines.append(f"{tier:>9}: reached {n:<5} decided {self.decided[tier]:<5} "
+                         f"mean {mean:8.3f} ms")
+        lines.append(f"{'escalated':>9}: {self.escalation_rate:.1%}")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Rebuild the prebuilt seed model after editing the corpus
+    TextModel.from_jsonl(SEED_CORPUS).save(SEED_MODEL, _digest(SEED_CORPUS))
+    print(f"wrote {SEED_MODEL}")
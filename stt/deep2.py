@@ -1,13 +1,17 @@
 import os
 import asyncio
 import json
-import pyaudio
 import websockets
 import tkinter as tk
 from tkinter import messagebox
 import threading
+import time
 from dotenv import load_dotenv
 
+from stt.capture import AudioCapture, open_source
+from stt.keywords import KeywordSnapshot, load_entries
+from stt.stability import POLICIES, HitStability
+
 # Load environment variables
 load_dotenv()
 
@@ -16,19 +20,10 @@ DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
 if not DEEPGRAM_API_KEY:
     raise RuntimeError("Set DEEPGRAM_API_KEY in your environment")
 
-# Fraud detection keywords
-fraud_keywords = [
-    "otp", "one time password", "ek baar ka password",
-    "account number", "bank account",
-    "debit card", "credit card",
-    "upi pin", "upi password",
-    "send money", "transfer money",
-    "bank verification", "account verification",
-    "kyc update", "kyc verification",
-    "government penalty", "fine", "penalty",
-    "urgent", "emergency", "immediately",
-    "password", "pin", "secret code"
-]
+# Fraud detection keywords: the shared dictionary (stt/data/fraud_keywords.json)
+fraud_matcher = KeywordSnapshot(load_entries()).matcher
+# Interim keyword hits warn once they hold; the call is halted once they're confirmed
+STABILITY = POLICIES[os.getenv("EARLY_ALERT", "stable")]
 
 # Flag to control the audio stream
 stop_flag = threading.Event()
@@ -40,29 +35,28 @@ def show_fraud_alert():
     messagebox.showwarning("⚠️ Fraud Detected!", "Suspicious conversation detected.\nCall halted.")
     root.destroy()
 
+# Deepgram is sent 16 kHz whatever rate the microphone runs at
+DG_RATE = 16000
+FRAME_MS = 20
+
 # Build the Deepgram WebSocket URL with query parameters
 DG_URL = (
     "wss://api.deepgram.com/v1/listen"
     "?encoding=linear16"
-    "&sample_rate=44100"
+    f"&sample_rate={DG_RATE}"
     "&channels=1"
     "&punctuate=true"
+    "&interim_results=true"
 )
 
 async def transcribe_live():
-    # Set up PyAudio for microphone capture
-    pa = pyaudio.PyAudio()
-    stream = pa.open(
-        format=pyaudio.paInt16,
-        channels=1,
-        rate=16000,
-        input=True,
-        frames_per_buffer=1024,
-    )
+    # Microphone capture runs on PortAudio's thread (never blocking the loop);
+    # frames arrive here already resampled to DG_RATE
+    source = open_source(16000)
 
     try:
         # Connect with proper authentication header
-        async with websockets.connect(
+        async with AudioCapture(source, DG_RATE, FRAME_MS) as mic, websockets.connect(
             DG_URL,
             additional_headers={"Authorization": f"Token {DEEPGRAM_API_KEY}"}
         ) as ws:
@@ -70,34 +64,44 @@ async def transcribe_live():
             
             async def send_audio():
                 try:
-                    while not stop_flag.is_set():
-                        data = stream.read(1024, exception_on_overflow=False)
-                        await ws.send(data)  # send raw PCM bytes
+                    async for frame in mic:
+                        if stop_flag.is_set():
+                            break
+                        await ws.send(frame.tobytes())  # send raw PCM bytes
+                    # Out of audio (or stopped): Deepgram flushes its last results and closes
+                    await ws.send(json.dumps({"type": "CloseStream"}))
                 except websockets.ConnectionClosed:
                     print("🔴 Connection closed during audio sending")
                 except Exception as e:
                     print(f"Error sending audio: {str(e)}")
 
             async def receive_transcripts():
+                keyword_stream = fraud_matcher.stream()
+                stability = HitStability(STABILITY)
                 try:
                     async for message in ws:
                         if stop_flag.is_set():
                             break
                             
                         res = json.loads(message)
-                        # ignore interim results unless you want them; only print finals
-                        if res.get("is_final"):
-                            transcript = res["channel"]["alternatives"][0]["transcript"]
+                        if res.get("type", "Results") != "Results":
+                            continue
+                        transcript = res["channel"]["alternatives"][0]["transcript"]
+                        is_final = bool(res.get("is_final"))
+                        # only print finals
+                        if is_final and transcript:
                             print(f"🗣  {transcript}")
-                            
-                            # Check for fraud keywords
-                            transcript_lower = transcript.lower()
-                            for keyword in fraud_keywords:
-                                if keyword in transcript_lower:
-                                    print(f"🚨 FRAUD DETECTED! (Keyword: {keyword.upper()})")
-                                    stop_flag.set()
-                                    show_fraud_alert()
-                                    break
+
+                        # Check for fraud keywords, interims included
+                        keyword_stream.feed(transcript, is_final)
+                        suspected, confirmed = stability.update(
+                            keyword_stream.live(), time.monotonic() * 1000, is_final)
+                        if confirmed:
+                            print(f"🚨 FRAUD DETECTED! (Keyword: {confirmed[0].upper()})")
+                            stop_flag.set()
+                            show_fraud_alert()
+                        elif suspected:
+                            print(f"🟠 Possible fraud (Keyword: {suspected[0].upper()}), confirming…")
                 except websockets.ConnectionClosed:
                     print("🔴 Connection closed during transcript receiving")
                 except Exception as e:
@@ -109,10 +113,6 @@ async def transcribe_live():
     except Exception as e:
         print(f"Connection error: {str(e)}")
     finally:
-        # Clean up
-        stream.stop_stream()
-        stream.close()
-        pa.terminate()
         print("🔴 Connection closed")
 
 if __name__ == "__main__":
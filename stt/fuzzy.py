@@ -0,0 +1,278 @@
+"""
+Fuzzy keyword matching for noisy ASR output.
+
+Speech recognizers rarely get the exact token a keyword list expects:
+"o t p", "kay why see update", "kredit kard", "verifikashun". Fuzzy
+matching maps every transcript token that is not in the keyword
+vocabulary onto one that is, before the token reaches the word-level
+automaton in stt/matcher.py, so streaming and phrase matching work
+unchanged:
+
+    letter names   "kay", "why", "see" → "k", "y", "c"; short keywords
+                   are also compiled in spelled out ("k y c update")
+    phonetic key   tokens of 4+ letters whose key (consonant skeleton,
+                   c/k/q and v/w merged, "ph" → f, "tion" → sn, ...)
+                   matches a vocabulary word within len/3 edits
+    edit distance  tokens of 6+ letters within 1 edit (2 from 9 letters)
+                   of a vocabulary word, found through a deletion index
+
+Short tokens only match exactly or spelled out: "pen" is not "pin".
+Lookups go through an LRU cache, since a call says the same few hundred
+words over and over. ``normalize_text`` also collapses spelled-out
+letters and number words ("four five double six" → "4566"), which is
+what the digit patterns in stt/classifier.py run on.
+"""
+
+from collections import OrderedDict
+from itertools import product
+from typing import Iterable
+
+LETTER_NAMES = {
+    "ay": "a", "ae": "a", "bee": "b", "be": "b", "see": "c", "sea": "c", "si": "c",
+    "dee": "d", "di": "d", "ee": "e", "ef": "f", "eff": "f", "gee": "g", "jee": "g",
+    "aitch": "h", "edge": "h", "eye": "i", "aye": "i", "jay": "j", "jai": "j",
+    "kay": "k", "kei": "k", "el": "l", "ell": "l", "em": "m", "en": "n", "oh": "o",
+    "pee": "p", "pe": "p", "pi": "p", "queue": "q", "cue": "q", "kyu": "q",
+    "are": "r", "ar": "r", "es": "s", "ess": "s", "tee": "t", "ti": "t", "you": "u",
+    "yu": "u", "vee": "v", "vi": "v", "ex": "x", "why": "y", "wai": "y",
+    "zee": "z", "zed": "z",
+}
+
+NUMBER_WORDS = {
+    "zero": "0", "oh": "0", "one": "1", "two": "2", "three": "3", "four": "4",
+    "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9",
+}
+# Hindi, as heard in Hinglish calls. Several are also English words ("do",
+# "char"), so one only reads as a digit next to another Hindi number word
+HINDI_NUMBERS = {
+    "shunya": "0", "ek": "1", "do": "2", "teen": "3", "char": "4", "chaar": "4",
+    "paanch": "5", "panch": "5", "chhe": "6", "chah": "6", "saat": "7",
+    "aath": "8", "nau": "9",
+}
+NUMBER_WORDS.update(HINDI_NUMBERS)
+REPEATS = {"double": 2, "triple": 3}
+
+MAX_SPELLED = 4          # keyword tokens up to this long are also matched spelled out
+MIN_PHONETIC = 4         # shorter tokens never match phonetically
+MIN_EDIT = 6             # ... or by edit distance alone (1 edit)
+MIN_EDIT_2 = 9           # 2 edits
+
+_DIGRAPHS = (("tion", "sn"), ("sion", "sn"), ("ph", "f"), ("sh", "s"), ("ch", "c"),
+             ("ck", "k"), ("qu", "k"), ("kh", "k"), ("gh", "g"), ("th", "t"),
+             ("dh", "d"), ("bh", "b"), ("x", "ks"))
+_MERGE = str.maketrans("cqwz", "kkvs")
+_VOWELS = frozenset("aeiouyh")
+
+
+def phonetic_key(word: str) -> str:
+    """Consonant skeleton of a lower-case Latin word; '' for anything else."""
+    if not word.isascii() or not word.isalpha():
+        return ""
+    for a, b in _DIGRAPHS:
+        word = word.replace(a, b)
+    word = word.translate(_MERGE)
+    key = ["a" if word[0] in _VOWELS else word[0]]
+    for ch in word[1:]:
+        if ch not in _VOWELS and ch != key[-1]:
+            key.append(ch)
+    return "".join(key)
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance, or ``limit + 1`` when the lengths alone rule out
+    ``limit``. Bit-parallel (Myers/Hyyrö): one pass over ``b`` with ``a``
+    held as bit masks, instead of a len(a) x len(b) table.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if not a:
+        return len(b)
+    peq: dict[str, int] = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | 1 << i
+    full = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    pv, mv, score = full, 0, len(a)
+    for ch in b:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1 | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+    return score
+
+
+def _deletes(word: str, depth: int) -> set[str]:
+    """``word`` with up to ``depth`` characters removed."""
+    found, frontier = {word}, {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+class DeletionIndex:
+    """
+    Words within a small edit distance, by hash lookup (the SymSpell
+    trick): every word is filed under itself and each string left after
+    deleting up to ``depth`` characters. Two words within distance d
+    share such a string, so a query probes its own deletions and
+    verifies the few candidates. Building is linear in the vocabulary,
+    which matters because it happens on every dictionary reload.
+    """
+
+    __slots__ = ("depth", "_index")
+
+    def __init__(self, words: Iterable[str], depth: int = 1):
+        self.depth = depth
+        self._index: dict[str, list[str]] = {}
+        for word in words:
+            for key in _deletes(word, depth):
+                self._index.setdefault(key, []).append(word)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def search(self, word: str, limit: int) -> list[tuple[int, str]]:
+        """(distance, word) for every word within ``limit`` (≤ depth), closest first."""
+        candidates = {w for key in _deletes(word, min(limit, self.depth))
+                      for w in self._index.get(key, ())}
+        return sorted((d, w) for w in candidates if (d := edit_distance(word, w, limit)) <= limit)
+
+
+def spellings(tokens: list[str]) -> list[list[str]]:
+    """``tokens`` with every short Latin token optionally spelled out, letter by letter."""
+    options = [[t, *([list(t)] if 1 < len(t) <= MAX_SPELLED and t.isascii() and t.isalpha() else [])]
+               for t in tokens]
+    return [[tok for part in combo for tok in ([part] if isinstance(part, str) else part)]
+            for combo in product(*options)][1:]
+
+
+class TokenNormalizer:
+    """
+    Maps a raw transcript token onto the keyword vocabulary (or leaves it
+    alone). Called like ``str.lower``, which is what exact matching uses.
+    """
+
+    __slots__ = ("vocabulary", "_phonetic", "_near", "_far", "_cache", "_cache_size")
+
+    def __init__(self, vocabulary: Iterable[str], cache_size: int = 4096):
+        self.vocabulary = frozenset(vocabulary)
+        self._phonetic: dict[str, list[str]] = {}
+        words = []
+        for w in sorted(w for w in self.vocabulary if len(w) >= MIN_PHONETIC):
+            key = phonetic_key(w)
+            if key:
+                self._phonetic.setdefault(key, []).append(w)
+                words.append(w)
+        self._near = DeletionIndex((w for w in words if len(w) >= MIN_EDIT), depth=1)
+        self._far = DeletionIndex((w for w in words if len(w) >= MIN_EDIT_2), depth=2)
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._cache_size = cache_size
+
+    def __call__(self, token: str) -> str:
+        token = token.lower()
+        if token in self.vocabulary:
+            return token
+        cache = self._cache
+        hit = cache.get(token)
+        if hit is not None:
+            cache.move_to_end(token)
+            return hit
+        canonical = self._lookup(token)
+        cache[token] = canonical
+        if len(cache) > self._cache_size:
+            cache.popitem(last=False)
+        return canonical
+
+    def _lookup(self, token: str) -> str:
+        letter = LETTER_NAMES.get(token)
+        if letter is not None:
+            return letter
+        if len(token) < MIN_PHONETIC:
+            return token
+        limit = max(1, len(token) // 3)
+        for word in self._phonetic.get(phonetic_key(token), ()):
+            if edit_distance(token, word, limit) <= limit:
+                return word
+        if len(token) >= MIN_EDIT:
+            found = (self._far.search(token, 2) if len(token) >= MIN_EDIT_2 else []) \
+                or self._near.search(token, 1)
+            if found:
+                return found[0][1]
+        return token
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lower-cased ``text`` with spelled-out letters joined ("o t p" → "otp")
+    and runs of number words read as digits ("four five double six" →
+    "4566"). A lone number word stays a word: "one time password". So does
+    a Hindi number word with no other Hindi one in its run: "do one thing".
+    """
+    out: list[str] = []
+    letters: list[str] = []
+    run: list[tuple[str, list[str], bool]] = []   # (digits, words behind them, Hindi)
+    repeat: str | None = None
+
+    def emit(units):
+        if len(units) > 1 or units and len(units[0][1]) > 1:
+            out.append("".join(d for d, _, _ in units))
+        else:
+            out.extend(w for _, words, _ in units for w in words)
+
+    def flush():
+        if len(letters) > 1:
+            out.append("".join(letters))
+        else:
+            out.extend(letters)
+        hindi = [i for i, (_, _, h) in enumerate(run) if h]
+        if len(hindi) == 1:
+            i = hindi[0]
+            emit(run[:i])
+            out.extend(run[i][1])
+            emit(run[i + 1:])
+        else:
+            emit(run)
+        letters.clear()
+        run.clear()
+
+    for word in text.lower().split():
+        bare = word.strip(".,;:!?")
+        digit = NUMBER_WORDS.get(bare)
+        if digit is not None and (run or bare != "oh"):
+            if letters:
+                flush()
+            words = [word]
+            if repeat:
+                digit *= REPEATS[repeat]
+                words.insert(0, repeat)
+                repeat = None
+            run.append((digit, words, bare in HINDI_NUMBERS))
+            continue
+        if repeat:
+            flush()
+            out.append(repeat)
+            repeat = None
+        if bare in REPEATS:
+            repeat = bare
+        elif len(bare) == 1 and bare.isalpha():
+            if run:
+                flush()
+            letters.append(bare)
+        else:
+            flush()
+            out.append(word)
+    flush()
+    if repeat:
+        out.append(repeat)
+    return " ".join(out)
@@ -0,0 +1,210 @@
+"""
+The fraud keyword dictionary as data, with versioned compiled snapshots.
+
+Keywords live in a JSON file (stt/data/fraud_keywords.json by default),
+not in code, so every client matches the same list and a deployment can
+change it without a restart:
+
+    {"keywords": [{"keyword": "one time password", "weight": 0.9,
+                   "category": "credential",
+                   "variants": ["ek baar ka password", "एक बार का पासवर्ड"]}, ...]}
+
+``weight`` is the probability of fraud given the keyword alone and
+``category`` one of CATEGORIES. Variants (transliterations, Hindi,
+alternative spellings) are matched as the keyword itself, so weights,
+risk signals and alerts only ever see the canonical name.
+
+A KeywordSnapshot is everything compiled from one version of the
+dictionary and is never mutated. KeywordDictionary holds the current
+snapshot and replaces it with a single assignment once a new one has
+been parsed and compiled in a worker thread; readers take ``current``
+once per call (or segment) and keep using that object, so a reload
+never blocks or half-updates a live call. Each snapshot carries a
+version number and a digest of its contents, which alerts report.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from stt.matcher import KeywordMatcher, tokenize
+
+CREDENTIAL, PAYMENT, AUTHORITY, URGENCY = "credential", "payment", "authority", "urgency"
+CATEGORIES = (AUTHORITY, CREDENTIAL, PAYMENT, URGENCY)
+
+DEFAULT_PATH = Path(__file__).parent / "data" / "fraud_keywords.json"
+
+log = logging.getLogger(__name__)
+
+
+class Entry(NamedTuple):
+    keyword: str
+    weight: float
+    category: str
+    variants: tuple[str, ...] = ()
+
+
+def parse_entries(data: dict) -> list[Entry]:
+    """Validate a dictionary document; raises ValueError on the first problem."""
+    if not isinstance(data, dict) or not isinstance(data.get("keywords"), list):
+        raise ValueError('expected {"keywords": [...]}')
+    entries, owner = [], {}
+    for i, item in enumerate(data["keywords"]):
+        try:
+            variants = item.get("variants", [])
+            if not isinstance(variants, list):
+                raise TypeError("variants must be a list")
+            entry = Entry(str(item["keyword"]).strip().lower(), float(item["weight"]),
+                          str(item["category"]), tuple(str(v).strip().lower() for v in variants))
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"keywords[{i}]: {e!r}") from None
+        if not 0.0 < entry.weight < 1.0:
+            raise ValueError(f"{entry.keyword!r}: weight must be between 0 and 1")
+        if entry.category not in CATEGORIES:
+            raise ValueError(f"{entry.keyword!r}: category must be one of {CATEGORIES}")
+        for phrase in (entry.keyword, *entry.variants):
+            key = " ".join(tokenize(phrase))
+            if not key:
+                raise ValueError(f"{entry.keyword!r}: {phrase!r} has no words")
+            if owner.setdefault(key, entry.keyword) != entry.keyword:
+                raise ValueError(f"{phrase!r} is listed under both {owner[key]!r} "
+                                 f"and {entry.keyword!r}")
+        entries.append(entry)
+    return entries
+
+
+def load_entries(path: str | Path = DEFAULT_PATH) -> list[Entry]:
+    with open(path, encoding="utf-8") as f:
+        return parse_entries(json.load(f))
+
+
+class KeywordSnapshot:
+    """One compiled, immutable version of the dictionary."""
+
+    __slots__ = ("version", "digest", "entries", "weights", "categories", "matcher", "loaded_at")
+
+    def __init__(self, entries: list[Entry], version: int = 1, fuzzy: bool = False):
+        self.version = version
+        self.entries = tuple(entries)
+        self.weights = {e.keyword: e.weight for e in entries}
+        self.categories = {e.keyword: e.category for e in entries}
+        self.matcher = KeywordMatcher(self.weights, {v: e.keyword for e in entries for v in e.variants},
+                                      fuzzy=fuzzy)
+        h = hashlib.blake2b(digest_size=6)
+        for e in self.entries:          # entry by entry: one big dumps() would hold the GIL
+            h.update(repr(e).encode())
+        self.digest = h.hexdigest()
+        self.loaded_at = time.time()
+
+    @property
+    def tag(self) -> str:
+        """``<version>-<digest>``: what alerts carry."""
+        return f"{self.version}-{self.digest}"
+
+    def to_json(self) -> dict:
+        return {
+            "version":   self.version,
+            "digest":    self.digest,
+            "loaded_at": self.loaded_at,
+            "fuzzy":     self.matcher.fuzzy,
+            "keywords":  [{**e._asdict(), "variants": list(e.variants)} for e in self.entries],
+        }
+
+
+class KeywordDictionary:
+    """
+    The current KeywordSnapshot, reloaded from ``path`` when the file
+    changes or replaced through ``replace``. Replacements are saved to
+    ``edit_path`` (default: ``path``), which from then on is the file
+    read and watched; an existing ``edit_path`` is preferred at startup,
+    so runtime edits survive a restart without touching the shipped
+    list. Listeners run on the event loop after each swap. ``fuzzy``
+    snapshots also match misheard keywords (stt/fuzzy.py).
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_PATH, fuzzy: bool = False,
+                 edit_path: str | Path | None = None):
+        self.edit_path = Path(edit_path or path)
+        self.path = self.edit_path if self.edit_path.exists() else Path(path)
+        self.fuzzy = fuzzy
+        self._mtime = self._stat()
+        self.current = KeywordSnapshot(load_entries(self.path), fuzzy=fuzzy)
+        self._listeners: list[Callable[[KeywordSnapshot], None]] = []
+        self._lock = asyncio.Lock()
+        self._watcher: asyncio.Task | None = None
+
+    def _stat(self) -> float:
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    def subscribe(self, listener: Callable[[KeywordSnapshot], None]):
+        self._listeners.append(listener)
+
+    def _swap(self, snapshot: KeywordSnapshot, source: str):
+        self.current = snapshot
+        for listener in self._listeners:
+            listener(snapshot)
+        log.info("📖 Keyword dictionary loaded", extra={
+            "version": snapshot.tag, "keywords": len(snapshot.entries), "source": source})
+
+    def _compile(self, data: dict) -> KeywordSnapshot:
+        return KeywordSnapshot(parse_entries(data), self.current.version + 1, self.fuzzy)
+
+    def _read(self) -> dict:
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    async def replace(self, data: dict) -> KeywordSnapshot:
+        """Validate, compile and save ``data``, then make it current."""
+        async with self._lock:
+            snapshot = await asyncio.to_thread(self._compile, data)
+            await asyncio.to_thread(self._save, data)
+            self._swap(snapshot, "api")
+            return snapshot
+
+    def _save(self, data: dict):
+        tmp = self.edit_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.edit_path)
+        self.path = self.edit_path
+        self._mtime = self._stat()          # our own write is not a change to reload
+
+    async def reload(self) -> KeywordSnapshot | None:
+        """Recompile from the file if it changed since it was last read."""
+        async with self._lock:
+            mtime = self._stat()
+            if mtime == self._mtime:
+                return None
+            snapshot = await asyncio.to_thread(lambda: self._compile(self._read()))
+            self._mtime = mtime
+            self._swap(snapshot, str(self.path))
+            return snapshot
+
+    async def start(self, interval: float = 5.0):
+        """Start watching the file for edits (``interval`` seconds apart)."""
+        if self._watcher is None:
+            self._watcher = asyncio.create_task(self._watch(interval))
+
+    async def close(self):
+        if self._watcher:
+            self._watcher.cancel()
+            self._watcher = None
+
+    async def _watch(self, interval: float):
+        """Poll the file; a broken edit is logged and the last good version kept."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload()
+            except (OSError, ValueError) as e:
+                self._mtime = self._stat()      # don't retry until it changes again
+                log.warning("⚠️ Keyword dictionary not reloaded", extra={
+                    "path": str(self.path), "error": repr(e)})
@@ -1,81 +1,71 @@
 import os
+import asyncio
 import time
-import wave
 import numpy as np
 import pyaudio
-import json
 from groq import Groq
 
+from stt.audio import wav_bytes
+from stt.capture import AudioCapture, open_source
+from stt.cache import ContentCache, cached_classifier, cached_transcriber
+from stt.classifier import TieredClassifier, groq_llm
+from stt.pipeline import FraudPipeline
+from stt.risk import LEVELS, RiskEngine
+
 # ——— Groq client setup ———
 groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 
+# ——— Result cache (scam scripts repeat; restarts start warm) ———
+CACHE_PATH        = os.getenv("STT_CACHE_PATH", "stt_cache.sqlite3")
+transcript_cache  = ContentCache(CACHE_PATH, "transcripts:whisper-large-v3-turbo")
+verdict_cache     = ContentCache(CACHE_PATH, "verdicts:llama3-70b-8192",
+                                 near_bits=6)   # a word or two of difference still hits
+
 # ——— Audio constants ———
-CHUNK      = 1024
-FORMAT     = pyaudio.paInt16
-CHANNELS   = 1
-RATE       = 16000
+RATE       = 16000      # what Whisper is sent; the microphone may run at its own rate
 RECORD_SEC = 5
 ALERT_FREQ = 1000   # Hz
 ALERT_DUR  = 0.5    # seconds
 
 p = pyaudio.PyAudio()
 
-def record_chunk():
-    """Record RECORD_SEC seconds from mic and return raw bytes."""
-    stream = p.open(format=FORMAT, channels=CHANNELS,
-                    rate=RATE, input=True,
-                    frames_per_buffer=CHUNK)
-    frames = []
-    for _ in range(int(RATE / CHUNK * RECORD_SEC)):
-        frames.append(stream.read(CHUNK, exception_on_overflow=False))
-    stream.stop_stream()
-    stream.close()
-    return b"".join(frames)
-
-def save_audio(audio_bytes, filename="temp.wav"):  # ← Remove /tmp/ and just use "temp.wav"
-    """Save audio bytes to a WAV file."""
-    with wave.open(filename, "wb") as wf:
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(p.get_sample_size(FORMAT))
-        wf.setframerate(RATE)
-        wf.writeframes(audio_bytes)
-    return filename
-
-
-def transcribe(audio_bytes):
-    """Transcribe audio using Groq's Whisper model."""
-    audio_path = save_audio(audio_bytes)
-    with open(audio_path, "rb") as file:
-        transcription = groq_client.audio.transcriptions.create(
-            file=("temp.wav", file.read()),
-            model="whisper-large-v3-turbo",
-            response_format="verbose_json"
-        )
-    return transcription.text.strip()
+def capture(emit, stop):
+    """Record continuously from the shared capture service; emit every RECORD_SEC of audio."""
+    async def record():
+        async with AudioCapture(open_source(), RATE, frame_ms=RECORD_SEC * 1000) as mic:
+            async for frame in mic:
+                if stop.is_set():
+                    break
+                emit(frame.tobytes())
+    asyncio.run(record())
 
-def detect_fraud(text):
-    """Use Groq LLaMA to classify fraud intent."""
-    prompt = (
-        "Classify whether the following transcript contains fraud or malicious intent.\n"
-        "Respond only with JSON: {\"fraud\":true/false,\"confidence\":<0.0–1.0>}.\n\n"
-        f"Transcript: \"\"\"{text}\"\"\""
+def transcribe_remote(audio_bytes):
+    """Transcribe audio using Groq's Whisper model (WAV built in memory)."""
+    wav = wav_bytes(np.frombuffer(audio_bytes, dtype=np.int16), RATE)
+    transcription = groq_client.audio.transcriptions.create(
+        file=("chunk.wav", wav),
+        model="whisper-large-v3-turbo",
+        response_format="verbose_json"
     )
-    response = groq_client.chat.completions.create(
-        model="llama3-70b-8192",
-        messages=[
-            {"role": "system", "content": "You are a helpful assistant that outputs JSON only."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.0,
-        max_tokens=100
-    )
-    out = response.choices[0].message.content.strip()
-    try:
-        fraud_obj = json.loads(out)
-        return fraud_obj.get("fraud", False), fraud_obj.get("confidence", 0.0)
-    except Exception as e:
-        print(f"JSON parsing error: {e}")
-        return False, 0.0
+    return transcription.text.strip()
+
+transcribe = cached_transcriber(transcribe_remote, transcript_cache, RATE)
+
+# Groq LLaMA is only the last tier: keywords and a local model settle
+# most windows without a network round trip
+detect_fraud = cached_classifier(groq_llm(groq_client), verdict_cache)
+classifier = TieredClassifier(llm=detect_fraud)
+
+# Chunks are judged together: risk builds up over the conversation and decays
+risk = RiskEngine().open("microphone", time.monotonic())
+
+def classify(text):
+    verdict = classifier.classify(text)
+    update = risk.observe_verdict(time.monotonic(), verdict)
+    print(f"Decided by {verdict.tier} in {verdict.latency_ms:.1f} ms; "
+          f"risk {update.score:.2f} ({LEVELS[update.level]})")
+    # Keep alerting while the score is above the threshold, stop once it decays
+    return update.score >= risk.engine.policy.alert_at, verdict.confidence
 
 def alert_beep():
     """Play a simple sine‐wave beep using PyAudio."""
@@ -87,28 +77,29 @@ def alert_beep():
     stream.stop_stream()
     stream.close()
 
+def on_result(text, fraud, conf):
+    print(f"Transcript: {text!r}")
+    print(f"Fraud? {fraud} (confidence={conf:.2f})")
+
+    if fraud:
+        print("⚠️ Fraud risk over threshold! Beeping...")
+        alert_beep()
+
 def main_loop():
     print("🎙️ Starting real-time fraud monitor using Groq Whisper + LLaMA… Press Ctrl+C to stop.")
+    # Recording never pauses: capture, transcription and classification overlap
+    pipeline = FraudPipeline(transcribe, classify, on_result)
     try:
-        while True:
-            audio = record_chunk()
-            text  = transcribe(audio)
-            if not text:
-                continue
-
-            print(f"Transcript: {text!r}")
-            fraud, conf = detect_fraud(text)
-            print(f"Fraud? {fraud} (confidence={conf:.2f})")
-
-            if fraud and conf > 0.7:
-                print("⚠️ Fraud detected! Beeping...")
-                alert_beep()
-
-            time.sleep(0.1)
-
+        asyncio.run(pipeline.run(capture))
     except KeyboardInterrupt:
         print("\n👋 Exiting...")
     finally:
+        pipeline.stop_event.set()
+        print(pipeline.report())
+        print(classifier.report())
+        for cache in (transcript_cache, verdict_cache):
+            print(f"{cache.namespace}: {cache.stats()}")
+            cache.close()
         p.terminate()
 
 if __name__ == "__main__":
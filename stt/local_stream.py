@@ -0,0 +1,271 @@
+"""
+Real-time local Whisper transcription.
+
+``feed``, called from the capture thread, only copies samples into a
+lock-free single-producer / single-consumer ring buffer. A separate inference thread drains it, runs
+an energy VAD so silence never reaches the model, and transcribes the
+current utterance with overlapping sliding windows. Words are committed
+once two consecutive hypotheses agree on them (or the utterance ends),
+and audio before the committed point is dropped, so nothing is emitted
+twice.
+
+Reports real-time factor (inference time / audio time) and end-to-end
+latency (word captured → word committed).
+"""
+
+import re
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+
+RATE = 16000
+
+
+class RingBuffer:
+    """
+    SPSC float32 ring. The producer only moves ``written`` and the
+    consumer only moves ``read_pos``; both are totals, never wrapped, so
+    no lock is needed. A consumer that falls more than ``capacity``
+    behind skips the overwritten audio and counts it in ``overruns``.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        self.written = 0
+        self.read_pos = 0
+        self.overruns = 0
+
+    def write(self, samples: np.ndarray):
+        cap = self.capacity
+        base = self.written
+        if len(samples) > cap:
+            base += len(samples) - cap
+            samples = samples[-cap:]
+        n = len(samples)
+        start = base % cap
+        first = min(n, cap - start)
+        self._buf[start:start + first] = samples[:first]
+        self._buf[:n - first] = samples[first:]
+        self.written = base + n                # publish only after the copy
+
+    def read(self) -> tuple[int, np.ndarray]:
+        """(absolute index of the first sample, every unread sample)."""
+        cap = self.capacity
+        written = self.written
+        pos = max(self.read_pos, written - cap)
+        start, n = pos % cap, written - pos
+        first = min(n, cap - start)
+        out = np.concatenate((self._buf[start:start + first], self._buf[:n - first]))
+        # The producer may have lapped us while we copied: drop what it overwrote.
+        lapped = self.written - cap - pos
+        if lapped > 0:
+            out, pos = out[lapped:], pos + lapped
+        self.overruns += pos - self.read_pos
+        self.read_pos = written
+        return pos, out
+
+
+class EnergyVAD:
+    """Frame RMS against an adaptive noise floor."""
+
+    def __init__(self, rate: int = RATE, frame_ms: int = 30, ratio: float = 3.0,
+                 min_rms: float = 0.01, adapt: float = 0.05):
+        self.frame = rate * frame_ms // 1000
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.adapt = adapt
+        self.noise = min_rms / ratio
+
+    def frames(self, samples: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Split into whole frames; returns (frames, is_speech per frame)."""
+        n = len(samples) // self.frame
+        frames = samples[:n * self.frame].reshape(n, self.frame)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        speech = np.empty(n, dtype=bool)
+        for i, level in enumerate(rms):
+            speech[i] = level > max(self.min_rms, self.noise * self.ratio)
+            if not speech[i]:
+                self.noise += self.adapt * (level - self.noise)
+        return frames, speech
+
+
+_NORM_RE = re.compile(r"[^\w']+")
+
+
+def _norm(word: str) -> str:
+    return _NORM_RE.sub("", word.lower())
+
+
+class StreamingWhisper:
+    def __init__(self, model, on_text: Callable[[str, float], None] | None = None,
+                 rate: int = RATE, window_s: float = 8.0, step_s: float = 1.0,
+                 overlap_s: float = 1.0, hangover_ms: int = 600, preroll_ms: int = 300,
+                 ring_s: float = 30.0, vad: EnergyVAD | None = None, language: str | None = None):
+        self.model = model
+        self.on_text = on_text or (lambda text, latency: None)
+        self.rate = rate
+        self.window = int(window_s * rate)
+        self.step_s = step_s
+        self.overlap = int(overlap_s * rate)
+        self.hangover = rate * hangover_ms // 1000
+        self.preroll_len = rate * preroll_ms // 1000
+        self.language = language
+        self.ring = RingBuffer(int(ring_s * rate))
+        self.vad = vad or EnergyVAD(rate)
+
+        self.inference_s = 0.0
+        self.audio_s = 0.0
+        self.latencies: list[float] = []
+        self.committed: list[str] = []
+
+        self._clock = (0, time.monotonic())     # (samples written, when)
+        self._leftover = np.zeros(0, dtype=np.float32)   # partial VAD frame
+        self._leftover_end = 0
+        self._preroll = np.zeros(0, dtype=np.float32)
+        self._chunks: list[np.ndarray] = []
+        self._start = 0            # absolute sample index of the utterance buffer
+        self._in_speech = False
+        self._silence = 0
+        self._dirty = False        # new speech since the last hypothesis
+        self._pending: list[tuple[str, int, int]] = []   # uncommitted (word, start, end)
+        self._committed_until = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ─── producer side ──────────────────────────────────────────────────────
+
+    def feed(self, samples: np.ndarray):
+        """Copy float32 samples at ``rate`` into the ring and return."""
+        self.ring.write(np.asarray(samples, dtype=np.float32))
+        self._clock = (self.ring.written, time.monotonic())
+
+    # ─── stats ──────────────────────────────────────────────────────────────
+
+    @property
+    def rtf(self) -> float:
+        return self.inference_s / self.audio_s if self.audio_s else 0.0
+
+    def stats(self) -> dict:
+        lat = sorted(self.latencies)
+        return {
+            "rtf": self.rtf,
+            "latency_p50": lat[len(lat) // 2] if lat else None,
+            "latency_max": lat[-1] if lat else None,
+            "overruns_s": self.ring.overruns / self.rate,
+        }
+
+    # ─── inference thread ──────────────────────────────────────────────────
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="whisper-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.step_s):
+            self.process()
+        self.process()
+        if self._in_speech:
+            self._end_utterance()
+
+    def process(self):
+        """Drain the ring, run VAD, and transcribe if there is new speech."""
+        pos, samples = self.ring.read()
+        if len(self._leftover) and pos == self._leftover_end:
+            pos -= len(self._leftover)
+            samples = np.concatenate((self._leftover, samples))
+        frames, speech = self.vad.frames(samples)
+        used = len(frames) * self.vad.frame
+        self._leftover = samples[used:]
+        self._leftover_end = pos + len(samples)
+
+        for i, (frame, is_speech) in enumerate(zip(frames, speech)):
+            index = pos + i * self.vad.frame
+            if is_speech:
+                if not self._in_speech:
+                    self._in_speech = True
+                    self._chunks = [self._preroll]
+                    self._start = index - len(self._preroll)
+                self._chunks.append(frame)
+                self._silence = 0
+                self._dirty = True
+            elif self._in_speech:
+                self._chunks.append(frame)
+                self._silence += len(frame)
+                if self._silence >= self.hangover:
+                    self._end_utterance()
+            else:
+                self._preroll = np.concatenate((self._preroll, frame))[-self.preroll_len:]
+
+        if self._in_speech and self._dirty:
+            self._hypothesize(final=False)
+
+    def _end_utterance(self):
+        self._hypothesize(final=True)
+        self._in_speech = False
+        self._chunks = []
+        self._pending = []
+        self._silence = 0
+        self._preroll = np.zeros(0, dtype=np.float32)
+
+    def _hypothesize(self, final: bool):
+        self._dirty = False
+        audio = np.concatenate(self._chunks) if self._chunks else np.zeros(0, np.float32)
+
+        # Slide the window: keep a little overlap before the committed point.
+        cut = max(0, self._committed_until - self.overlap - self._start)
+        if len(audio) - cut > self.window:
+            cut = len(audio) - self.window
+        if cut:
+            audio = audio[cut:]
+            self._start += cut
+            self._chunks = [audio]
+        if len(audio) < self.rate // 4:
+            return
+
+        t0 = time.perf_counter()
+        result = self.model.transcribe(
+            audio, fp16=False, word_timestamps=True, language=self.language,
+            condition_on_previous_text=False,
+            initial_prompt=" ".join(self.committed[-30:]) or None,
+        )
+        self.inference_s += time.perf_counter() - t0
+        self.audio_s += len(audio) / self.rate
+
+        words = [
+            (w["word"].strip(), self._start + int(w["start"] * self.rate),
+             self._start + int(w["end"] * self.rate))
+            for seg in result.get("segments", ()) for w in seg.get("words", ())
+        ]
+        # Committed-prefix de-duplication: ignore what the overlap re-heard.
+        fresh = [w for w in words if w[2] > self._committed_until + self.rate // 20 and _norm(w[0])]
+
+        if final:
+            agreed = fresh
+        else:
+            agreed = []
+            for new, old in zip(fresh, self._pending):
+                if _norm(new[0]) != _norm(old[0]):
+                    break
+                agreed.append(new)
+            # Words the window is about to slide past can't wait for agreement.
+            horizon = self._start + len(audio) + int(self.step_s * self.rate) - self.window
+            while len(agreed) < len(fresh) and fresh[len(agreed)][2] < horizon:
+                agreed.append(fresh[len(agreed)])
+        self._pending = fresh[len(agreed):]
+
+        if agreed:
+            self._committed_until = agreed[-1][2]
+            self.committed.extend(w for w, _, _ in agreed)
+            written, when = self._clock
+            captured = when - (written - self._committed_until) / self.rate
+            latency = time.monotonic() - captured
+            self.latencies.append(latency)
+            self.on_text(" ".join(w for w, _, _ in agreed), latency)
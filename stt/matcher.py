@@ -0,0 +1,238 @@
+"""
+Shared fraud-keyword matcher.
+
+Keywords are compiled once into a word-level Aho-Corasick automaton: the
+transcript is split into word tokens with a single regex pass and every
+keyword (single word or phrase) is found in one walk over those tokens.
+Cost per transcript depends on the transcript length, not on how many
+keywords are loaded, and matches always fall on word boundaries
+("pin" does not fire on "spinning"). Variants (transliterations,
+spellings) can be compiled in as aliases that report the keyword they
+stand for, and ``fuzzy`` matchers map misheard tokens onto the keyword
+vocabulary first (stt/fuzzy.py).
+"""
+
+import re
+from bisect import bisect_left
+from typing import Iterable, Mapping, NamedTuple
+
+from stt.fuzzy import TokenNormalizer, spellings
+
+# \w alone splits Indic words at their vowel signs (not alphanumeric), so
+# the Devanagari … Sinhala blocks count as word characters, minus the dandas.
+WORD_RE = re.compile(r"[\w\u0900-\u0963\u0966-\u0dff]+")
+
+
+class Match(NamedTuple):
+    keyword: str
+    start: int   # character offset into the scanned text
+    end: int
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word tokens, the unit the automaton runs on."""
+    return [t.lower() for t in WORD_RE.findall(text)]
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton over word tokens. Build once, share freely."""
+
+    ROOT = 0
+
+    __slots__ = ("keywords", "max_tokens", "fuzzy", "_goto", "_fail", "_out", "_token")
+
+    def __init__(self, keywords: Iterable[str], aliases: Mapping[str, str] | None = None,
+                 fuzzy: bool = False):
+        """
+        ``aliases`` maps extra phrases to the keyword they report as.
+        ``fuzzy`` also matches misheard and spelled-out tokens (stt/fuzzy.py).
+        """
+        self.keywords: tuple[str, ...] = tuple(dict.fromkeys(keywords))
+        self.fuzzy = fuzzy
+        aliases = aliases or {}
+        goto: list[dict[str, int]] = [{}]
+        out: list[tuple[tuple[str, int], ...]] = [()]
+        self.max_tokens = 0
+
+        def insert(tokens: list[str], kw: str):
+            state = self.ROOT
+            for tok in tokens:
+                nxt = goto[state].get(tok)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][tok] = nxt
+                    goto.append({})
+                    out.append(())
+                state = nxt
+            if (kw, len(tokens)) not in out[state]:
+                out[state] += ((kw, len(tokens)),)
+            self.max_tokens = max(self.max_tokens, len(tokens))
+
+        for phrase in (*self.keywords, *aliases):
+            kw = aliases.get(phrase, phrase)
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            insert(tokens, kw)
+            if fuzzy:
+                for spelled in spellings(tokens):
+                    insert(spelled, kw)
+
+        # Breadth-first failure links; each state inherits its suffix outputs.
+        fail = [0] * len(goto)
+        queue = list(goto[self.ROOT].values())
+        for state in queue:
+            for tok, nxt in goto[state].items():
+                f = fail[state]
+                while f and tok not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(tok, 0)
+                out[nxt] += out[fail[nxt]]
+                queue.append(nxt)
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        # Raw token → automaton token; exact matching only lower-cases
+        self._token = (TokenNormalizer({tok for edges in goto for tok in edges})
+                       if fuzzy else str.lower)
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def step(self, state: int, token: str) -> int:
+        """Advance the automaton by one transcript token."""
+        goto, fail = self._goto, self._fail
+        token = self._token(token)
+        while state and token not in goto[state]:
+            state = fail[state]
+        return goto[state].get(token, self.ROOT)
+
+    def outputs(self, state: int) -> tuple[tuple[str, int], ...]:
+        """(keyword, length in tokens) pairs that end at ``state``."""
+        return self._out[state]
+
+    def find(self, text: str) -> list[Match]:
+        """Every keyword occurrence in ``text``, in order of where it ends."""
+        goto, fail, out, token = self._goto, self._fail, self._out, self._token
+        matches: list[Match] = []
+        starts: list[int] = []
+        state = self.ROOT
+        for m in WORD_RE.finditer(text):
+            tok = token(m.group())
+            starts.append(m.start())
+            while state and tok not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(tok, 0)
+            for kw, n in out[state]:
+                matches.append(Match(kw, starts[-n], m.end()))
+        return matches
+
+    def keywords_in(self, text: str) -> list[str]:
+        """Distinct keywords found in ``text``, in order of first occurrence."""
+        return list(dict.fromkeys(m.keyword for m in self.find(text)))
+
+    def stream(self) -> "StreamingMatcher":
+        """Fresh incremental matcher for one call."""
+        return StreamingMatcher(self)
+
+
+def _common_prefix_len(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    if a[:n] == b[:n]:
+        return n
+    lo, hi = 0, n  # invariant: a[:lo] == b[:lo] and a[:hi] != b[:hi]
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+class StreamingMatcher:
+    """
+    Incremental matcher for one call's STT stream.
+
+    Interim hypotheses usually extend the previous one, so only the tokens
+    after the point where the new hypothesis diverges are run through the
+    automaton. Automaton state is carried across ``is_final`` segments, so
+    phrases split over two finals ("one time" | "password") still match.
+
+    Match offsets are into the call transcript: every final segment joined
+    by a single space, followed by the current hypothesis.
+    """
+
+    __slots__ = ("matcher", "_base", "_tail", "_offset", "_live",
+                 "_text", "_ends", "_starts", "_states", "_reported")
+
+    def __init__(self, matcher: KeywordMatcher):
+        self.matcher = matcher
+        self._base = KeywordMatcher.ROOT   # automaton state after the last final
+        self._tail: list[int] = []         # starts of the last few final tokens
+        self._offset = 0                   # call offset of the current segment
+        self._live: list[int] = []         # per-token states of the last result fed
+        self._reset_segment()
+
+    def _reset_segment(self):
+        self._text = ""
+        self._ends: list[int] = []
+        self._starts: list[int] = []
+        self._states: list[int] = []
+        self._reported: set[tuple[str, int]] = set()
+
+    def feed(self, transcript: str, is_final: bool = False) -> list[Match]:
+        """Process one STT result; returns matches not reported before."""
+        km = self.matcher
+        goto, fail, out, token = km._goto, km._fail, km._out, km._token
+        ends, starts, states = self._ends, self._starts, self._states
+
+        # Keep every token that ends strictly before the first changed char.
+        div = _common_prefix_len(self._text, transcript)
+        if div == len(self._text) == len(transcript):
+            keep = len(ends)
+        else:
+            keep = bisect_left(ends, div)
+        del ends[keep:], starts[keep:], states[keep:]
+
+        state = states[-1] if states else self._base
+        pos = ends[-1] if ends else 0
+        offset, tail, reported = self._offset, self._tail, self._reported
+        found: list[Match] = []
+
+        for m in WORD_RE.finditer(transcript, pos):
+            tok = token(m.group())
+            while state and tok not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(tok, 0)
+            ends.append(m.end())
+            starts.append(offset + m.start())
+            states.append(state)
+            i = len(states) - 1
+            for kw, n in out[state]:
+                if (kw, i) in reported:
+                    continue
+                reported.add((kw, i))
+                first = i - n + 1
+                start = starts[first] if first >= 0 else tail[first]
+                found.append(Match(kw, start, offset + m.end()))
+
+        self._text = transcript
+        self._live = states
+        if is_final:
+            if states:
+                self._base = states[-1]
+                self._tail = (tail + starts)[-km.max_tokens:] if km.max_tokens else []
+            self._offset += len(transcript) + 1
+            self._reset_segment()
+        return found
+
+    def live(self) -> list[str]:
+        """
+        Every keyword in the result last fed (for a final, the segment it
+        closed), in order, whether or not ``feed`` already reported it.
+        """
+        out = self.matcher._out
+        return [kw for state in self._live for kw, _ in out[state]]
+
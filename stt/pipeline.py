@@ -0,0 +1,121 @@
+"""
+Concurrent record → transcribe → classify pipeline.
+
+Capture runs in its own thread and never waits on the network: each
+finished chunk is handed to the event loop and queued. Transcription and
+classification are separate async stages joined by bounded queues, so
+chunk n+1 is transcribed while chunk n is being classified and the
+microphone is never deaf. If the stages fall behind, the oldest queued
+audio is dropped (and counted) rather than letting the backlog grow.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, NamedTuple
+
+Capture = Callable[[Callable[[bytes], None], threading.Event], None]
+
+
+class Chunk(NamedTuple):
+    audio: bytes
+    captured_at: float       # time.monotonic() when the chunk finished recording
+
+
+class StageStats:
+    __slots__ = ("name", "samples")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.samples: list[float] = []
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def summary(self) -> str:
+        if not self.samples:
+            return f"{self.name:>10}: no samples"
+        s = sorted(self.samples)
+        return (f"{self.name:>10}: n={len(s):<4} p50={s[len(s) // 2] * 1e3:7.0f} ms  "
+                f"p95={s[int(len(s) * 0.95)] * 1e3:7.0f} ms  max={s[-1] * 1e3:7.0f} ms")
+
+
+class FraudPipeline:
+    def __init__(self, transcribe: Callable[[bytes], str],
+                 classify: Callable[[str], tuple[bool, float]],
+                 on_result: Callable[[str, bool, float], None],
+                 queue_size: int = 4):
+        """
+        ``transcribe``, ``classify`` and ``on_result`` are blocking and run
+        in worker threads.
+        """
+        self.transcribe = transcribe
+        self.classify = classify
+        self.on_result = on_result
+        self.queue_size = queue_size
+        self.dropped = 0
+        self.stats = {name: StageStats(name)
+                      for name in ("queued", "transcribe", "classify", "end_to_end")}
+        self.stop_event = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._audio: asyncio.Queue[Chunk] | None = None
+        self._texts: asyncio.Queue[tuple[Chunk, str]] | None = None
+
+    def submit(self, audio: bytes):
+        """Thread-safe: hand a recorded chunk to the pipeline."""
+        try:
+            self._loop.call_soon_threadsafe(self._put, Chunk(audio, time.monotonic()))
+        except RuntimeError:
+            pass        # loop already closed: shutting down
+
+    def _put(self, chunk: Chunk):
+        if self._audio.full():
+            self._audio.get_nowait()
+            self.dropped += 1
+        self._audio.put_nowait(chunk)
+
+    async def run(self, capture: Capture):
+        """Start the capture thread and both stages; runs until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._audio = asyncio.Queue(self.queue_size)
+        self._texts = asyncio.Queue(self.queue_size)
+        thread = threading.Thread(target=capture, args=(self.submit, self.stop_event),
+                                  name="capture", daemon=True)
+        thread.start()
+        try:
+            await asyncio.gather(self._transcriber(), self._classifier())
+        finally:
+            self.stop_event.set()
+
+    async def _transcriber(self):
+        while True:
+            chunk = await self._audio.get()
+            t0 = time.monotonic()
+            self.stats["queued"].add(t0 - chunk.captured_at)
+            try:
+                text = await asyncio.to_thread(self.transcribe, chunk.audio)
+            except Exception as e:
+                print(f"Transcription error: {e}")
+                continue
+            self.stats["transcribe"].add(time.monotonic() - t0)
+            if text:
+                await self._texts.put((chunk, text))
+
+    async def _classifier(self):
+        while True:
+            chunk, text = await self._texts.get()
+            t0 = time.monotonic()
+            try:
+                fraud, conf = await asyncio.to_thread(self.classify, text)
+            except Exception as e:
+                print(f"Classification error: {e}")
+                continue
+            now = time.monotonic()
+            self.stats["classify"].add(now - t0)
+            self.stats["end_to_end"].add(now - chunk.captured_at)
+            await asyncio.to_thread(self.on_result, text, fraud, conf)
+
+    def report(self) -> str:
+        lines = [s.summary() for s in self.stats.values()]
+        lines.append(f"{'dropped':>10}: {self.dropped} chunks")
+        return "\n".join(lines)
@@ -0,0 +1,176 @@
+"""
+Conversation-level fraud risk, one small state object per call.
+
+A single segment is weak evidence: "urgent" or "fine" turn up in plenty
+of honest calls. Each call keeps a score that every signal adds to and
+that decays exponentially with time (``half_life_s``), so only a burst of
+evidence crosses a threshold:
+
+    keyword       weight of the keyword / pattern (stt/classifier.py)
+    repetition    a category heard again within ``window_s`` is boosted
+    combination   a new category while another is active adds a bonus
+                  (urgency + credentials is the classic script)
+    speaker       signals heard from the protected party count less
+    model / LLM   confidence of the classifier on final segments
+
+Decay is applied lazily on update, so the state is a few floats and one
+small array per call, and an update costs a handful of dict lookups.
+Levels latch: each of alert and hangup is reported once per call.
+"""
+
+from array import array
+from typing import Iterable, NamedTuple
+
+from stt.classifier import (KEYWORD_CATEGORIES, KEYWORD_WEIGHTS, LLM, MODEL,
+                            PATTERN_CATEGORIES, PATTERN_WEIGHTS, Verdict)
+from stt.keywords import CATEGORIES, KeywordSnapshot
+
+OK, ALERT, HANGUP = 0, 1, 2
+LEVELS = ("ok", "alert", "hangup")
+
+CALLER, CALLEE = "caller", "callee"
+
+_NEVER = float("-inf")
+_PATTERN_SIGNALS = {name: w for name, (_, w) in PATTERN_WEIGHTS.items()}
+
+
+class RiskPolicy(NamedTuple):
+    half_life_s: float = 30.0    # evidence loses half its weight this fast
+    window_s: float = 120.0      # a category stays active this long after a hit
+    alert_at: float = 0.6
+    hangup_at: float = 1.2
+    repeat_boost: float = 0.5    # × weight for a category heard again
+    combo_bonus: float = 0.3     # + weight for a new category next to an active one
+    model_weight: float = 0.4    # local-model confidence on a final segment
+    llm_weight: float = 0.8      # LLM confidence on a final segment
+    callee_weight: float = 0.3   # scale for signals from the protected party
+
+
+class RiskUpdate(NamedTuple):
+    score: float
+    level: int          # highest level reached so far
+    escalated: bool     # this update raised the level
+
+
+class CallRisk:
+    __slots__ = ("engine", "score", "updated", "level", "hits", "turns", "speaker", "_last_seen")
+
+    def __init__(self, engine: "RiskEngine", now: float):
+        self.engine = engine
+        self.score = 0.0
+        self.updated = now
+        self.level = OK
+        self.hits = 0
+        self.turns = 0
+        self.speaker = CALLER
+        self._last_seen = array("d", [_NEVER]) * len(engine.categories)
+
+    def observe(self, now: float, keywords: Iterable[str] = (), prob: float | None = None,
+                weight: float = 0.0, speaker: str = CALLER) -> RiskUpdate:
+        """
+        Add one event's signals at ``now`` (monotonic seconds). ``prob``
+        is a classifier's fraud probability, counted with ``weight``
+        only above 0.5.
+        """
+        engine = self.engine
+        policy = engine.policy
+        dt = now - self.updated
+        if dt > 0:
+            self.score *= 0.5 ** (dt / policy.half_life_s)
+            self.updated = now
+        if speaker != self.speaker:
+            self.turns += 1
+            self.speaker = speaker
+
+        add = 0.0
+        last_seen = self._last_seen
+        horizon = now - policy.window_s
+        for kw in keywords:
+            signal = engine.signals.get(kw)
+            if signal is None:
+                continue
+            w, cat = signal
+            if last_seen[cat] >= horizon:
+                w *= 1.0 + policy.repeat_boost
+            elif max(last_seen) >= horizon:
+                w += policy.combo_bonus
+            last_seen[cat] = now
+            self.hits += 1
+            add += w
+        if prob is not None and prob > 0.5:
+            add += weight * (2.0 * prob - 1.0)
+        if speaker == CALLEE:
+            add *= policy.callee_weight
+        self.score += add
+
+        level = (HANGUP if self.score >= policy.hangup_at
+                 else ALERT if self.score >= policy.alert_at else OK)
+        escalated = level > self.level
+        if escalated:
+            self.level = level
+        return RiskUpdate(self.score, self.level, escalated)
+
+    def observe_verdict(self, now: float, verdict: Verdict, final: bool = True,
+                        speaker: str = CALLER, keywords: Iterable[str] | None = None) -> RiskUpdate:
+        """
+        Feed a classifier verdict. Interim results only contribute their
+        keywords (the streaming matcher reports each once); pattern hits
+        and model / LLM confidence count once, on the final segment.
+        ``keywords`` stands in for the verdict's keyword hits (not its
+        patterns), e.g. only those a HitStability has settled.
+        """
+        policy = self.engine.policy
+        patterns = [k for k in verdict.keywords if k in PATTERN_WEIGHTS] if final else []
+        if keywords is None:
+            keywords = [k for k in verdict.keywords if k not in PATTERN_WEIGHTS]
+        if not final:
+            return self.observe(now, keywords, speaker=speaker)
+        prob = weight = None
+        if verdict.tier in (MODEL, LLM):
+            prob = verdict.confidence if verdict.fraud else 1.0 - verdict.confidence
+            weight = policy.llm_weight if verdict.tier == LLM else policy.model_weight
+        return self.observe(now, [*keywords, *patterns], prob, weight or 0.0, speaker)
+
+    def snapshot(self) -> dict:
+        return {"score": round(self.score, 3), "level": LEVELS[self.level],
+                "hits": self.hits, "turns": self.turns}
+
+
+class RiskEngine:
+    """Per-call CallRisk objects sharing one policy and signal table."""
+
+    def __init__(self, policy: RiskPolicy = RiskPolicy(),
+                 weights: dict[str, float] | None = None,
+                 categories: dict[str, str] = KEYWORD_CATEGORIES):
+        if weights is None:
+            weights = KEYWORD_WEIGHTS | _PATTERN_SIGNALS
+        self.policy = policy
+        self.categories = CATEGORIES
+        self.set_signals(weights, categories)
+        self.calls: dict[str, CallRisk] = {}
+
+    def set_signals(self, weights: dict[str, float], categories: dict[str, str]):
+        """
+        Swap in a new keyword table (e.g. a reloaded dictionary). Live
+        calls keep their state: the category set is fixed, so their
+        per-category history still lines up.
+        """
+        index = {cat: i for i, cat in enumerate(self.categories)}
+        self.signals = {kw: (w, index[categories[kw]])
+                        for kw, w in weights.items() if kw in categories}
+
+    def use_keywords(self, snapshot: KeywordSnapshot):
+        self.set_signals(snapshot.weights | _PATTERN_SIGNALS,
+                         snapshot.categories | PATTERN_CATEGORIES)
+
+    def open(self, call_sid: str, now: float) -> CallRisk:
+        risk = self.calls.get(call_sid)
+        if risk is None:
+            risk = self.calls[call_sid] = CallRisk(self, now)
+        return risk
+
+    def close(self, call_sid: str):
+        self.calls.pop(call_sid, None)
+
+    def __len__(self) -> int:
+        return len(self.calls)
@@ -0,0 +1,334 @@
+"""
+Offline fraud scan of recorded call archives.
+
+    python -m stt.scan archive/ more/call.wav --report scan.jsonl --workers 4
+
+Every recording (WAV: 16-bit PCM or G.711 mu-law, any rate or channel
+count; raw 8 kHz mu-law: .ulaw/.mulaw/.ul/.raw) goes through the same
+detection as a live call: Whisper (stt/backends.py) on 30 s windows, the
+shared keyword dictionary with phrases matched across windows, the
+keyword → model classifier (no LLM) and the per-call risk score, with
+call time as the clock.
+
+- Files are memory-mapped and decoded one window at a time, so a
+  two-hour recording costs no more memory than a two-minute one.
+- A process pool runs the scan, one model per worker, loaded once by the
+  worker initializer. The longest files start first, so the run doesn't
+  end with one worker on a long file and the rest idle.
+- The JSONL report (one line per file, flushed as each file finishes) is
+  also the checkpoint. Rerunning with the same ``--report`` skips files
+  already in it, as long as their size and mtime haven't changed. Files
+  that failed are retried.
+
+The run ends with throughput: files/hour and audio-hours per CPU-hour
+(CPU counted in the workers).
+
+``--engine module:factory`` swaps Whisper for any factory returning a
+``transcribe(float32 16 kHz samples) -> text`` callable (e.g. a stub for
+benchmarks); ``--engine-arg key=value`` is passed to it.
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import get_context
+from pathlib import Path
+from pkgutil import resolve_name
+from typing import Callable, Iterator, NamedTuple
+
+import numpy as np
+
+from stt.audio import MULAW_TO_PCM16, resample
+from stt.backends import WHISPER_RATE
+from stt.classifier import KeywordScorer, TieredClassifier
+from stt.keywords import DEFAULT_PATH, KeywordSnapshot, load_entries
+from stt.risk import ALERT, HANGUP, LEVELS, RiskEngine
+
+MULAW_SUFFIXES = {".ulaw", ".mulaw", ".ul", ".raw"}
+AUDIO_SUFFIXES = MULAW_SUFFIXES | {".wav"}
+WAVE_PCM, WAVE_MULAW, WAVE_EXTENSIBLE = 1, 7, 0xFFFE
+
+Transcriber = Callable[[np.ndarray], str]
+
+
+# ─── Recordings ───────────────────────────────────────────────────────────────
+
+class Recording(NamedTuple):
+    path: str
+    rate: int
+    channels: int
+    width: int          # bytes per sample: 1 mu-law, 2 PCM16
+    offset: int         # where the samples start in the file
+    length: int         # bytes of samples
+
+    @property
+    def duration(self) -> float:
+        return self.length / (self.rate * self.channels * self.width)
+
+
+def probe(path: str | Path) -> Recording:
+    """Format and sample location of a recording, from its header only."""
+    path = str(path)
+    if Path(path).suffix.lower() in MULAW_SUFFIXES:
+        return Recording(path, 8000, 1, 1, 0, os.path.getsize(path))
+    with open(path, "rb") as f:
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError(f"{path}: not a WAV file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: no data chunk")
+            chunk, size = struct.unpack("<4sI", header)
+            if chunk == b"fmt ":
+                body = f.read(size + (size & 1))
+                tag, channels, rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+                if tag == WAVE_EXTENSIBLE and size >= 26:
+                    tag = struct.unpack("<H", body[24:26])[0]
+                fmt = tag, channels, rate, bits
+            elif chunk == b"data":
+                if fmt is None:
+                    raise ValueError(f"{path}: data before fmt")
+                tag, channels, rate, bits = fmt
+                if (tag, bits) == (WAVE_PCM, 16):
+                    width = 2
+                elif (tag, bits) == (WAVE_MULAW, 8):
+                    width = 1
+                else:
+                    raise ValueError(f"{path}: only 16-bit PCM or mu-law WAV is supported")
+                length = min(size, os.path.getsize(path) - f.tell())   # truncated files
+                return Recording(path, rate, channels, width, f.tell(), length)
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def windows(rec: Recording, window_s: float = 30.0) -> Iterator[tuple[float, np.ndarray]]:
+    """(start second, float32 16 kHz mono samples) per window, decoded from an mmap."""
+    frame = rec.channels * rec.width
+    step = int(window_s * rec.rate) * frame
+    end = rec.offset + rec.length - rec.length % frame
+    if rec.length < frame:
+        return
+    with open(rec.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i, pos in enumerate(range(rec.offset, end, step)):
+            raw = mm[pos:min(pos + step, end)]            # copies one window, not the file
+            if rec.width == 1:
+                pcm = MULAW_TO_PCM16[np.frombuffer(raw, dtype=np.uint8)]
+            else:
+                pcm = np.frombuffer(raw, dtype="<i2")
+            samples = pcm.astype(np.float32) / 32768.0
+            if rec.channels > 1:
+                samples = samples.reshape(-1, rec.channels).mean(axis=1)
+            yield i * window_s, resample(samples, rec.rate, WHISPER_RATE)
+
+
+# ─── Workers ──────────────────────────────────────────────────────────────────
+
+def whisper_engine(model: str = "small", threads: int | str | None = None) -> Transcriber:
+    """Local openai-whisper; ``threads`` caps torch's intra-op threads per worker."""
+    import torch
+    from stt.backends import LocalWhisperBackend
+
+    if threads:
+        torch.set_num_threads(int(threads))
+    backend = LocalWhisperBackend(model_name=model)
+    return lambda samples: backend.transcribe(samples)[0]
+
+
+class Scanner:
+    """Everything one worker needs, built once per process."""
+
+    def __init__(self, transcribe: Transcriber, snapshot: KeywordSnapshot, window_s: float = 30.0):
+        self.transcribe = transcribe
+        self.snapshot = snapshot
+        self.window_s = window_s
+        self.classifier = TieredClassifier(scorer=KeywordScorer.from_snapshot(snapshot))
+        self.risk = RiskEngine()
+        self.risk.use_keywords(snapshot)
+
+    def scan(self, path: str) -> dict:
+        cpu, wall = time.process_time(), time.perf_counter()
+        result = {"path": path}
+        try:
+            st = os.stat(path)
+            result.update(size=st.st_size, mtime=st.st_mtime)
+            rec = probe(path)
+            stream = self.snapshot.matcher.stream()
+            risk = self.risk.open(path, 0.0)
+            texts, hits, tiers = [], [], {}
+            alert_at, peak = None, 0.0
+            for start, samples in windows(rec, self.window_s):
+                text = self.transcribe(samples).strip()
+                # One final per window: phrases split across windows still match
+                matches = stream.feed(text, is_final=True)
+                keywords = list(dict.fromkeys(m.keyword for m in matches))
+                verdict = self.classifier.classify(text, keywords, escalate=False)
+                update = risk.observe_verdict(start + len(samples) / WHISPER_RATE, verdict)
+                if text:
+                    texts.append(text)
+                hits += [{"keyword": k, "at_s": start} for k in verdict.keywords]
+                tiers[verdict.tier] = tiers.get(verdict.tier, 0) + 1
+                peak = max(peak, update.score)
+                if alert_at is None and update.level >= ALERT:
+                    alert_at = start
+            result.update({
+                "duration_s": round(rec.duration, 3),
+                "risk":       round(peak, 3),       # highest the call-level score got
+                "risk_level": LEVELS[risk.level],
+                "alert_at_s": alert_at,
+                "hits":       hits,
+                "tiers":      tiers,
+                "transcript": " ".join(texts),
+                "keywords_version": self.snapshot.tag,
+            })
+        except Exception as e:          # one bad file must not end the run
+            result["error"] = repr(e)
+        finally:
+            self.risk.close(path)
+        result["cpu_s"] = round(time.process_time() - cpu, 3)
+        result["wall_s"] = round(time.perf_counter() - wall, 3)
+        return result
+
+
+_scanner: Scanner | None = None
+
+
+def _init_worker(engine: str, engine_args: dict, keywords_path: str, fuzzy: bool, window_s: float):
+    global _scanner
+    snapshot = KeywordSnapshot(load_entries(keywords_path), fuzzy=fuzzy)
+    _scanner = Scanner(resolve_name(engine)(**engine_args), snapshot, window_s)
+
+
+def _scan(path: str) -> dict:
+    return _scanner.scan(path)
+
+
+# ─── Driver ───────────────────────────────────────────────────────────────────
+
+def find_recordings(paths: list[str]) -> list[str]:
+    """Audio files under ``paths``, longest (largest) first."""
+    found = []
+    for p in map(Path, paths):
+        candidates = p.rglob("*") if p.is_dir() else [p]
+        found += [str(f) for f in candidates if f.suffix.lower() in AUDIO_SUFFIXES and f.is_file()]
+    return sorted(set(found), key=lambda f: (-os.path.getsize(f), f))
+
+
+def load_checkpoint(report: str) -> dict[str, dict]:
+    """Results already in ``report`` (a torn last line is ignored)."""
+    done = {}
+    try:
+        with open(report, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if "error" not in row:
+                    done[row["path"]] = row
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _unchanged(path: str, row: dict) -> bool:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False                    # gone since it was listed: scan reports the error
+    return row.get("size") == st.st_size and row.get("mtime") == st.st_mtime
+
+
+def run(paths: list[str], report: str, workers: int = os.cpu_count() or 1,
+        engine: str = "stt.scan:whisper_engine", engine_args: dict | None = None,
+        keywords_path: str | Path = DEFAULT_PATH, fuzzy: bool = True, window_s: float = 30.0,
+        log: Callable[[str], None] = lambda line: print(line, file=sys.stderr)) -> dict:
+    """Scan ``paths`` into ``report``, resuming from it; returns the run summary."""
+    files = find_recordings(paths)
+    done = load_checkpoint(report)
+    todo = [f for f in files if not (f in done and _unchanged(f, done[f]))]
+    log(f"🗂 {len(files)} recordings, {len(files) - len(todo)} already in {report}, "
+        f"{len(todo)} to scan with {workers} worker(s)")
+
+    started = time.perf_counter()
+    results: list[dict] = []
+    pool = ProcessPoolExecutor(workers, mp_context=get_context("spawn"), initializer=_init_worker,
+                               initargs=(engine, engine_args or {}, str(keywords_path), fuzzy, window_s))
+    interrupted = False
+    with open(report, "a", encoding="utf-8") as out:
+        pending, queue = set(), iter(todo)
+        try:
+            # Keep each worker at most two files ahead, so an interrupt loses little
+            for path in queue:
+                pending.add(pool.submit(_scan, path))
+                if len(pending) >= 2 * workers:
+                    break
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    row = fut.result()
+                    out.write(json.dumps(row, ensure_ascii=False) + "\n")
+                    out.flush()
+                    results.append(row)
+                    status = row.get("error") or f"{row['risk_level']} (risk {row['risk']})"
+                    log(f"[{len(results)}/{len(todo)}] {row['path']}: {status}")
+                    path = next(queue, None)
+                    if path is not None:
+                        pending.add(pool.submit(_scan, path))
+        except KeyboardInterrupt:
+            interrupted = True
+            log(f"⏸ Interrupted; rerun with --report {report} to resume")
+        finally:
+            pool.shutdown(wait=not interrupted, cancel_futures=True)
+
+    wall = time.perf_counter() - started
+    ok = [r for r in results if "error" not in r]
+    audio_s = sum(r["duration_s"] for r in ok)
+    cpu_s = sum(r["cpu_s"] for r in results)
+    return {
+        "files":               len(results),
+        "failed":              len(results) - len(ok),
+        "skipped":             len(files) - len(todo),
+        "alerted":             sum(r["risk_level"] == LEVELS[ALERT] for r in ok),
+        "hangup":              sum(r["risk_level"] == LEVELS[HANGUP] for r in ok),
+        "audio_hours":         round(audio_s / 3600, 3),
+        "wall_s":              round(wall, 2),
+        "cpu_s":               round(cpu_s, 2),
+        "files_per_hour":      round(len(results) / wall * 3600, 1) if wall else 0.0,
+        "audio_h_per_cpu_h":   round(audio_s / cpu_s, 2) if cpu_s else 0.0,
+        "realtime_x":          round(audio_s / wall, 2) if wall else 0.0,
+        "interrupted":         interrupted,
+    }
+
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Scan recorded calls for fraud.")
+    ap.add_argument("paths", nargs="+", help="recordings or directories of them")
+    ap.add_argument("--report", default="scan.jsonl", help="JSONL results; also the resume checkpoint")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--model", default=os.getenv("WHISPER_MODEL", "small"))
+    ap.add_argument("--window", type=float, default=30.0, help="seconds of audio per transcription")
+    ap.add_argument("--keywords", default=str(DEFAULT_PATH))
+    ap.add_argument("--exact", action="store_true", help="exact keyword matching only")
+    ap.add_argument("--engine", default="stt.scan:whisper_engine")
+    ap.add_argument("--engine-arg", action="append", default=[], metavar="KEY=VALUE")
+    args = ap.parse_args(argv)
+
+    engine_args = dict(a.split("=", 1) for a in args.engine_arg)
+    if args.engine == "stt.scan:whisper_engine":
+        engine_args.setdefault("model", args.model)
+        # Workers split the cores rather than each spawning a thread per core
+        engine_args.setdefault("threads", max(1, (os.cpu_count() or 1) // args.workers))
+    summary = run(args.paths, args.report, args.workers, args.engine, engine_args,
+                  args.keywords, not args.exact, args.window)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    main()
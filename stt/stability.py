@@ -0,0 +1,80 @@
+"""
+How far to trust a keyword heard in an interim STT hypothesis.
+
+Interims revise themselves: "share the otp" can be "share the top" one
+revision later. Acting on the first interim that contains a keyword hangs
+up on words that never reach a final; acting only on finals waits out the
+endpointing delay of every segment. HitStability sits in between. It
+follows each keyword hit of the open segment (the n-th "otp" in the
+hypothesis) across revisions and settles it in two stages:
+
+    suspected   in ``suspect_revisions`` revisions in a row, for ``suspect_ms``
+    confirmed   in ``confirm_revisions`` revisions in a row, for ``confirm_ms``,
+                or in the final
+
+A hit that drops out of the hypothesis before settling starts over if it
+comes back. Each stage reports a hit once per segment, so each can feed
+its own CallRisk: one that may warn early and one that may act.
+"""
+
+import math
+from typing import Iterable, NamedTuple
+
+SUSPECTED, CONFIRMED = "suspected", "confirmed"
+
+
+class StabilityPolicy(NamedTuple):
+    suspect_revisions: float = 2
+    suspect_ms: float = 300.0
+    confirm_revisions: float = 4
+    confirm_ms: float = 1200.0
+
+
+POLICIES = {
+    "interim": StabilityPolicy(1, 0.0, 1, 0.0),     # act on the first interim with a keyword
+    "stable":  StabilityPolicy(),
+    "final":   StabilityPolicy(math.inf, math.inf, math.inf, math.inf),
+}
+
+
+class HitStability:
+    """Per-call stability of keyword hits in the open segment."""
+
+    __slots__ = ("policy", "_seen", "_suspected", "_confirmed")
+
+    def __init__(self, policy: StabilityPolicy = StabilityPolicy()):
+        self.policy = policy
+        self._seen: dict[tuple[str, int], tuple[float, int]] = {}  # hit → (first seen, revisions)
+        self._suspected: set[tuple[str, int]] = set()
+        self._confirmed: set[tuple[str, int]] = set()
+
+    def update(self, keywords: Iterable[str], now_ms: float,
+               is_final: bool) -> tuple[list[str], list[str]]:
+        """
+        Feed the keywords in one STT result's hypothesis, in order of
+        appearance. Returns the keywords newly (suspected, confirmed); a hit
+        confirmed before it was suspected is reported in both.
+        """
+        p = self.policy
+        seen, live, nth = self._seen, {}, {}
+        suspected, confirmed = [], []
+        for kw in keywords:
+            n = nth[kw] = nth.get(kw, 0) + 1
+            hit = (kw, n)
+            first, revisions = seen.get(hit, (now_ms, 0))
+            revisions += 1
+            live[hit] = (first, revisions)
+            age = now_ms - first
+            if hit not in self._confirmed and (
+                    is_final or revisions >= p.confirm_revisions and age >= p.confirm_ms):
+                self._confirmed.add(hit)
+                confirmed.append(kw)
+            if hit not in self._suspected and (
+                    hit in self._confirmed or revisions >= p.suspect_revisions and age >= p.suspect_ms):
+                self._suspected.add(hit)
+                suspected.append(kw)
+        if is_final:
+            self._seen, self._suspected, self._confirmed = {}, set(), set()
+        else:
+            self._seen = live
+        return suspected, confirmed
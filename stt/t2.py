@@ -1,44 +1,43 @@
 import os
 import asyncio
 import json
-import pyaudio
 import websockets
 
+from stt.capture import AudioCapture, open_source
+
 # Read your Deepgram API key from the environment
 DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
 if not DEEPGRAM_API_KEY:
     raise RuntimeError("Set DEEPGRAM_API_KEY in your environment")  # :contentReference[oaicite:0]{index=0}
 
+# Deepgram is sent 16 kHz whatever rate the microphone runs at
+DG_RATE = 16000
+FRAME_MS = 20
+
 # Build the Deepgram WebSocket URL with query parameters
-# encoding=linear16, sample_rate=44100, channels=1, and punctuate=true for basic formatting
+# encoding=linear16, sample_rate=DG_RATE, channels=1, and punctuate=true for basic formatting
 DG_URL = (
     "wss://api.deepgram.com/v1/listen"
     f"?access_token={DEEPGRAM_API_KEY}"
     "&encoding=linear16"
-    "&sample_rate=44100"
+    f"&sample_rate={DG_RATE}"
     "&channels=1"
     "&punctuate=true"
 )  # :contentReference[oaicite:1]{index=1}
 
 async def transcribe_live():
-    # Set up PyAudio for microphone capture
-    pa = pyaudio.PyAudio()
-    stream = pa.open(
-        format=pyaudio.paInt16,
-        channels=1,
-        rate=44100,
-        input=True,
-        frames_per_buffer=1024,
-    )
-
-    async with websockets.connect(DG_URL) as ws:
+    # Microphone capture runs on PortAudio's thread (never blocking the loop);
+    # frames arrive here already resampled to DG_RATE
+    async with AudioCapture(open_source(44100), DG_RATE, FRAME_MS) as mic, \
+            websockets.connect(DG_URL) as ws:
         print("🟢 Connected to Deepgram, start speaking…")
         
         async def send_audio():
             try:
-                while True:
-                    data = stream.read(1024, exception_on_overflow=False)
-                    await ws.send(data)  # send raw PCM bytes
+                async for frame in mic:
+                    await ws.send(frame.tobytes())  # send raw PCM bytes
+                # Out of audio: Deepgram flushes its last results and closes
+                await ws.send(json.dumps({"type": "CloseStream"}))
             except websockets.ConnectionClosed:
                 pass
 
@@ -56,10 +55,6 @@ async def transcribe_live():
         # Run sending and receiving concurrently
         await asyncio.gather(send_audio(), receive_transcripts())
 
-    # Clean up
-    stream.stop_stream()
-    stream.close()
-    pa.terminate()
     print("🔴 Connection closed")
 
 if __name__ == "__main__":
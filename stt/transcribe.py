@@ -1,20 +1,18 @@
-import torch
 import whisper
-import sounddevice as sd
-import numpy as np
 import threading
 import tkinter as tk
 from tkinter import messagebox
 
+from stt.audio import Resampler, pcm16_to_float32
+from stt.capture import open_source
+from stt.keywords import KeywordSnapshot, load_entries
+from stt.local_stream import RATE, StreamingWhisper
+
 # Step 1: Load Whisper Model
 model = whisper.load_model("small")  # Small & fast
 
-# Step 2: Define Fraud Keywords and Phrases
-fraud_keywords = [
-    "otp", "one time password", "account number", "debit card",
-    "upi pin", "send money", "bank verification", "kyc update",
-    "government penalty", "block your account"
-]
+# Step 2: Fraud keywords and phrases from the shared dictionary
+fraud_matcher = KeywordSnapshot(load_entries()).matcher
 
 # Step 3: Global flag to stop recording
 stop_flag = threading.Event()
@@ -26,40 +24,47 @@ def show_fraud_alert():
     messagebox.showwarning("⚠️ Fraud Detected!", "Suspicious conversation detected.\nCall has been stopped for your safety.")
     root.destroy()
 
-# Step 5: Audio Callback
-def callback(indata, frames, time, status):
-    if status:
-        print(status)
-    audio_data = indata[:, 0]  # Use first channel (mono)
+# Step 5: Streaming engine — feeding it only fills a ring buffer; a
+# worker thread runs VAD + sliding-window Whisper and commits new words
+keyword_stream = fraud_matcher.stream()
 
-    # Convert audio to np array
-    audio_np = np.array(audio_data, dtype=np.float32)
+def on_text(text, latency):
+    print(f"📝 Transcribed: {text}  ({latency * 1000:.0f} ms)")
 
-    # Transcribe live
-    result = model.transcribe(audio_np, fp16=False)
-    text = result["text"].lower().strip()
-    
-    if text:
-        print(f"📝 Transcribed: {text}")
+    # Check for fraud keywords (phrases may span two commits)
+    detected = [m.keyword for m in keyword_stream.feed(text, is_final=True)]
+    if detected:
+        print(f"🚨 Detected keyword: {detected[0].upper()}")
+        stop_flag.set()  # Set flag to stop recording
+        show_fraud_alert()  # Show alert
 
-    # Check for fraud keywords
-    for keyword in fraud_keywords:
-        if keyword in text:
-            print(f"🚨 Detected keyword: {keyword.upper()}")
-            stop_flag.set()  # Set flag to stop recording
-            show_fraud_alert()  # Show alert
-            break  # No need to check further
+engine = StreamingWhisper(model, on_text=on_text)
 
-# Step 6: Start Listening
+# Step 6: Start Listening — the source's own thread resamples each block
+# to the 16 kHz Whisper expects and feeds it straight into the engine's ring
 def listen():
-    samplerate = 16000  # Whisper expects 16kHz
-    duration = 20  # Record small chunks
-
     print("🛡️ Listening for fraud... Press CTRL+C to manually stop.")
 
-    with sd.InputStream(channels=1, samplerate=samplerate, callback=callback):
-        while not stop_flag.is_set():
-            sd.sleep(duration * 1000)
+    source = open_source()
+    to_whisper = Resampler(source.rate, RATE)
+
+    def write(block):
+        if not stop_flag.is_set():
+            engine.feed(pcm16_to_float32(to_whisper(block)))
+
+    engine.start()
+    source.start(write, stop_flag.set)    # a WAV source stops us when it ends
+    try:
+        stop_flag.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.stop()
+        engine.stop()
+        stats = engine.stats()
+        if stats["latency_p50"] is not None:
+            print(f"⏱ RTF {stats['rtf']:.2f}, latency p50 {stats['latency_p50'] * 1000:.0f} ms, "
+                  f"max {stats['latency_max'] * 1000:.0f} ms, dropped {stats['overruns_s']:.1f}s")
 
 if __name__ == "__main__":
     listen()